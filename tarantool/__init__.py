@@ -1,22 +1,112 @@
 # coding: utf-8
 __version__ = '0.3.2'
 
+import importlib as _importlib
+import sys as _sys
 
-from tarantool.connection import Connection
 from tarantool.const import *  # noqa
 from tarantool.error import *  # noqa
 from tarantool.const import SOCKET_TIMEOUT
 
 
-def connect(host='localhost', port=33013, timeout=SOCKET_TIMEOUT):
+# Attributes imported on the first access to keep `import tarantool` fast
+_LAZY_ATTRIBUTES = {
+    'Compressed': 'tarantool.compression',
+    'Connection': 'tarantool.connection',
+    'FixedLayout': 'tarantool.response',
+    'Interned': 'tarantool.response',
+}
+
+# Submodules available as attributes without explicit import
+_LAZY_SUBMODULES = (
+    'admin', 'bulk', 'cache', 'capture', 'compression', 'connection', 'dump',
+    'faultproxy', 'hedge', 'keepalive', 'lanes', 'limiter', 'mirror', 'proxy',
+    'request', 'response', 'sampler', 'space', 'transport', 'writebuffer',
+)
+
+
+def _load(namespace, name):
+    """
+    Import the lazy attribute or submodule `name` and store it in
+    `namespace` (the module dictionary)
+    """
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(_importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = _importlib.import_module('tarantool.' + name)
+    else:
+        raise AttributeError(
+            "module 'tarantool' has no attribute %r" % name)
+    namespace[name] = value
+    return value
+
+
+def _dir(namespace):
+    return sorted(set(namespace) | set(_LAZY_ATTRIBUTES) |
+                  set(_LAZY_SUBMODULES))
+
+
+if _sys.version_info >= (3, 7):
+    def __getattr__(name):
+        return _load(globals(), name)
+
+    def __dir__():
+        return _dir(globals())
+else:
+    # Module __getattr__ is not supported, the module is turned into
+    # an instance of the subclass providing it (see the end of the file)
+    from types import ModuleType as _ModuleType
+
+    class _LazyModule(_ModuleType):
+        def __getattr__(self, name):
+            if name.startswith('__'):
+                raise AttributeError(name)
+            return _load(self.__dict__, name)
+
+        def __dir__(self):
+            return _dir(self.__dict__)
+
+
+def connect(host='localhost', port=33013, timeout=SOCKET_TIMEOUT,
+            unix_socket=None):
     """
     Create a connection to the Tarantool server.
 
     :param str host: Server hostname or IP-address
     :param int port: Server port
+    :param str unix_socket: path to the server unix socket; if passed
+    `host` and `port` are ignored
 
     :rtype: :class:`~tarantool.connection.Connection`
     :raise: `NetworkError`
     """
+    from tarantool.connection import Connection
 
+    if unix_socket is not None:
+        return Connection(unix_socket=unix_socket, socket_timeout=timeout)
     return Connection(host, port, socket_timeout=timeout)
+
+
+def _exported(namespace):
+    """
+    Constants and exception classes brought by the star imports, not
+    the modules and helpers they import (`os`, `struct`, `warn`, ...)
+    """
+    # A list comprehension at the module level would leak its variable
+    # into the module namespace on Python 2
+    return [name for name, value in list(namespace.items())
+            if not name.startswith('_') and
+            (name.isupper() or isinstance(value, type))]
+
+
+__all__ = sorted(_exported(globals()) + ['connect'] + list(_LAZY_ATTRIBUTES))
+
+if _sys.version_info < (3, 5):
+    # Module class cannot be changed, the module is replaced;
+    # the original one is kept since its functions use its globals
+    _module = _LazyModule(__name__, __doc__)
+    _module.__dict__.update(globals())
+    _module._original = _sys.modules[__name__]
+    _sys.modules[__name__] = _module
+elif _sys.version_info < (3, 7):
+    _sys.modules[__name__].__class__ = _LazyModule
@@ -8,8 +8,10 @@ if PY3:
     unicode = str
     bytes = bytes
     long = int
+    import queue
 else:
     basestring = basestring
     unicode = unicode
     bytes = str
     long = long
+    import Queue as queue
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a client of the Tarantool text administrative console
+(``admin_port``) used to collect server statistics.
+
+The console answers commands with YAML documents; they are parsed into
+dicts by :func:`parse` which supports the subset of YAML the server
+produces (block and flow mappings, block sequences and scalars), so PyYAML
+is not required.
+
+Example::
+
+    >>> admin = AdminConnection('localhost', 33015)
+    >>> admin.stat()['SELECT']
+    {'rps': 1520, 'total': 984210}
+    >>> admin.slab()['arena_used']
+    12.5
+"""
+import re
+import socket
+import threading
+import time
+
+from tarantool._compat import PY3
+from tarantool.const import SOCKET_TIMEOUT
+from tarantool.error import DatabaseError, NetworkError, warn
+from tarantool.transport import TCPTransport
+
+
+# Default port of the administrative console
+ADMIN_PORT = 33015
+
+# Default interval between polls of the statistics (seconds)
+POLL_INTERVAL = 1.0
+
+_END_OF_DOCUMENT = b'\n...\n'
+_INT_RE = re.compile(r'^-?\d+$')
+_FLOAT_RE = re.compile(r'^-?\d+\.\d*(e[-+]?\d+)?$', re.I)
+
+
+def parse_scalar(value):
+    """
+    Convert YAML scalar to int, float or str.
+    Percentages (``12.5%``) are converted to float (``12.5``).
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    number = value[:-1] if value.endswith('%') else value
+    if _INT_RE.match(number):
+        return int(number)
+    if _FLOAT_RE.match(number):
+        return float(number)
+    return value
+
+
+def _split_flow(text):
+    """
+    Split contents of a flow collection by top level commas
+    """
+    items = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text):
+        if char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            items.append(text[start:i])
+            start = i + 1
+    items.append(text[start:])
+    return [item.strip() for item in items if item.strip()]
+
+
+def _parse_value(value):
+    value = value.strip()
+    if value.startswith('{') and value.endswith('}'):
+        result = {}
+        for item in _split_flow(value[1:-1]):
+            key, _, item_value = item.partition(':')
+            result[key.strip()] = _parse_value(item_value)
+        return result
+    if value.startswith('[') and value.endswith(']'):
+        return [_parse_value(item) for item in _split_flow(value[1:-1])]
+    return parse_scalar(value)
+
+
+def _parse_block(lines, pos, indent):
+    """
+    Parse block collection starting at `lines[pos]` with the given indent
+
+    :return: pair (value, position of the first line after the block)
+    """
+    result = None
+    while pos < len(lines):
+        line = lines[pos]
+        line_indent = len(line) - len(line.lstrip(' '))
+        if line_indent < indent:
+            break
+        text = line.strip()
+
+        if text.startswith('- ') or text == '-':
+            if result is None:
+                result = []
+            item = text[2:].strip()
+            if not item:
+                # Nested block of the list item
+                value, pos = _parse_block(lines, pos + 1, line_indent + 1)
+                result.append(value)
+                continue
+            if re.match(r'^[^{\["\']*:( |$)', item):
+                # Mapping inside the list item: "- key: value"
+                lines[pos] = ' ' * (line_indent + 2) + item
+                value, pos = _parse_block(lines, pos, line_indent + 2)
+                result.append(value)
+                continue
+            result.append(_parse_value(item))
+            pos += 1
+            continue
+
+        key, separator, value = text.partition(': ')
+        if not separator:
+            if not text.endswith(':'):
+                # Bare scalar document (e.g. an error message)
+                return parse_scalar(text), pos + 1
+            key, value = text[:-1], ''
+        if result is None:
+            result = {}
+        key = key.strip()
+        if value.strip():
+            result[key] = _parse_value(value)
+            pos += 1
+        else:
+            result[key], pos = _parse_block(lines, pos + 1, line_indent + 1)
+    return result, pos
+
+
+def parse(text):
+    """
+    Parse YAML document returned by the administrative console
+
+    :param text: document text including ``---`` and ``...`` markers
+    :type text: str
+
+    :return: parsed document
+    :rtype: dict, list or scalar
+    """
+    lines = []
+    for line in text.splitlines():
+        if line.strip() in ('---', '...') or not line.strip():
+            continue
+        lines.append(line.rstrip())
+    if not lines:
+        return None
+    return _parse_block(lines, 0, 0)[0]
+
+
+class AdminConnection(object):
+    """
+    Connection to the administrative console of the server
+    """
+
+    def __init__(self, host, port=ADMIN_PORT, socket_timeout=SOCKET_TIMEOUT,
+                 connect_now=True):
+        """
+        :param str host: Server hostname or IP-address
+        :param int port: Server administrative console port
+        :param socket_timeout: socket timeout (seconds)
+        :type socket_timeout: float
+        """
+        self.host = host
+        self.port = port
+        self.socket_timeout = socket_timeout
+        self.transport = TCPTransport(host, port)
+        self._socket = None
+        self._lock = threading.Lock()
+        if connect_now:
+            self.connect()
+
+    def connect(self):
+        """
+        Connect to the server
+
+        :raise: `NetworkError`
+        """
+        try:
+            if self._socket:
+                self._socket.close()
+                self._socket = None
+            self._socket = self.transport.open(self.socket_timeout)
+        except (socket.error, socket.timeout) as e:
+            raise NetworkError(e)
+
+    def close(self):
+        """
+        Close connection to the server
+        """
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def execute(self, command):
+        """
+        Execute the command and return its raw output
+
+        :param command: console command (e.g. ``'show stat'``)
+        :type command: str
+
+        :return: YAML document
+        :rtype: str
+        :raise: `NetworkError`
+        """
+        with self._lock:
+            if self._socket is None:
+                self.connect()
+            try:
+                self._socket.sendall(command.encode('utf-8') + b'\n')
+                chunks = []
+                data = b''
+                while not data.endswith(_END_OF_DOCUMENT):
+                    chunk = self._socket.recv(4096)
+                    if not chunk:
+                        raise socket.error(
+                            socket.errno.ECONNABORTED,
+                            'Software caused connection abort')
+                    chunks.append(chunk)
+                    # Only the tail is checked for the end of the document
+                    data = data[-len(_END_OF_DOCUMENT):] + chunk
+            except (socket.error, socket.timeout) as e:
+                # The rest of the output would be read as the next answer
+                self.close()
+                raise NetworkError(e)
+        text = b''.join(chunks)
+        return text.decode('utf-8', 'replace') if PY3 else text
+
+    def command(self, command):
+        """
+        Execute the command and parse its output
+
+        :rtype: dict, list or scalar
+        :raise: `NetworkError`
+        """
+        return parse(self.execute(command))
+
+    def _section(self, command, section):
+        result = self.command(command)
+        if not isinstance(result, dict) or section not in result:
+            raise DatabaseError(0, 'Unexpected output of %r: %r' % (
+                command, result))
+        return result[section]
+
+    def stat(self):
+        """
+        Request statistics (``show stat``)
+
+        :return: per request type counters:
+        ``{'SELECT': {'rps': 10, 'total': 100}, ...}``
+        :rtype: dict
+        """
+        return self._section('show stat', 'statistics')
+
+    def slab(self):
+        """
+        Request memory allocator statistics (``show slab``)
+
+        :return: ``items_used`` and ``arena_used`` (percents) and
+        the list of slab classes
+        :rtype: dict
+        """
+        return self._section('show slab', 'slab statistics')
+
+    def info(self):
+        """
+        Request server information (``show info``)
+
+        :return: version, uptime, lsn, status, etc.
+        :rtype: dict
+        """
+        return self._section('show info', 'info')
+
+
+class Sample(object):
+    """
+    Statistics collected by a single poll
+    """
+
+    def __init__(self, time, stat, slab, info, rates):
+        #: Time of the poll (seconds since epoch)
+        self.time = time
+        #: Output of :meth:`AdminConnection.stat`
+        self.stat = stat
+        #: Output of :meth:`AdminConnection.slab`
+        self.slab = slab
+        #: Output of :meth:`AdminConnection.info`
+        self.info = info
+        #: Requests per second of each type since the previous poll
+        #: (None for the first poll)
+        self.rates = rates
+
+    def __repr__(self):
+        return '<Sample %.3f rates=%r>' % (self.time, self.rates)
+
+
+class Poller(object):
+    """
+    Periodically polls the server statistics and computes per-second
+    rates of requests from the ``total`` counters.
+    """
+
+    def __init__(self, admin, interval=POLL_INTERVAL, callback=None):
+        """
+        :param admin: connection to the administrative console
+        :type admin: :class:`AdminConnection` instance
+        :param interval: interval between polls (seconds)
+        :type interval: float
+        :param callback: function called with :class:`Sample` instance
+        after each poll of the background thread
+        :type callback: callable
+        """
+        self.admin = admin
+        self.interval = interval
+        self.callback = callback
+        #: The last :class:`Sample`
+        self.last = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """
+        Collect statistics now
+
+        :rtype: :class:`Sample` instance
+        :raise: `NetworkError`
+        """
+        now = time.time()
+        stat = self.admin.stat()
+        sample = Sample(now, stat, self.admin.slab(), self.admin.info(), None)
+        last = self.last
+        if last is not None and now > last.time:
+            sample.rates = {}
+            for name, counters in stat.items():
+                previous = last.stat.get(name)
+                if isinstance(counters, dict) and \
+                        isinstance(previous, dict):
+                    sample.rates[name] = float(
+                        counters.get('total', 0) - previous.get('total', 0)
+                    ) / (now - last.time)
+        self.last = sample
+        return sample
+
+    def start(self):
+        """
+        Start polling in the background thread
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sample = self.poll()
+            except DatabaseError as e:
+                warn('Failed to poll %s:%s: %s' % (
+                    self.admin.host, self.admin.port, e), RuntimeWarning)
+            else:
+                if self.callback is not None:
+                    self.callback(sample)
+            self._stop.wait(self.interval)
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides bulk loading of rows into a space.
+
+Rows are sent as pipelined INSERT requests (see
+:meth:`Connection._send_requests()
+<tarantool.connection.Connection._send_requests>`),
+so the loader does not wait for the server to answer each row.
+Failed rows are collected and the load goes on until the number of
+failures reaches the threshold.
+
+Example::
+
+    >>> stats = tarantool.bulk.load(
+    ...     connection, 0, tarantool.bulk.read_csv('data.csv', (int, bytes)))
+    >>> stats.rows_per_second
+"""
+import csv
+import multiprocessing
+import multiprocessing.util
+import time
+
+from tarantool._compat import PY3, bytes, long, unicode
+from tarantool.connection import Connection, insert_request
+from tarantool.const import SOCKET_TIMEOUT, PIPELINE_WINDOW
+from tarantool.error import DatabaseError
+
+
+# Default number of rows in a chunk passed to a worker process
+CHUNK_SIZE = 10000
+
+
+class LoadStats(object):
+    """
+    Results of the bulk load
+    """
+
+    def __init__(self):
+        #: Number of successfully inserted rows
+        self.rows = 0
+        #: List of pairs (row, error) for the failed rows
+        self.errors = []
+        #: Load duration (seconds)
+        self.elapsed = 0.0
+        #: True if the load has been stopped because of errors
+        self.stopped = False
+
+    @property
+    def rows_per_second(self):
+        """
+        :type: float
+
+        Average load speed
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.rows / self.elapsed
+
+    def update(self, other):
+        """
+        Add results of the other (partial) load
+        """
+        self.rows += other.rows
+        self.errors.extend(other.errors)
+        self.stopped = self.stopped or other.stopped
+
+    def __repr__(self):
+        return '%d rows loaded, %d failed in %.3f s (%.1f rows/s)' % (
+            self.rows, len(self.errors), self.elapsed, self.rows_per_second)
+
+
+def load(connection, space_no, rows, window=PIPELINE_WINDOW,
+         max_errors=None, progress=None, field_types=None):
+    """
+    Insert rows into the space keeping at most `window` requests in flight.
+
+    :param connection: connection to the server
+    :type connection: :class:`~tarantool.connection.Connection` instance
+    :param int space_no: space id to insert rows
+    :param rows: rows to insert, the iterable is consumed lazily
+    :type rows: iterable of tuples
+    :param window: maximum number of requests in flight
+    :type window: int
+    :param max_errors: stop the load when the number of failed rows
+    exceeds this value (requests already sent are still waited for);
+    None means never stop
+    :type max_errors: int or None
+    :param progress: function called with :class:`LoadStats` instance
+    about once a second
+    :type progress: callable
+    :param field_types: types of the fields; values of
+    :class:`~tarantool.compression.Compressed` fields are compressed and
+    :class:`~tarantool.response.FixedLayout` packs the rows
+    :type field_types: tuple
+
+    :rtype: :class:`LoadStats` instance
+    :raise: `NetworkError`
+    """
+    stats = LoadStats()
+    pending = {}
+
+    def requests():
+        for row in rows:
+            if stats.stopped:
+                return
+            request = insert_request(space_no, row, False, field_types)
+            pending[request] = row
+            yield request
+
+    started = reported = time.time()
+    results = connection._send_requests(requests(), window)
+    try:
+        for request, result in results:
+            row = pending.pop(request)
+            if isinstance(result, DatabaseError):
+                stats.errors.append((row, result))
+                if max_errors is not None and \
+                        len(stats.errors) > max_errors:
+                    stats.stopped = True
+            else:
+                stats.rows += 1
+            if progress is not None and time.time() - reported >= 1:
+                reported = time.time()
+                stats.elapsed = reported - started
+                progress(stats)
+    finally:
+        # Releases the connection at once if `progress` raises
+        results.close()
+    stats.elapsed = time.time() - started
+    return stats
+
+
+def _converter(cast_to):
+    """
+    Return function converting a value read from CSV file to `cast_to`
+    """
+    if cast_to in (int, long):
+        return cast_to
+    if cast_to in (bytes, unicode):
+        # String fields are sent utf-8 encoded
+        if PY3:
+            return lambda value: value.encode('utf-8')
+        return lambda value: value
+    raise TypeError('Invalid field type %s' % cast_to)
+
+
+def read_csv(path, field_types=None, delimiter=',', skip_header=False):
+    """
+    Read rows from the CSV (or TSV with ``delimiter='\\t'``) file.
+
+    :param path: file name
+    :type path: str
+    :param field_types: types of the fields (``int`` or ``bytes``),
+    the last type is applied to the rest of the fields. By default all
+    fields are loaded as strings.
+    :type field_types: tuple
+    :param delimiter: field delimiter
+    :type delimiter: str
+    :param skip_header: skip the first line of the file
+    :type skip_header: bool
+
+    :rtype: iterator over tuples
+    """
+    converters = [_converter(t) for t in field_types or (bytes, )]
+    if PY3:
+        source = open(path, 'r', newline='', encoding='utf-8')
+    else:
+        source = open(path, 'rb')
+        delimiter = delimiter.encode('utf-8')
+
+    with source:
+        reader = csv.reader(source, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+        last = converters[-1]
+        for line in reader:
+            yield tuple(
+                (converters[i] if i < len(converters) else last)(value)
+                for i, value in enumerate(line))
+
+
+# Connection of the worker process (see parallel_load())
+_worker_connection = None
+
+
+def _init_worker(host, port, socket_timeout):
+    global _worker_connection
+    _worker_connection = Connection(
+        host, port, socket_timeout=socket_timeout)
+    # Run when the worker exits after pool.close()
+    multiprocessing.util.Finalize(
+        None, _worker_connection.close, exitpriority=10)
+
+
+def _load_chunk(args):
+    space_no, rows, window, field_types = args
+    return load(_worker_connection, space_no, rows, window,
+                field_types=field_types)
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parallel_load(host, port, space_no, rows, processes=None,
+                  chunk_size=CHUNK_SIZE, window=PIPELINE_WINDOW,
+                  max_errors=None, socket_timeout=SOCKET_TIMEOUT,
+                  field_types=None):
+    """
+    Insert rows into the space using a pool of worker processes.
+
+    Input is split into chunks of `chunk_size` rows, each worker process
+    has its own connection and loads chunks with :func:`load`.
+    Rows must be picklable.
+
+    :param str host: Server hostname or IP-address
+    :param int port: Server port
+    :param int space_no: space id to insert rows
+    :param rows: rows to insert
+    :type rows: iterable of tuples
+    :param processes: number of worker processes
+    (default is the number of CPUs)
+    :type processes: int
+    :param chunk_size: number of rows passed to a worker at once
+    :type chunk_size: int
+    :param window: maximum number of requests in flight per connection
+    :type window: int
+    :param max_errors: stop the load when the number of failed rows
+    exceeds this value; None means never stop
+    :type max_errors: int or None
+    :param field_types: types of the fields (see :func:`load`)
+    :type field_types: tuple
+
+    :rtype: :class:`LoadStats` instance
+    :raise: `NetworkError`
+    """
+    processes = processes or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(
+        processes, _init_worker, (host, port, socket_timeout))
+    stats = LoadStats()
+    started = time.time()
+    completed = False
+    try:
+        in_flight = []
+        chunks = _chunks(rows, chunk_size)
+        while True:
+            # Keep a couple of chunks per worker queued, so the input is
+            # read only as fast as it is loaded
+            while not stats.stopped and len(in_flight) < processes * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.append(pool.apply_async(_load_chunk, (
+                    (space_no, chunk, window, field_types), )))
+            if not in_flight:
+                break
+            stats.update(in_flight.pop(0).get())
+            if max_errors is not None and len(stats.errors) > max_errors:
+                stats.stopped = True
+        completed = True
+    finally:
+        if completed:
+            # Workers close their connections on exit
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+    stats.elapsed = time.time() - started
+    return stats
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`SharedCache`: a cache of SELECT responses
+kept in a memory-mapped file, so it is shared by all processes of the host
+(e.g. pre-fork workers) which open the same file.
+
+Responses are stored in the wire format keyed by the encoded request and
+decoded into :class:`~tarantool.response.Response` on lookup.
+
+The file is an array of fixed-size slots grouped into sets of `ways`
+slots; a key is stored in the set selected by its hash, the least recently
+used slot of the set is evicted.
+Each slot is protected by a sequence counter (seqlock): writers make the
+counter odd while the slot is modified, readers do not take any locks and
+treat the slot as a miss if the counter changed while they read it.
+Writers are serialized with ``flock()`` on the file.
+
+Writes through a connection using the cache (INSERT, UPDATE and DELETE
+requests) hide the cached selects from the written space from all
+connections of the process using the same :class:`SharedCache` instance.
+Other processes still get these entries until they expire, as well as
+everyone after writes made by stored procedures (CALL) or by other
+clients: the cache is only suitable for data which may be stale for up
+to `ttl` seconds.
+
+Example::
+
+    >>> cache = SharedCache('/dev/shm/tarantool.cache', ttl=10)
+    >>> connection = tarantool.Connection('localhost', 33013,
+    ...                                   select_cache=cache)
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Writers are serialized only within the process
+    fcntl = None
+
+from tarantool.response import Response
+
+
+CACHE_MAGIC = b'TNTCACH1'
+
+# Default cache file size (bytes)
+CACHE_SIZE = 64 * 1024 * 1024
+
+# Default slot size (bytes), larger responses are not cached
+CACHE_SLOT_SIZE = 4096
+
+# Default number of slots in a set
+CACHE_WAYS = 8
+
+# Default time to live of cached responses (seconds)
+CACHE_TTL = 60
+
+# <magic><slot_size><slot_count>
+struct_file_header = struct.Struct('<8sLL')
+# <seq><key_hash><expires><accessed><key_length><value_length>
+struct_slot_header = struct.Struct('<LQddLL')
+struct_seq = struct.Struct('<L')
+struct_accessed = struct.Struct('<d')
+# Offset of <accessed> in the slot header
+ACCESSED_OFFSET = 4 + 8 + 8
+
+
+def _hash(key):
+    # Hash must be the same in all processes, so builtin hash() is not used
+    return struct.unpack_from('<Q', hashlib.md5(key).digest())[0]
+
+
+class SharedCache(object):
+    """
+    Cache of SELECT responses shared between processes through
+    a memory-mapped file.
+    """
+
+    def __init__(self, path, size=CACHE_SIZE, slot_size=CACHE_SLOT_SIZE,
+                 ways=CACHE_WAYS, ttl=CACHE_TTL):
+        """
+        Open (or create) the cache file.
+        The layout of an existing file takes precedence over `size` and
+        `slot_size`.
+
+        :param path: cache file name; a file on tmpfs (e.g. /dev/shm)
+        avoids disk writes
+        :type path: str
+        :param size: cache file size (bytes)
+        :type size: int
+        :param slot_size: slot size (bytes), limits size of the cached
+        responses
+        :type slot_size: int
+        :param ways: number of slots in a set
+        :type ways: int
+        :param ttl: default time to live of cached responses (seconds)
+        :type ttl: float
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # space_no -> token appended to the keys of selects from the space,
+        # changed by writes to the space
+        self._generations = {}
+        self._file = open(path, 'a+b')
+        try:
+            self._flock()
+            try:
+                self._file.seek(0)
+                header = self._file.read(struct_file_header.size)
+                if len(header) == struct_file_header.size:
+                    magic, slot_size, slots = struct_file_header.unpack(header)
+                    if magic != CACHE_MAGIC:
+                        raise ValueError('%s is not a cache file' % path)
+                else:
+                    slots = (size - struct_file_header.size) // slot_size
+                    self._file.truncate(0)
+                    self._file.write(struct_file_header.pack(
+                        CACHE_MAGIC, slot_size, slots))
+                    self._file.truncate(
+                        struct_file_header.size + slots * slot_size)
+                    self._file.flush()
+            finally:
+                self._funlock()
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        except:
+            self._file.close()
+            raise
+        self.slot_size = slot_size
+        self.ways = min(ways, slots)
+        self._sets = slots // self.ways
+
+    def _flock(self):
+        self._lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    def _funlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._lock.release()
+
+    def _slots(self, key_hash):
+        """
+        Return offsets of the slots of the set for the hash
+        """
+        first = (key_hash % self._sets) * self.ways
+        return [struct_file_header.size + (first + i) * self.slot_size
+                for i in range(self.ways)]
+
+    def get_packet(self, key):
+        """
+        Look up the raw response
+
+        :param key: encoded request
+        :type key: bytes
+
+        :return: response header and body or None if the key is missing
+        :rtype: bytes
+        """
+        data = self._map
+        key_hash = _hash(key)
+        now = time.time()
+        for offset in self._slots(key_hash):
+            seq, slot_hash, expires, _, key_length, value_length = \
+                struct_slot_header.unpack_from(data, offset)
+            if seq & 1 or slot_hash != key_hash or expires < now:
+                continue
+            start = offset + struct_slot_header.size
+            stored_key = data[start:start + key_length]
+            value = data[start + key_length:
+                         start + key_length + value_length]
+            # The slot could be overwritten while it was read
+            if struct_seq.unpack_from(data, offset)[0] != seq:
+                continue
+            if stored_key != key:
+                continue
+            # Access time update is racy, but it only affects eviction order
+            struct_accessed.pack_into(data, offset + ACCESSED_OFFSET, now)
+            return value
+        return None
+
+    def get(self, key, field_types=None):
+        """
+        Look up the response
+
+        :param key: encoded request
+        :type key: bytes
+        :param field_types: Data types to be used for type conversion
+        :type field_types: tuple
+
+        :return: decoded response or None if the key is missing
+        :rtype: :class:`~tarantool.response.Response` instance
+        """
+        packet = self.get_packet(key)
+        if packet is None:
+            return None
+        return Response(packet[:12], packet[12:], field_types)
+
+    def set(self, key, packet, ttl=None):
+        """
+        Store the raw response
+
+        :param key: encoded request
+        :type key: bytes
+        :param packet: response header and body
+        :type packet: bytes
+        :param ttl: time to live (seconds), default is `ttl` of the cache
+        :type ttl: float
+
+        :return: False if the response is too large to be cached
+        :rtype: bool
+        """
+        if struct_slot_header.size + len(key) + len(packet) > \
+                self.slot_size:
+            return False
+        data = self._map
+        key_hash = _hash(key)
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+
+        self._flock()
+        try:
+            victim = None
+            victim_accessed = None
+            for offset in self._slots(key_hash):
+                seq, slot_hash, slot_expires, accessed, key_length, _ = \
+                    struct_slot_header.unpack_from(data, offset)
+                start = offset + struct_slot_header.size
+                if slot_hash == key_hash and \
+                        data[start:start + key_length] == key:
+                    victim = offset
+                    break
+                if slot_expires < now:
+                    # Free or expired slot
+                    accessed = 0
+                if victim is None or accessed < victim_accessed:
+                    victim, victim_accessed = offset, accessed
+
+            seq = struct_seq.unpack_from(data, victim)[0]
+            # Odd value marks the slot as being modified. It can be
+            # already odd if a writer has died, the lock guarantees that
+            # nobody else writes the slot now.
+            seq = (seq | 1) & 0x7fffffff
+            struct_seq.pack_into(data, victim, seq)
+            start = victim + struct_slot_header.size
+            data[start:start + len(key) + len(packet)] = key + packet
+            struct_slot_header.pack_into(
+                data, victim, seq, key_hash, expires, now, len(key),
+                len(packet))
+            struct_seq.pack_into(data, victim, seq + 1)
+        finally:
+            self._funlock()
+        return True
+
+    def invalidate(self, key):
+        """
+        Remove the key from the cache
+        """
+        self.set(key, b'', ttl=-1)
+
+    def generation(self, space_no):
+        """
+        :return: token to be appended to the keys of selects from the space
+        :rtype: bytes
+        """
+        return self._generations.get(space_no, b'')
+
+    def invalidate_space(self, space_no):
+        """
+        Hide the cached selects from the space from this process:
+        their keys change. Entries are not removed, they expire.
+        """
+        self._generations[space_no] = os.urandom(8)
+
+    def clear(self):
+        """
+        Remove all entries
+        """
+        self._flock()
+        try:
+            for n in range(self._sets * self.ways):
+                offset = struct_file_header.size + n * self.slot_size
+                seq = struct_seq.unpack_from(self._map, offset)[0]
+                struct_slot_header.pack_into(
+                    self._map, offset, ((seq | 1) & 0x7fffffff) + 1,
+                    0, 0, 0, 0, 0)
+        finally:
+            self._funlock()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
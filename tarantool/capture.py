@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides recording of the wire traffic of a
+:class:`~tarantool.connection.Connection` and replaying of the recorded
+traffic against a server.
+
+Log file format::
+
+    <log>    ::= <magic><record>*
+    <record> ::= <timestamp><request_length><response_length>
+                 <request><response>
+
+where ``<timestamp>`` is a little-endian double (seconds since the epoch,
+time the request was sent), lengths are 32-bit unsigned integers,
+``<request>`` is the packet built by the
+:class:`~tarantool.request.Request` and ``<response>`` is the response
+header followed by the response body.
+"""
+import collections
+import struct
+import threading
+import time
+
+from tarantool.connection import Connection
+from tarantool.request import Request
+from tarantool.const import SOCKET_TIMEOUT
+from tarantool.error import DatabaseError, NetworkError
+
+
+LOG_MAGIC = b'TNTCAP01'
+
+struct_dLL = struct.Struct('<dLL')
+
+
+Record = collections.namedtuple(
+    'Record', ('timestamp', 'request', 'response'))
+
+ReplayResult = collections.namedtuple(
+    'ReplayResult', ('requests', 'errors', 'elapsed'))
+
+
+class RequestRaw(Request):
+    """
+    Represents a request which is already encoded (e.g. read from the log)
+    """
+
+    def __init__(self, packet):
+        self._bytes = packet
+
+
+class Recorder(object):
+    """
+    Appends every request sent through a connection and the matching
+    response to a binary log file.
+
+    Pass an instance as `recorder` argument of
+    :class:`~tarantool.connection.Connection` to enable recording.
+    A single recorder can be shared by several connections.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: log file name, records are appended to the file
+        :type path: str
+        """
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(LOG_MAGIC)
+        self._lock = threading.Lock()
+
+    def record(self, timestamp, request, header, body):
+        """
+        Write single request/response pair to the log
+
+        :param float timestamp: time the request was sent
+        :param bytes request: request packet
+        :param bytes header: response header
+        :param bytes body: response body
+        """
+        length = len(header) + len(body)
+        with self._lock:
+            self._file.write(
+                struct_dLL.pack(timestamp, len(request), length) +
+                request + header + body)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_log(path):
+    """
+    Iterate over the records of the log file
+
+    :param path: log file name
+    :type path: str
+
+    :rtype: iterator over :class:`Record` instances
+    """
+    with open(path, 'rb') as log:
+        if log.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError('%s is not a traffic log' % path)
+        while True:
+            prefix = log.read(struct_dLL.size)
+            if len(prefix) < struct_dLL.size:
+                # Truncated record at the end is possible if the recording
+                # process was killed; ignore it
+                return
+            timestamp, request_length, response_length = \
+                struct_dLL.unpack(prefix)
+            request = log.read(request_length)
+            response = log.read(response_length)
+            if len(response) < response_length:
+                return
+            yield Record(timestamp, request, response)
+
+
+def replay(path, host, port, connections=1, speed=1.0,
+           socket_timeout=SOCKET_TIMEOUT):
+    """
+    Re-issue requests from the log against the server.
+
+    Requests are distributed over the connections in a round-robin manner,
+    each connection is served by a separate thread.
+
+    :param path: log file name
+    :type path: str
+    :param str host: Server hostname or IP-address
+    :param int port: Server port
+    :param connections: number of concurrent connections
+    :type connections: int
+    :param speed: replay speed factor relative to the recorded traffic
+    (``2.0`` is twice as fast); ``None`` sends requests as fast as possible
+    :type speed: float or None
+
+    :rtype: :class:`ReplayResult` instance
+    :raise: `NetworkError` (or another exception) which stopped one of
+    the connections, after all connections are finished
+    """
+    assert connections > 0
+    assert speed is None or speed > 0
+
+    records = list(read_log(path))
+    if not records:
+        return ReplayResult(0, 0, 0.0)
+
+    origin = records[0].timestamp
+    conns = [Connection(host, port, socket_timeout=socket_timeout)
+             for _ in range(connections)]
+    sent = [0] * connections
+    errors = [0] * connections
+    # Exceptions which stopped the workers
+    failures = [None] * connections
+    started = time.time()
+
+    def worker(n):
+        try:
+            for record in records[n::connections]:
+                if speed is not None:
+                    delay = started + (record.timestamp - origin) / speed - \
+                        time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                try:
+                    conns[n]._send_request(RequestRaw(record.request))
+                except NetworkError:
+                    raise
+                except DatabaseError:
+                    errors[n] += 1
+                sent[n] += 1
+        except Exception as e:
+            failures[n] = e
+
+    threads = [threading.Thread(target=worker, args=(n, ))
+               for n in range(connections)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for conn in conns:
+            conn.close()
+
+    for failure in failures:
+        if failure is not None:
+            raise failure
+    return ReplayResult(sum(sent), sum(errors), time.time() - started)
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`Compressed`: field type for large string
+fields (e.g. JSON documents) which are compressed with zlib on the client.
+
+Use an instance in place of a type in ``field_types``; values of the field
+are compressed by INSERT requests and by '=' operations of UPDATE requests
+and decompressed when the field of the response is accessed::
+
+    >>> docs = connection.space(0, field_types=(int, Compressed(unicode)))
+    >>> docs.insert((1, json.dumps(document)))
+    >>> json.loads(docs.select(1)[0][1].value)
+
+Fields are decoded as :class:`LazyField` instances whatever the size of
+the value; with ``Compressed(lazy=False)`` they are decoded as strings.
+
+Values shorter than the threshold and values which do not shrink are
+stored as is. A compressed value starts with the marker byte ``0x01``;
+a stored value starting with ``0x00`` or ``0x01`` is escaped with
+``0x00``, so values written without compression are read back unchanged
+unless they start with these bytes.
+
+Command line benchmark of the size/CPU tradeoff::
+
+    python -m tarantool.compression --sizes 5 20 50 --levels 1 6 9
+"""
+import sys
+import time
+import zlib
+
+from tarantool._compat import bytes, unicode
+
+
+# Default minimum size of a compressed value (bytes)
+COMPRESS_THRESHOLD = 1024
+
+# Default zlib compression level
+COMPRESS_LEVEL = 6
+
+MARKER_RAW = b'\x00'
+MARKER_ZLIB = b'\x01'
+
+
+class LazyField(object):
+    """
+    Value of a compressed field of a response, decoded (decompressed if
+    needed) on the first access to :attr:`value`. Comparison, hashing,
+    ``len()`` and other attributes are delegated to the decoded value.
+    """
+
+    __slots__ = ('_data', '_cast_to', '_value')
+
+    def __init__(self, data, cast_to=bytes):
+        """
+        :param data: value as stored in the database
+        :type data: bytes
+        :param cast_to: type of the value (bytes or unicode)
+        """
+        self._data = data
+        self._cast_to = cast_to
+        self._value = None
+
+    @property
+    def value(self):
+        """
+        Decoded value
+        """
+        if self._value is None:
+            self._value = _decode(self._cast_to, self._data)
+        return self._value
+
+    @property
+    def compressed(self):
+        """
+        :type: bool
+
+        True if the value is stored compressed
+        """
+        return self._data[:1] == MARKER_ZLIB
+
+    @property
+    def compressed_size(self):
+        """
+        :type: int
+
+        Size of the value as stored in the database (bytes)
+        """
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyField):
+            other = other.value
+        return self.value == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __len__(self):
+        return len(self.value)
+
+    def __bytes__(self):
+        value = self.value
+        return value.encode('utf-8') if isinstance(value, unicode) else value
+
+    def __str__(self):
+        return str(self.value)
+
+    def __getattr__(self, name):
+        return getattr(self.value, name)
+
+    def __repr__(self):
+        return '<LazyField %d bytes%s>' % (
+            len(self._data), ' compressed' if self.compressed else '')
+
+
+def _cast(cast_to, value):
+    if cast_to is unicode:
+        return value.decode('utf-8', 'replace')
+    return value
+
+
+def _decode(cast_to, value):
+    marker = value[:1]
+    if marker == MARKER_ZLIB:
+        return _cast(cast_to, zlib.decompress(value[1:]))
+    if marker == MARKER_RAW:
+        value = value[1:]
+    return _cast(cast_to, bytes(value))
+
+
+class Compressed(object):
+    """
+    Field type of string fields compressed with zlib on the client
+    """
+
+    def __init__(self, cast_to=bytes, threshold=COMPRESS_THRESHOLD,
+                 level=COMPRESS_LEVEL, lazy=True):
+        """
+        :param cast_to: type of the values: bytes or unicode (str for py3k)
+        :param threshold: values shorter than this are not compressed
+        (bytes)
+        :type threshold: int
+        :param level: zlib compression level (1..9)
+        :type level: int
+        :param lazy: values are decoded as :class:`LazyField` instances
+        decompressed on access, rather than as strings decompressed while
+        the response is decoded
+        :type lazy: bool
+        """
+        if cast_to not in (bytes, unicode):
+            raise TypeError('Invalid field type %s' % cast_to)
+        self.cast_to = cast_to
+        self.threshold = threshold
+        self.level = level
+        self.lazy = lazy
+
+    def encode(self, value):
+        """
+        Compress the value to be sent to the server
+
+        :param value: value of the field
+        :type value: bytes or unicode
+
+        :return: value as stored in the database; values of other types
+        are returned as is
+        :rtype: bytes
+        """
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        elif not isinstance(value, bytes):
+            return value
+        if len(value) >= self.threshold:
+            compressed = zlib.compress(value, self.level)
+            if len(compressed) + 1 < len(value):
+                return MARKER_ZLIB + compressed
+        if value[:1] in (MARKER_RAW, MARKER_ZLIB):
+            return MARKER_RAW + value
+        return value
+
+    def decode(self, value):
+        """
+        Decode the field of a response
+
+        :param value: value as stored in the database
+        :type value: bytes
+
+        :return: :class:`LazyField` if `lazy` is set (whether the value
+        is compressed or not), otherwise the decoded value
+        """
+        if self.lazy:
+            return LazyField(bytes(value), self.cast_to)
+        return _decode(self.cast_to, value)
+
+    def __repr__(self):
+        return 'Compressed(%s)' % getattr(
+            self.cast_to, '__name__', self.cast_to)
+
+
+def _field_type(field_types, field_no):
+    # The last type is applied to the rest of the fields
+    return field_types[min(field_no, len(field_types) - 1)]
+
+
+def compresses(field_types):
+    """
+    :return: True if some of the fields are compressed
+    :rtype: bool
+    """
+    return bool(field_types) and \
+        not isinstance(field_types[0], (list, tuple)) and \
+        any(isinstance(t, Compressed) for t in field_types)
+
+
+def encode_values(values, field_types):
+    """
+    Compress values of the compressed fields of the tuple
+
+    :param values: tuple to be inserted
+    :type values: tuple
+    :param field_types: types of the fields
+    :type field_types: tuple
+
+    :rtype: tuple
+    """
+    if not compresses(field_types):
+        return values
+    result = []
+    for field_no, value in enumerate(values):
+        field_type = _field_type(field_types, field_no)
+        if isinstance(field_type, Compressed):
+            value = field_type.encode(value)
+        result.append(value)
+    return tuple(result)
+
+
+def encode_operations(op_list, field_types):
+    """
+    Compress arguments of '=' operations on the compressed fields
+
+    :param op_list: list of UPDATE operations
+    :type op_list: list of tuples (field_no, op_symbol, op_arg)
+
+    :rtype: list
+    """
+    if not compresses(field_types):
+        return op_list
+    result = []
+    for op in op_list:
+        field_type = _field_type(field_types, op[0])
+        if op[1] == '=' and isinstance(field_type, Compressed):
+            op = (op[0], op[1], field_type.encode(op[2]))
+        result.append(op)
+    return result
+
+
+def make_payload(size, seed=0):
+    """
+    Build a JSON document of about `size` bytes resembling typical stored
+    documents: records of ids, timestamps, enumerations and text
+
+    :rtype: bytes
+    """
+    import random
+
+    rnd = random.Random(seed)
+    words = ['status', 'active', 'pending', 'user', 'order', 'item', 'price',
+             'delivery', 'address', 'comment', 'payment', 'discount']
+    records = []
+    length = 2
+    while length < size:
+        record = (
+            '{"id": %d, "created": %d, "status": "%s", "tags": ["%s", "%s"], '
+            '"amount": %.2f, "note": "%s"}' % (
+                rnd.randint(1, 10 ** 9), 1600000000 + rnd.randint(0, 10 ** 8),
+                rnd.choice(words), rnd.choice(words), rnd.choice(words),
+                rnd.random() * 1000,
+                ' '.join(rnd.choice(words) for _ in range(rnd.randint(3, 12)))))
+        records.append(record)
+        length += len(record) + 2
+    return ('[' + ', '.join(records) + ']').encode('utf-8')
+
+
+def benchmark(sizes=(5, 20, 50), levels=(1, 6, 9), repeat=200):
+    """
+    Measure compression ratio and speed on generated JSON documents
+
+    :param sizes: document sizes (kilobytes)
+    :param levels: zlib compression levels
+    :param repeat: number of compressions of each document
+
+    :return: list of tuples (size, level, ratio, compression time,
+    decompression time), times are per document (seconds)
+    :rtype: list
+    """
+    results = []
+    for size in sizes:
+        payload = make_payload(size * 1024, seed=size)
+        for level in levels:
+            started = time.time()
+            for _ in range(repeat):
+                compressed = zlib.compress(payload, level)
+            compress_time = (time.time() - started) / repeat
+            started = time.time()
+            for _ in range(repeat):
+                zlib.decompress(compressed)
+            decompress_time = (time.time() - started) / repeat
+            results.append((size, level, float(len(compressed)) / len(payload),
+                            compress_time, decompress_time))
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tarantool.compression',
+        description='Measure the size/CPU tradeoff of field compression')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 20, 50],
+                        help='document sizes, KB (default: 5 20 50)')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9],
+                        help='zlib levels (default: 1 6 9)')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    sys.stdout.write('%8s %6s %8s %14s %14s\n' % (
+        'size KB', 'level', 'ratio', 'compress MB/s', 'decompress MB/s'))
+    for size, level, ratio, compress_time, decompress_time in benchmark(
+            args.sizes, args.levels, args.repeat):
+        megabytes = size / 1024.0
+        sys.stdout.write('%8d %6d %8.3f %14.1f %14.1f\n' % (
+            size, level, ratio, megabytes / compress_time,
+            megabytes / decompress_time))
+
+
+if __name__ == '__main__':
+    main()
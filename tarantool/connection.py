@@ -2,28 +2,60 @@
 """
 This module provides low-level API for Tarantool
 """
+import itertools
 import struct
-import ctypes
 import socket
+import threading
 import time
+import weakref
 
 from tarantool._compat import bytes, basestring
 
-from tarantool.response import Response
+from tarantool.response import Response, RawResponse, FixedLayout
+from tarantool.compression import encode_values, encode_operations
 from tarantool.request import (
     Request, RequestCall, RequestDelete, RequestInsert, RequestSelect,
     RequestUpdate)
 from tarantool.space import Space
+from tarantool.transport import TCPTransport, UnixTransport
 from tarantool.const import (
-    struct_LLL,
+    struct_L, struct_LLL,
+    REQUEST_TYPE_DELETE, REQUEST_TYPE_INSERT, REQUEST_TYPE_UPDATE,
     SOCKET_TIMEOUT, RECONNECT_MAX_ATTEMPTS, RECONNECT_DELAY,
-    RETRY_MAX_ATTEMPTS
+    RETRY_MAX_ATTEMPTS, PIPELINE_WINDOW, SELECT_CHUNKS_IN_FLIGHT,
+    READ_CHUNK_SIZE, BUDGET_STREAM, BUDGET_DROP, PRIORITY_INTERACTIVE,
+    PRIORITY_BULK, BULK_SELECT_KEYS
 )
 from tarantool.error import (
-    DatabaseError, NetworkError, RetryWarning, NetworkWarning, warn
+    DatabaseError, NetworkError, ResponseTooLargeError, RetryWarning,
+    NetworkWarning, warn
 )
 
 
+def insert_request(space_no, values, return_tuple=False, field_types=None):
+    """
+    Build INSERT request: values of the compressed fields are compressed,
+    :class:`~tarantool.response.FixedLayout` packs the tuple
+
+    :rtype: :class:`~tarantool.request.RequestInsert` instance
+    """
+    values = encode_values(values, field_types)
+    layout = field_types if isinstance(field_types, FixedLayout) else None
+    return RequestInsert(space_no, values, return_tuple, layout)
+
+
+def update_request(space_no, key, op_list, return_tuple=False,
+                   field_types=None):
+    """
+    Build UPDATE request: arguments of '=' operations on the compressed
+    fields are compressed
+
+    :rtype: :class:`~tarantool.request.RequestUpdate` instance
+    """
+    op_list = encode_operations(op_list, field_types)
+    return RequestUpdate(space_no, key, op_list, return_tuple)
+
+
 class Connection(object):
     """
     Represents connection to the Tarantool server.
@@ -34,26 +66,120 @@ class Connection(object):
     (insert/delete/update/select).
     """
 
-    def __init__(self, host, port,
+    def __init__(self, host=None, port=None,
                  socket_timeout=SOCKET_TIMEOUT,
                  reconnect_max_attempts=RECONNECT_MAX_ATTEMPTS,
                  reconnect_delay=RECONNECT_DELAY,
-                 connect_now=True):
+                 connect_now=True,
+                 recorder=None,
+                 transport=None,
+                 max_select_keys=None,
+                 select_cache=None,
+                 limiter=None,
+                 sampler=None,
+                 max_response_bytes=None,
+                 max_rows=None,
+                 memory_budget=None,
+                 budget_policy=BUDGET_STREAM,
+                 bulk_select_keys=BULK_SELECT_KEYS,
+                 unix_socket=None):
         """
         Initialize a connection to the server.
 
         :param str host: Server hostname or IP-address
-        :param int port: Server port
+        :param int port: Server port, required unless `unix_socket` or
+        `transport` is passed
         :param bool connect_now: if True (default) than __init__() actually
         creates network connection. If False than you have to call
         connect() manualy.
+        :param recorder: if passed, every request and the matching response
+        are written to the traffic log
+        :type recorder: :class:`~tarantool.capture.Recorder` instance
+        :param transport: transport used to reach the server instead of
+        the one derived from `host` and `port`
+        :type transport: :class:`~tarantool.transport.Transport` instance
+        :param max_select_keys: maximum number of keys sent in a single
+        SELECT request; larger key lists are split into chunks (see
+        :meth:`select`). None means no limit.
+        :type max_select_keys: int
+        :param select_cache: if passed, responses to SELECT requests are
+        cached and looked up there before sending the request. Writes
+        through the connection invalidate the cached selects from
+        the written space for this process only, other changes are seen
+        when the entries expire (see :mod:`tarantool.cache`)
+        :type select_cache: :class:`~tarantool.cache.SharedCache` instance
+        :param limiter: if passed, the number of requests in flight (both
+        waiting for the connection and pipelined) is limited by it
+        :type limiter: :class:`~tarantool.limiter.ConcurrencyLimiter`
+        instance
+        :param sampler: if passed, accessed keys and procedures of
+        the sampled requests are accounted by it
+        :type sampler: :class:`~tarantool.sampler.AccessSampler` instance
+        :param max_response_bytes: maximum size of a response body (bytes);
+        larger responses are discarded with `ResponseTooLargeError`.
+        None means no limit.
+        :type max_response_bytes: int
+        :param max_rows: maximum number of tuples in a response; larger
+        responses are discarded with `ResponseTooLargeError`.
+        None means no limit.
+        :type max_rows: int
+        :param memory_budget: maximum total size of the bodies of
+        the responses returned by the connection and still referenced
+        (bytes). None means no limit.
+        :type memory_budget: int
+        :param budget_policy: what to do with a response exceeding
+        the memory budget: ``'stream'`` (spool the tuples to a temporary
+        file and return :class:`~tarantool.dump.StreamedResponse`) or
+        ``'drop'`` (discard it with `ResponseTooLargeError`)
+        :type budget_policy: str
+        :param bulk_select_keys: maximum number of keys sent in a single
+        SELECT request of bulk priority (see :meth:`select`)
+        :type bulk_select_keys: int
+        :param str unix_socket: path to the server unix socket; if passed
+        `host` and `port` are ignored
         """
         self.host = host
         self.port = port
+        self.unix_socket = unix_socket
+        if transport is None:
+            if unix_socket is not None:
+                transport = UnixTransport(unix_socket)
+            elif host is None or port is None:
+                raise ValueError('Both host and port are required, pass '
+                                 'unix_socket to connect to a unix socket')
+            else:
+                transport = TCPTransport(host, port)
+        self.transport = transport
         self.socket_timeout = socket_timeout
         self.reconnect_delay = reconnect_delay
         self.reconnect_max_attempts = reconnect_max_attempts
+        self.recorder = recorder
+        self.max_select_keys = max_select_keys
+        self.bulk_select_keys = bulk_select_keys
+        self.select_cache = select_cache
+        self.limiter = limiter
+        self.sampler = sampler
+        self.max_response_bytes = max_response_bytes
+        self.max_rows = max_rows
+        if budget_policy not in (BUDGET_STREAM, BUDGET_DROP):
+            raise ValueError('Invalid budget policy %r' % budget_policy)
+        self.memory_budget = memory_budget
+        self.budget_policy = budget_policy
+        #: Total size of the bodies of the referenced responses (bytes),
+        #: tracked if `memory_budget` is set
+        self.memory_used = 0
+        self._memory_lock = threading.Lock()
+        # Weak references to the accounted responses (by id)
+        self._tracked = {}
         self._socket = None
+        # Connected socket swapped in when the active one fails
+        # (maintained by tarantool.keepalive.KeepaliveMonitor)
+        self._standby = None
+        # Time of the last request, used to find idle connections
+        self._last_used = time.time()
+        # Serializes access to the socket when the connection is shared
+        # by several threads
+        self._lock = threading.RLock()
         if connect_now:
             self.connect()
 
@@ -61,12 +187,16 @@ class Connection(object):
         """
         Close connection to the server
         """
-        self._socket.close()
-        self._socket = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._standby is not None:
+            self._standby.close()
+            self._standby = None
 
     def connect(self):
         """
-        Create connection to the host and port specified in __init__().
+        Create connection using the transport specified in __init__().
         Usually there is no need to call this method directly,
         since it is called when you create an `Connection` instance.
 
@@ -77,33 +207,73 @@ class Connection(object):
             # If old socket already exists - close it and re-create
             if self._socket:
                 self._socket.close()
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._socket.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
-            self._socket.settimeout(self.socket_timeout)
-            self._socket.connect((self.host, self.port))
+                self._socket = None
+            self._socket = self.transport.open(self.socket_timeout)
         except (socket.error, socket.timeout) as e:
             raise NetworkError(e)
 
-    def _read_response(self):
+    def _read_response(self, max_bytes=None, max_rows=None, spool=True):
         """
         Read response from the transport (socket)
 
-        :return: tuple of the form (header, body)
-        :rtype: tuple of two byte arrays
+        :param max_bytes: maximum size of the body
+        :type max_bytes: int
+        :param max_rows: maximum number of tuples
+        :type max_rows: int
+        :param spool: if False, the response exceeding the memory budget
+        is discarded regardless of `budget_policy`
+        :type spool: bool
+
+        :return: tuple of the form (header, body); body is a pair
+        (<return_code><count>, temporary file name) if the response is
+        spooled to the file because of the memory budget
+        :rtype: tuple
+        :raise: `ResponseTooLargeError` if the response exceeds the limits
+        (the body is read and discarded)
         """
-        # Read response header
+        # Read response header, it can arrive in several segments
         header = self._socket.recv(12)
-
-        # Immediately raises an exception if the data cannot be read
-        if len(header) != 12:
-            raise socket.error(socket.errno.ECONNABORTED,
-                               'Software caused connection abort')
+        while len(header) < 12:
+            chunk = self._socket.recv(12 - len(header))
+            # Immediately raises an exception if the data cannot be read
+            if chunk == b'':
+                raise socket.error(socket.errno.ECONNABORTED,
+                                   'Software caused connection abort')
+            header += chunk
 
         # Extract body length from header
         length = struct.unpack('<L', header[4:8])[0]
 
-        # Unpack body if it is not empty (i.e. not PING)
-        buff_body = ctypes.create_string_buffer(length)
+        if max_bytes is None and max_rows is None and \
+                self.memory_budget is None:
+            # Read body if it is not empty (i.e. not PING)
+            return header, self._recv_exactly(length)
+
+        # <return_code><count> of a successful response tells the number
+        # of tuples before the tuples are read
+        head = self._recv_exactly(min(length, 8))
+        success = length > 8 and head[:4] == b'\x00\x00\x00\x00'
+        error = None
+        if max_rows is not None and success and \
+                struct_L.unpack_from(head, 4)[0] > max_rows:
+            error = 'Response of %d tuples exceeds the limit of %d' % (
+                struct_L.unpack_from(head, 4)[0], max_rows)
+        elif max_bytes is not None and length > max_bytes:
+            error = 'Response of %d bytes exceeds the limit of %d' % (
+                length, max_bytes)
+        elif self.memory_budget is not None and success and \
+                self.memory_used + length > self.memory_budget:
+            if spool and self.budget_policy == BUDGET_STREAM:
+                return header, (head, self._spool_body(length - 8))
+            error = 'Response of %d bytes exceeds the memory budget ' \
+                    '(%d of %d bytes in use)' % (
+                        length, self.memory_used, self.memory_budget)
+        if error is not None:
+            self._drain(length - len(head))
+            raise ResponseTooLargeError(error, struct_LLL.unpack(header)[2])
+        return header, head + self._recv_exactly(length - len(head))
+
+    def _recv_exactly(self, length):
         chunks = []
         while length:
             chunk = self._socket.recv(length)
@@ -112,10 +282,75 @@ class Connection(object):
                                    'Software caused connection abort')
             length -= len(chunk)
             chunks.append(chunk)
-        buff_body.value = b''.join(chunks)
-        return header, buff_body
+        return b''.join(chunks)
+
+    def _drain(self, length):
+        """
+        Read and discard `length` bytes, so the next response can be read
+        """
+        while length:
+            chunk = self._socket.recv(min(length, READ_CHUNK_SIZE))
+            if chunk == b'':
+                raise socket.error(socket.errno.ECONNABORTED,
+                                   'Software caused connection abort')
+            length -= len(chunk)
+
+    def _spool_body(self, length):
+        """
+        Copy `length` bytes of tuples to a temporary dump file
+
+        :return: file name
+        :rtype: str
+        """
+        # Imported here since spooling is rare
+        import os
+        import tempfile
+        from tarantool.dump import DUMP_MAGIC
+
+        fd, path = tempfile.mkstemp(prefix='tarantool-', suffix='.dump')
+        try:
+            with os.fdopen(fd, 'wb') as spool:
+                spool.write(DUMP_MAGIC)
+                while length:
+                    chunk = self._socket.recv(min(length, READ_CHUNK_SIZE))
+                    if chunk == b'':
+                        raise socket.error(
+                            socket.errno.ECONNABORTED,
+                            'Software caused connection abort')
+                    spool.write(chunk)
+                    length -= len(chunk)
+        except:
+            os.unlink(path)
+            raise
+        return path
+
+    def _make_response(self, header, body, field_types, response_class):
+        """
+        Parse the response read by _read_response() and account its size
+        in the memory budget
+        """
+        if isinstance(body, tuple):
+            from tarantool.dump import StreamedResponse
+            return StreamedResponse(header, body[0], body[1], field_types)
+        response = response_class(header, body, field_types)
+        if self.memory_budget is not None:
+            self._track_memory(response, len(body))
+        return response
 
-    def _send_request_wo_reconnect(self, request, field_types=None):
+    def _track_memory(self, response, size):
+        def release(ref):
+            with self._memory_lock:
+                self.memory_used -= size
+                self._tracked.pop(id(ref), None)
+
+        with self._memory_lock:
+            self.memory_used += size
+            ref = weakref.ref(response, release)
+            self._tracked[id(ref)] = ref
+
+    def _send_request_wo_reconnect(self, request, field_types=None,
+                                   response_class=Response,
+                                   limits=(None, None)):
         """
         :rtype: `Response` instance
 
@@ -127,42 +362,147 @@ class Connection(object):
         # returns completion_status == 1 (try again)
         for attempt in range(RETRY_MAX_ATTEMPTS):
             try:
+                sent_at = time.time()
                 self._socket.sendall(bytes(request))
-                header, body = self._read_response()
-                response = Response(header, body, field_types)
+                try:
+                    header, body = self._read_response(
+                        limits[0], limits[1], response_class is Response)
+                except ResponseTooLargeError as e:
+                    self._check_request_id(request, e.request_id)
+                    raise
+                self._check_request_id(
+                    request, struct_LLL.unpack_from(header)[2])
             except (socket.error, socket.timeout) as e:
                 raise NetworkError(e)
+            # Errors of the recorder are not network errors, the request
+            # must not be resent because of them
+            if self.recorder is not None and not isinstance(body, tuple):
+                self.recorder.record(sent_at, bytes(request), header, body)
+            response = self._make_response(
+                header, body, field_types, response_class)
 
             if response.completion_status != 1:
+                if self.sampler is not None:
+                    self.sampler.sample(request, response)
                 return response
             warn(response.return_message, RetryWarning)
+            if self.limiter is not None:
+                self.limiter.overload()
 
         # Raise an error if the maximum number of attempts have been made
         raise DatabaseError(response.return_code, response.return_message)
 
-    def _send_request(self, request, field_types=None):
+    @staticmethod
+    def _check_request_id(request, request_id):
+        """
+        Check that the response belongs to the request; otherwise
+        the stream is out of sync and the connection must be reopened
+
+        :raise: `socket.error`
+        """
+        if request_id != request.request_id:
+            raise socket.error(
+                socket.errno.EPROTO,
+                'Response to request id %d instead of %d' % (
+                    request_id, request.request_id))
+
+    def _send_request(self, request, field_types=None,
+                      response_class=Response, max_response_bytes=None,
+                      max_rows=None):
         """
         Send the request to the server through the socket.
         Return an instance of `Response` class.
 
         :param request: object representing a request
         :type request: `Request` instance
-
-        :rtype: `Response` instance
+        :param response_class: class used to parse the response
+        (e.g. :class:`~tarantool.response.RawResponse`)
+        :type response_class: `Response` subclass
+        :param max_response_bytes: maximum size of the response body,
+        default is `max_response_bytes` of the connection
+        :type max_response_bytes: int
+        :param max_rows: maximum number of tuples in the response,
+        default is `max_rows` of the connection
+        :type max_rows: int
+
+        :rtype: `Response` instance (or
+        :class:`~tarantool.dump.StreamedResponse` if the response exceeds
+        the memory budget)
+        :raise: `OverloadError` if the request is rejected by the limiter;
+        `ResponseTooLargeError` if the response exceeds the limits
         """
         assert isinstance(request, Request)
 
+        limits = (
+            self.max_response_bytes if max_response_bytes is None
+            else max_response_bytes,
+            self.max_rows if max_rows is None else max_rows)
+        if self.limiter is None:
+            with self._lock:
+                return self._send_request_with_reconnect(
+                    request, field_types, response_class, limits)
+
+        self.limiter.acquire()
+        rtt = None
+        try:
+            # Time spent waiting for the connection lock is a part of RTT,
+            # this is the queue the limiter keeps short
+            started = time.time()
+            with self._lock:
+                response = self._send_request_with_reconnect(
+                    request, field_types, response_class, limits)
+            rtt = time.time() - started
+            return response
+        finally:
+            self.limiter.release(rtt)
+
+    def _send_request_with_reconnect(self, request, field_types,
+                                     response_class, limits=(None, None)):
+        """
+        Send the request reconnecting on network errors.
+        Must be called with the connection lock held.
+        """
+        self._last_used = time.time()
+        if self.select_cache is not None:
+            try:
+                return self._send_request_attempts(
+                    request, field_types, response_class, limits)
+            finally:
+                # Even a failed request could be applied by the server
+                self._invalidate_cache(request)
+        return self._send_request_attempts(
+            request, field_types, response_class, limits)
+
+    def _invalidate_cache(self, request):
+        """
+        Invalidate the cached selects from the space written by
+        the request
+        """
+        if request.request_type in (REQUEST_TYPE_INSERT, REQUEST_TYPE_UPDATE,
+                                    REQUEST_TYPE_DELETE):
+            self.select_cache.invalidate_space(
+                struct_L.unpack_from(bytes(request), 12)[0])
+
+    def _send_request_attempts(self, request, field_types, response_class,
+                               limits):
         connected = True
         attempt = 1
         while True:
             try:
                 if not connected:
-                    time.sleep(self.reconnect_delay)
-                    self.connect()
+                    if self._swap_standby():
+                        warn('Switched to the standby connection',
+                             NetworkWarning)
+                    else:
+                        time.sleep(self.reconnect_delay)
+                        self.connect()
+                        warn('Successfully reconnected', NetworkWarning)
                     connected = True
-                    warn('Successfully reconnected', NetworkWarning)
+                elif self._socket is None:
+                    # Closed after an interrupted pipeline or by close()
+                    self.connect()
                 response = self._send_request_wo_reconnect(
-                    request, field_types)
+                    request, field_types, response_class, limits)
                 break
             except NetworkError as e:
                 if attempt > self.reconnect_max_attempts:
@@ -175,6 +515,185 @@ class Connection(object):
 
         return response
 
+    def _swap_standby(self):
+        """
+        Replace the socket with the standby one if it exists.
+        Must be called with the connection lock held.
+
+        :return: True if the socket is replaced
+        :rtype: bool
+        """
+        standby, self._standby = self._standby, None
+        if standby is None:
+            return False
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = standby
+        return True
+
+    def _send_requests(self, requests, window=PIPELINE_WINDOW,
+                       field_types=None):
+        """
+        Send several requests through the socket without waiting for
+        the response to each of them (pipelining).
+        At most `window` requests are kept in flight, requests are taken
+        from `requests` lazily.
+
+        Responses are matched to requests using `request_id`, so the
+        `request_id` of the passed requests is overwritten.
+        Requests are not resent after reconnect since it is unknown which
+        of them have been applied by the server.
+        Responses exceeding the memory budget are not spooled, they are
+        discarded with `ResponseTooLargeError` regardless of
+        `budget_policy`.
+
+        :param requests: requests to send
+        :type requests: iterable of `Request` instances
+        :param window: maximum number of requests in flight
+        :type window: int
+
+        :return: iterator over pairs (request, result) in order of
+        completion, where result is a `Response` instance or
+        a `DatabaseError` instance if the request failed
+        :rtype: iterator
+
+        :raise: NetworkError
+        """
+        assert window > 0
+
+        with self._lock:
+            self._last_used = time.time()
+            if self._socket is None:
+                self.connect()
+            pipeline = self._pipeline(requests, window, field_types)
+            try:
+                for result in pipeline:
+                    yield result
+            finally:
+                # Unread responses are handled while the lock is held
+                pipeline.close()
+
+    def _pipeline(self, requests, window, field_types):
+        """
+        Implementation of _send_requests().
+        Must be called with the connection lock held.
+        """
+        requests = iter(requests)
+        in_flight = {}
+        request_id = 0
+        exhausted = False
+        limiter = self.limiter
+        try:
+            while True:
+                packets = []
+                sent_at = time.time()
+                while not exhausted and len(in_flight) < window:
+                    # Wait for a slot only if nothing is in flight,
+                    # otherwise read responses first
+                    if limiter is not None and \
+                            not limiter.acquire(wait=not in_flight):
+                        break
+                    request = None
+                    try:
+                        request = next(requests)
+                    except StopIteration:
+                        exhausted = True
+                    finally:
+                        if request is None and limiter is not None:
+                            # No request takes the slot
+                            limiter.release()
+                    if exhausted:
+                        break
+                    assert isinstance(request, Request)
+                    request_id = request_id % 0xffffffff + 1
+                    request.request_id = request_id
+                    in_flight[request_id] = [request, sent_at, 1]
+                    packets.append(bytes(request))
+                if packets:
+                    self._sendall(b''.join(packets))
+                if not in_flight:
+                    return
+
+                try:
+                    header, body = self._read_response(
+                        self.max_response_bytes, self.max_rows, False)
+                except ResponseTooLargeError as e:
+                    request, sent_at, _ = self._pop_in_flight(
+                        in_flight, e.request_id)
+                    if limiter is not None:
+                        limiter.release(time.time() - sent_at)
+                    yield request, e
+                    continue
+                except (socket.error, socket.timeout) as e:
+                    raise NetworkError(e)
+                request, sent_at, attempt = self._pop_in_flight(
+                    in_flight, struct_LLL.unpack(header)[2])
+                if self.select_cache is not None:
+                    self._invalidate_cache(request)
+                if self.recorder is not None:
+                    self.recorder.record(
+                        sent_at, bytes(request), header, body)
+                try:
+                    response = self._make_response(
+                        header, body, field_types, Response)
+                except DatabaseError as e:
+                    if limiter is not None:
+                        limiter.release(time.time() - sent_at)
+                    yield request, e
+                    continue
+
+                if response.completion_status == 1:
+                    warn(response.return_message, RetryWarning)
+                    if limiter is not None:
+                        limiter.overload()
+                    if attempt < RETRY_MAX_ATTEMPTS:
+                        in_flight[request.request_id] = \
+                            [request, time.time(), attempt + 1]
+                        self._sendall(bytes(request))
+                        continue
+                    if limiter is not None:
+                        limiter.release()
+                    yield request, DatabaseError(
+                        response.return_code, response.return_message)
+                    continue
+
+                if limiter is not None:
+                    limiter.release(time.time() - sent_at)
+                if self.sampler is not None:
+                    self.sampler.sample(request, response)
+                yield request, response
+        finally:
+            if in_flight and self._socket is not None:
+                # The pipeline is interrupted (the generator is closed or
+                # an error is raised): responses left on the socket would
+                # be read by the next request. The socket is closed, so
+                # the next request reconnects.
+                self._socket.close()
+                self._socket = None
+            if self.select_cache is not None:
+                # Requests left without response could be applied
+                for request, _, _ in in_flight.values():
+                    self._invalidate_cache(request)
+            if limiter is not None:
+                # Slots of the requests left without response
+                for _ in in_flight:
+                    limiter.release()
+
+    def _sendall(self, data):
+        try:
+            self._socket.sendall(data)
+        except (socket.error, socket.timeout) as e:
+            raise NetworkError(e)
+
+    @staticmethod
+    def _pop_in_flight(in_flight, request_id):
+        try:
+            return in_flight.pop(request_id)
+        except KeyError:
+            raise NetworkError(socket.error(
+                socket.errno.EPROTO,
+                'Response to unknown request id %d' % request_id))
+
     def call(self, func_name, *args, **kwargs):
         """
         Execute CALL request. Call stored Lua function.
@@ -186,8 +705,29 @@ class Connection(object):
         :param return_tuple: True indicates that it is required
         to return the inserted tuple back
         :type return_tuple: bool
+        :param arg_types: types of the arguments; by default all
+        arguments are sent as strings, with ``int`` in `arg_types` integer
+        arguments are packed natively (see
+        :meth:`~tarantool.request.RequestCall.cast_args`)
+        :type arg_types: tuple
+        :param field_types: Data types to be used for type conversion of
+        the result. A list of tuples declares types for each returned tuple
+        separately (the last one is applied to the rest of the tuples).
+        :type field_types: tuple or list of tuples
+        :param max_response_bytes: maximum size of the response body
+        (default is `max_response_bytes` of the connection)
+        :type max_response_bytes: int
+        :param max_rows: maximum number of returned tuples
+        (default is `max_rows` of the connection)
+        :type max_rows: int
+        :param priority: ``'interactive'`` (default) or ``'bulk'``;
+        used by :class:`~tarantool.lanes.LanePool` to route the request
+        :type priority: str
 
         :rtype: `Response` instance
+
+        >>> call('user_get', 1001, arg_types=(int, ),
+        ...      field_types=[(int, unicode), (int, int)])
         """
         assert isinstance(func_name, str)
         assert len(args) != 0
@@ -198,9 +738,14 @@ class Connection(object):
 
         # Check if 'field_types' keyword argument is passed
         field_types = kwargs.get("field_types", None)
-
-        request = RequestCall(func_name, args, return_tuple=True)
-        response = self._send_request(request, field_types=field_types)
+        arg_types = kwargs.get("arg_types", None)
+
+        request = RequestCall(func_name, args, return_tuple=True,
+                              arg_types=arg_types)
+        response = self._send_request(
+            request, field_types=field_types,
+            max_response_bytes=kwargs.get("max_response_bytes"),
+            max_rows=kwargs.get("max_rows"))
         return response
 
     def insert(self, space_no, values, return_tuple=False, field_types=None):
@@ -216,14 +761,17 @@ class Connection(object):
         :param return_tuple: True indicates that it is required to return
         the inserted tuple back
         :type return_tuple: bool
-        :param field_types: Data types to be used for type conversion.
+        :param field_types: Data types to be used for type conversion;
+        :class:`~tarantool.response.FixedLayout` is also used to pack
+        the values, values of :class:`~tarantool.compression.Compressed`
+        fields are compressed
         :type field_types: tuple
 
         :rtype: `Response` instance
         """
         assert isinstance(values, tuple)
 
-        request = RequestInsert(space_no, values, return_tuple)
+        request = insert_request(space_no, values, return_tuple, field_types)
         return self._send_request(request, field_types=field_types)
 
     def delete(self, space_no, key, return_tuple=False, field_types=None):
@@ -265,12 +813,17 @@ class Connection(object):
         :param return_tuple: indicates that it is required to return
         the updated tuple back
         :type return_tuple: bool
+        :param field_types: Data types to be used for type conversion;
+        arguments of '=' operations on
+        :class:`~tarantool.compression.Compressed` fields are compressed
+        :type field_types: tuple
 
         :rtype: `Response` instance
         """
         assert isinstance(key, (int, bytes, basestring, tuple))
 
-        request = RequestUpdate(space_no, key, op_list, return_tuple)
+        request = update_request(
+            space_no, key, op_list, return_tuple, field_types)
         return self._send_request(request, field_types=field_types)
 
     def ping(self):
@@ -280,18 +833,25 @@ class Connection(object):
 
         :return: response time in seconds
         :rtype: float
+        :raise: `NetworkError`
         """
-        t0 = time.time()
-        self._socket.sendall(struct_LLL.pack(0xff00, 0, 0))
-        request_type, body_length, request_id = struct_LLL.unpack(
-            self._socket.recv(12))
-        t1 = time.time()
+        with self._lock:
+            if self._socket is None:
+                self.connect()
+            t0 = time.time()
+            try:
+                self._socket.sendall(struct_LLL.pack(0xff00, 0, 0))
+                request_type, body_length, request_id = struct_LLL.unpack(
+                    self._recv_exactly(12))
+            except (socket.error, socket.timeout) as e:
+                raise NetworkError(e)
+            t1 = time.time()
         assert request_type == 0xff00
         assert body_length == 0
         return t1 - t0
 
     def _select(self, space_no, index_no, values, offset=0, limit=0xffffffff,
-                field_types=None):
+                field_types=None, max_response_bytes=None, max_rows=None):
         """
         Low level version of select() method.
 
@@ -315,7 +875,31 @@ class Connection(object):
         assert isinstance(values[0], (list, tuple))
 
         request = RequestSelect(space_no, index_no, values, offset, limit)
-        response = self._send_request(request, field_types=field_types)
+        if self.select_cache is None:
+            return self._send_request(
+                request, field_types=field_types,
+                max_response_bytes=max_response_bytes, max_rows=max_rows)
+
+        # The encoded request (with zero request id) and the generation of
+        # the space, changed by writes, are the cache key
+        key = bytes(request) + self.select_cache.generation(space_no)
+        packet = self.select_cache.get_packet(key)
+        if packet is not None and self.memory_budget is not None and \
+                self.memory_used + len(packet) - 12 > self.memory_budget:
+            # The server response is handled by the budget policy
+            packet = None
+        if packet is None:
+            raw = self._send_request(
+                request, response_class=RawResponse,
+                max_response_bytes=max_response_bytes, max_rows=max_rows)
+            packet = raw.packet()
+            if raw.return_code == 0:
+                self.select_cache.set(key, packet)
+            # Release the budget taken by the raw response
+            del raw
+        response = Response(packet[:12], packet[12:], field_types)
+        if self.memory_budget is not None:
+            self._track_memory(response, len(packet) - 12)
         return response
 
     def select(self, space_no, values, **kwargs):
@@ -334,6 +918,20 @@ class Connection(object):
         :type offset: int
         :param limit: limits the total number of returned tuples
         :type limit: int
+        :param max_keys: maximum number of keys sent in a single request
+        (default is `max_select_keys` of the connection, or
+        `bulk_select_keys` for bulk priority)
+        :type max_keys: int
+        :param max_response_bytes: maximum size of the response body
+        (default is `max_response_bytes` of the connection)
+        :type max_response_bytes: int
+        :param max_rows: maximum number of returned tuples
+        (default is `max_rows` of the connection); with `max_keys` the
+        limits of the connection are applied to each chunk
+        :type max_rows: int
+        :param priority: ``'interactive'`` (default) or ``'bulk'``;
+        bulk requests are split into chunks of `bulk_select_keys` keys
+        :type priority: str
 
         :rtype: `Response` instance
 
@@ -351,6 +949,15 @@ class Connection(object):
         >>> select(0, 1, [(1,'2')])
         This is incorrect
         >>> select(0, 1, (1,'2'))
+
+        If the number of keys exceeds `max_keys` they are split into chunks.
+        Chunks are encoded lazily (so `values` can be a generator),
+        sent without waiting for the previous chunks to complete and
+        results are merged in the original order of keys.
+        Merged results are not spooled: if the chunks exceed the memory
+        budget, `ResponseTooLargeError` is raised regardless of
+        `budget_policy`
+        >>> select(0, 0, (i for i in range(100000)), max_keys=1000)
         """
 
         # Initialize arguments and its defaults from **kwargs
@@ -358,6 +965,10 @@ class Connection(object):
         limit = kwargs.get("limit", 0xffffffff)
         field_types = kwargs.get("field_types", None)
         index = kwargs.get("index", 0)
+        if kwargs.get("priority") == PRIORITY_BULK:
+            max_keys = kwargs.get("max_keys", self.bulk_select_keys)
+        else:
+            max_keys = kwargs.get("max_keys", self.max_select_keys)
 
         # Perform smart type cheching (scalar/list of scalars/list of tuples)
         if isinstance(values, (int, bytes, basestring)):  # scalar
@@ -379,11 +990,98 @@ class Connection(object):
             else:
                 raise ValueError('Invalid value type, expected one of scalar '
                                  '(int or str)/list of scalars/list of tuples')
+        else:
+            # Any other iterable (e.g. generator) is consumed lazily
+            values = self._select_keys(values)
+            if max_keys is None:
+                values = list(values)
+
+        if max_keys is None or \
+                isinstance(values, list) and len(values) <= max_keys:
+            return self._select(
+                space_no, index, values, offset, limit,
+                field_types=field_types,
+                max_response_bytes=kwargs.get("max_response_bytes"),
+                max_rows=kwargs.get("max_rows"))
+        return self._select_chunked(space_no, index, values, offset, limit,
+                                    max_keys, field_types=field_types)
+
+    @staticmethod
+    def _select_keys(values):
+        """
+        Transform scalar keys of the iterable to tuples
+        """
+        for value in values:
+            if isinstance(value, (int, bytes, basestring)):
+                yield (value, )
+            elif isinstance(value, (list, tuple)):
+                yield value
+            else:
+                raise ValueError('Invalid value type, expected one of scalar '
+                                 '(int or str)/list of scalars/list of tuples')
+
+    def _select_chunked(self, space_no, index_no, values, offset, limit,
+                        max_keys, field_types=None):
+        """
+        Select data using several SELECT requests with at most `max_keys`
+        keys each. Up to `SELECT_CHUNKS_IN_FLIGHT` requests are sent at once.
 
-        return self._select(space_no, index, values, offset, limit,
-                            field_types=field_types)
+        :param values: keys to search over the index
+        :type values: iterable of tuples
 
-    def space(self, space_no, field_types=None):
+        :rtype: `Response` instance
+        """
+        # Offset and limit are applied to the merged result
+        chunk_limit = min(offset + limit, 0xffffffff)
+        chunk_no = {}
+        failed = []
+
+        def requests():
+            keys = iter(values)
+            for n in itertools.count():
+                if failed:
+                    return
+                chunk = list(itertools.islice(keys, max_keys))
+                if not chunk:
+                    return
+                request = RequestSelect(
+                    space_no, index_no, chunk, 0, chunk_limit)
+                chunk_no[request] = n
+                yield request
+
+        # Chunks may complete in any order, keep the completed ones until
+        # all preceding chunks are merged
+        completed = {}
+        result = None
+        merged = 0
+        for request, response in self._send_requests(
+                requests(), SELECT_CHUNKS_IN_FLIGHT, field_types):
+            if isinstance(response, DatabaseError):
+                failed.append(response)
+                continue
+            completed[chunk_no.pop(request)] = response
+            while merged in completed:
+                response = completed.pop(merged)
+                if result is None:
+                    result = response
+                else:
+                    result.extend(response)
+                    if self.memory_budget is not None:
+                        # The tuples of the chunk are kept by the result
+                        self._track_memory(result, response._body_length)
+                merged += 1
+
+        if failed:
+            raise failed[0]
+        assert result is not None, 'values must not be empty'
+
+        if offset or len(result) > limit:
+            result[:] = result[offset:offset + limit]
+        result._rowcount = len(result)
+        return result
+
+    def space(self, space_no, field_types=None,
+              priority=PRIORITY_INTERACTIVE):
         """
         Create `Space` instance for particular space
 
@@ -392,7 +1090,9 @@ class Connection(object):
 
         :param space_no: identifier of the space
         :type space_no: int
+        :param priority: default priority of the requests to the space
+        :type priority: str
 
         :rtype: `Space` instance
         """
-        return Space(self, space_no, field_types)
+        return Space(self, space_no, field_types, priority)
@@ -8,6 +8,7 @@ struct_BBB = struct.Struct('<BBB')
 struct_BBBB = struct.Struct('<BBBB')
 struct_BBBBB = struct.Struct('<BBBBB')
 struct_BL = struct.Struct("<BL")
+struct_BQ = struct.Struct("<BQ")
 struct_LB = struct.Struct("<LB")
 struct_L = struct.Struct("<L")
 struct_LL = struct.Struct("<LL")
@@ -24,7 +25,8 @@ REQUEST_TYPE_SELECT = 17
 REQUEST_TYPE_UPDATE = 19
 
 
-UPDATE_OPERATION_CODE = {'=': 0, '+': 1, '&': 2, '^': 3, '|': 4, 'splice': 5}
+UPDATE_OPERATION_CODE = {'=': 0, '+': 1, '&': 2, '^': 3, '|': 4, 'splice': 5,
+                         'delete': 6, 'insert': 7}
 
 # Default value for socket timeout (seconds)
 SOCKET_TIMEOUT = 1
@@ -35,6 +37,41 @@ RECONNECT_MAX_ATTEMPTS = 10
 # Default delay between attempts to reconnect (seconds)
 RECONNECT_DELAY = 0.1
 
+# Default time resolved addresses of the server are cached for (seconds)
+DNS_CACHE_TTL = 60
+
+# Default delay before connecting to the next resolved address while
+# the previous attempts are in progress (seconds), see RFC 8305
+CONNECT_STAGGER = 0.25
+
 # Number of reattempts in case of server return
 # completion_status == 1 (try again)
 RETRY_MAX_ATTEMPTS = 10
+
+# Default number of requests sent to the server without waiting for
+# responses (see Connection._send_requests)
+PIPELINE_WINDOW = 128
+
+# Default number of keys (or tuples in case of CALL) requested at once
+# while paging through a space (see tarantool.dump.pages)
+PAGE_SIZE = 1000
+
+# Number of chunks of a large SELECT request (see Connection.select)
+# sent to the server at once
+SELECT_CHUNKS_IN_FLIGHT = 4
+
+# Priorities of requests: interactive requests are routed to
+# the connections reserved for them (see tarantool.lanes.LanePool),
+# bulk SELECT requests are split into chunks of BULK_SELECT_KEYS keys
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+BULK_SELECT_KEYS = 1000
+
+# Size of chunks a large response body is read in when it is discarded
+# or spooled to a file (see Connection.memory_budget)
+READ_CHUNK_SIZE = 65536
+
+# Policies applied to a response exceeding the memory budget of
+# the connection: spool the tuples to a temporary file or discard them
+BUDGET_STREAM = 'stream'
+BUDGET_DROP = 'drop'
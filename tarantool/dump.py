@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides streaming export of the space data into a dump file
+and reading of the dump files.
+
+Tuples are written to the file exactly as they are received from the server
+(without decoding and re-encoding), so the export is bound by I/O.
+
+Dump file format::
+
+    <dump> ::= <magic><fq_tuple>*
+    <fq_tuple> ::= <size><tuple>
+
+where ``<fq_tuple>`` has the same format as in the server response.
+"""
+import mmap
+import os
+
+from tarantool._compat import basestring
+from tarantool.const import (
+    struct_L, struct_LL, struct_LLL, REQUEST_TYPE_SELECT, PAGE_SIZE
+)
+from tarantool.request import RequestCall, RequestSelect
+from tarantool.response import Response, RawResponse
+
+
+DUMP_MAGIC = b'TNTDUMP1'
+
+
+def _key_pages(keys, page_size):
+    page = []
+    for key in keys:
+        if not isinstance(key, (list, tuple)):
+            key = (key, )
+        page.append(key)
+        if len(page) == page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def pages(connection, space_no, keys_or_call, index=0, page_size=PAGE_SIZE,
+          key_fields=1, response_class=Response):
+    """
+    Page through the space data.
+
+    Data is paged through in one of two ways:
+
+    * `keys_or_call` is an iterable of keys: tuples are selected using
+      the index `index`, `page_size` keys per request;
+    * `keys_or_call` is a name of a stored Lua procedure: the procedure is
+      called as ``func(page_size)`` to get the first page and
+      ``func(page_size, key...)`` to get the page following the tuple with
+      the given key (the first `key_fields` raw fields of the last tuple
+      of the previous page); an empty result terminates paging.
+
+    :param connection: connection to the server
+    :type connection: :class:`~tarantool.connection.Connection` instance
+    :param int space_no: space id (used with keys only)
+    :param keys_or_call: keys to select or Lua procedure name
+    :type keys_or_call: iterable or str
+    :param index: index id to use with keys
+    :type index: int
+    :param page_size: number of keys (or tuples) requested at once
+    :type page_size: int
+    :param key_fields: number of leading fields of a tuple forming the key
+    passed to the Lua procedure
+    :type key_fields: int
+    :param response_class: class used to parse responses
+    :type response_class: `Response` subclass
+
+    :return: iterator over responses without type conversion
+    """
+    if isinstance(keys_or_call, basestring):
+        args = (page_size, )
+        while True:
+            response = connection._send_request(
+                RequestCall(keys_or_call, args, return_tuple=True),
+                response_class=response_class)
+            last = response.last_tuple()
+            if last is None:
+                return
+            yield response
+            args = (page_size, ) + tuple(last[:key_fields])
+    else:
+        for page in _key_pages(keys_or_call, page_size):
+            yield connection._send_request(
+                RequestSelect(space_no, index, page, 0, 0xffffffff),
+                response_class=response_class)
+
+
+def export(connection, space_no, path, keys_or_call, index=0,
+           page_size=PAGE_SIZE, key_fields=1):
+    """
+    Export tuples of the space into the dump file.
+    Data is paged through with :func:`pages`.
+
+    :param connection: connection to the server
+    :type connection: :class:`~tarantool.connection.Connection` instance
+    :param int space_no: space id to export (used with keys only)
+    :param path: dump file name
+    :type path: str
+    :param keys_or_call: keys to select or Lua procedure name
+    :type keys_or_call: iterable or str
+
+    :return: number of exported tuples
+    :rtype: int
+    """
+    count = 0
+    with open(path, 'wb') as dump:
+        dump.write(DUMP_MAGIC)
+        for response in pages(connection, space_no, keys_or_call, index,
+                              page_size, key_fields, RawResponse):
+            dump.write(response.data)
+            count += response.rowcount or 0
+    return count
+
+
+class DumpReader(object):
+    """
+    Lazily iterates over tuples of the dump file.
+
+    The file is memory-mapped, tuples are decoded only when requested
+    and have the same format as tuples of
+    :class:`~tarantool.response.Response` (optionally casted with
+    `field_types`).
+    """
+
+    def __init__(self, path, field_types=None):
+        """
+        :param path: dump file name
+        :type path: str
+        :param field_types: Data types to be used for type conversion
+        :type field_types: tuple
+        """
+        self.path = path
+        # Empty response is used to decode tuples in the same way as
+        # the responses received from the server do
+        self._decoder = Response(
+            struct_LLL.pack(REQUEST_TYPE_SELECT, 0, 0), None, field_types)
+
+    def __iter__(self):
+        with open(self.path, 'rb') as dump:
+            if dump.read(len(DUMP_MAGIC)) != DUMP_MAGIC:
+                raise ValueError('%s is not a dump file' % self.path)
+            size = os.fstat(dump.fileno()).st_size
+            if size == len(DUMP_MAGIC):
+                return
+            data = mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                offset = len(DUMP_MAGIC)
+                position = 0
+                while offset < size:
+                    # <size> does not include <size> itself and <cardinality>
+                    end = offset + struct_L.unpack_from(data, offset)[0] + 8
+                    tuple_value = self._decoder._unpack_tuple(
+                        data[offset + 4:end])
+                    if self._decoder.field_types:
+                        tuple_value = self._decoder._cast_tuple(
+                            tuple_value, position)
+                    yield tuple_value
+                    offset = end
+                    position += 1
+            finally:
+                data.close()
+
+
+class StreamedResponse(DumpReader):
+    """
+    Response which does not fit in the memory budget of the connection
+    (see `memory_budget` of :class:`~tarantool.connection.Connection`).
+
+    The tuples are written to a temporary file (in the dump file format)
+    while the response is read from the socket and decoded lazily on
+    iteration. The file is removed by :meth:`close` or when the response
+    is garbage collected.
+    """
+
+    def __init__(self, header, head, path, field_types=None):
+        """
+        :param header: response header
+        :type header: bytes
+        :param head: the first 8 bytes of the body (<return_code><count>)
+        :type head: bytes
+        :param path: temporary file with the rest of the body
+        :type path: str
+        """
+        super(StreamedResponse, self).__init__(path, field_types)
+        (self.request_type, self.body_length,
+            self.request_id) = struct_LLL.unpack(header)
+        return_code, self.rowcount = struct_LL.unpack(head)
+        self.completion_status = return_code & 0x00ff
+        self.return_code = return_code >> 8
+        self.return_message = None
+        # Response size accounted by the sampler
+        self._body_length = self.body_length
+
+    def __len__(self):
+        return self.rowcount
+
+    def close(self):
+        """
+        Remove the temporary file
+        """
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __del__(self):
+        self.close()
+
+    def __repr__(self):
+        return '<StreamedResponse %d tuples in %s>' % (
+            self.rowcount, self.path)
@@ -18,7 +18,6 @@ The PEP-249 says that database related exceptions must be inherited as follows:
           |__NotSupportedError
 """
 import os
-import socket
 import sys
 import warnings
 
@@ -37,7 +36,7 @@ class InterfaceError(Error):
     """
 
 
-# Monkey patch os.strerror for win32
+# Messages of socket errors on win32 (see _strerror)
 if sys.platform == 'win32':
     # Windows Sockets Error Codes (not all, but related on network errors)
     # msdn.microsoft.com/en-us/library/windows/desktop/ms740668(v=vs.85).aspx
@@ -81,42 +80,61 @@ if sys.platform == 'win32':
         11001: 'Host not found',
         11004: 'Name or service not known'
     }
+else:
+    _code2str = None
 
-    os_strerror_orig = os.strerror
 
-    def os_strerror_patched(code):
-        """
-        Return cross-platform message about socket-related errors
-
-        This function exists because under Windows os.strerror returns
-        'Unknown error' on all socket-related errors.
-        And socket-related exception contain broken non-ascii encoded messages.
-        """
-        message = os_strerror_orig(code)
-        if not message.startswith('Unknown'):
-            return message
-        else:
-            return _code2str.get(code, 'Unknown error %s' % code)
+def _strerror(code):
+    """
+    Return cross-platform message about socket-related errors
 
-    os.strerror = os_strerror_patched
-    del os_strerror_patched
+    This function exists because under Windows os.strerror returns
+    'Unknown error' on all socket-related errors.
+    And socket-related exception contain broken non-ascii encoded messages.
+    """
+    message = os.strerror(code)
+    if _code2str is None or not message.startswith('Unknown'):
+        return message
+    return _code2str.get(code, 'Unknown error %s' % code)
 
 
 class NetworkError(DatabaseError):
     """Error related to network"""
     def __init__(self, orig_exception=None, *args):
+        # socket is imported here to keep `import tarantool` fast
+        import socket
         if orig_exception:
             if isinstance(orig_exception, socket.timeout):
                 self.message = 'Socket timeout'
                 super(NetworkError, self).__init__(0, self.message)
             elif isinstance(orig_exception, socket.error):
-                self.message = os.strerror(orig_exception.errno)
+                self.message = _strerror(orig_exception.errno)
                 super(NetworkError, self).__init__(
                     orig_exception.errno, self.message)
             else:
                 super(NetworkError, self).__init__(orig_exception, *args)
 
 
+class OverloadError(DatabaseError):
+    """
+    Request is rejected by the client-side concurrency limiter
+    (see :class:`~tarantool.limiter.ConcurrencyLimiter`)
+    """
+
+
+class ResponseTooLargeError(DatabaseError):
+    """
+    Response exceeds the size limits of the connection or of the request.
+    The response body is read and discarded, so the connection remains
+    usable.
+    """
+
+    def __init__(self, message, request_id=None):
+        super(ResponseTooLargeError, self).__init__(0, message)
+        #: `<request_id>` of the discarded response
+        self.request_id = request_id
+
+
 class NetworkWarning(UserWarning):
     """Warning related to network"""
     pass
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`FaultProxy`: a local TCP proxy placed between
+a client and a server which injects network faults, and :func:`measure`
+which reports the client-observed latency distribution under the faults.
+
+It is intended for tuning `socket_timeout`, `reconnect_delay` and
+`reconnect_max_attempts` of :class:`~tarantool.connection.Connection`
+from measurements.
+
+Supported faults (see :class:`Fault`): response latency and jitter,
+bandwidth cap, splitting of responses into small segments, connection
+resets and synthetic "try again" (completion_status 1) responses.
+
+Command line usage (runs the default scenarios against the server)::
+
+    python -m tarantool.faultproxy localhost 33013 --space 0 --requests 1000
+"""
+import collections
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+
+from tarantool.connection import Connection
+from tarantool.const import struct_LLL
+from tarantool.error import DatabaseError
+
+
+PING = 0xff00
+
+# <return_code> (error code and completion_status 1) and the message
+# of the synthetic try again response
+TRY_AGAIN_CODE = 0x3501
+TRY_AGAIN_MESSAGE = b'Injected try again\x00'
+
+
+class Fault(object):
+    """
+    Faults injected by the proxy.
+    Schedules are counted in requests passed through a client connection.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, bandwidth=None, split=None,
+                 reset_every=None, try_again_every=None):
+        """
+        :param latency: delay of each response (seconds)
+        :type latency: float
+        :param jitter: random extra delay of each response, uniformly
+        distributed in ``[0, jitter]`` (seconds)
+        :type jitter: float
+        :param bandwidth: cap of the response traffic (bytes per second)
+        :type bandwidth: int
+        :param split: responses are sent in segments of this size (bytes)
+        :type split: int
+        :param reset_every: the connection is reset (RST) instead of
+        forwarding every `reset_every`-th request
+        :type reset_every: int
+        :param try_again_every: every `try_again_every`-th request is
+        answered with the synthetic "try again" response instead of
+        forwarding it to the server
+        :type try_again_every: int
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.split = split
+        self.reset_every = reset_every
+        self.try_again_every = try_again_every
+
+    def __repr__(self):
+        return 'Fault(%s)' % ', '.join(
+            '%s=%r' % item for item in sorted(self.__dict__.items())
+            if item[1])
+
+
+def _recv_exactly(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(length)
+        if not chunk:
+            return None
+        length -= len(chunk)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def _reset(sock):
+    # Zero linger timeout makes close() send RST
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                        struct.pack('ii', 1, 0))
+    except socket.error:
+        pass
+    sock.close()
+
+
+class _Session(object):
+    """
+    Client connection proxied to the server
+    """
+
+    def __init__(self, proxy, client):
+        self.proxy = proxy
+        self.client = client
+        self.upstream = socket.create_connection(
+            (proxy.upstream_host, proxy.upstream_port))
+        for sock in (self.client, self.upstream):
+            sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+        self.requests = 0
+        self.closed = False
+        # Both directions write to the client
+        self._client_lock = threading.Lock()
+        for target in (self._forward_requests, self._forward_responses):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    def close(self, reset=False):
+        if self.closed:
+            return
+        self.closed = True
+        if reset:
+            _reset(self.client)
+        else:
+            self.client.close()
+        self.upstream.close()
+        self.proxy._discard(self)
+
+    def _read_packet(self, sock):
+        header = _recv_exactly(sock, 12)
+        if header is None:
+            return None, None
+        body_length = struct_LLL.unpack(header)[1]
+        body = _recv_exactly(sock, body_length) if body_length else b''
+        return header, body
+
+    def _forward_requests(self):
+        try:
+            while not self.closed:
+                header, body = self._read_packet(self.client)
+                if header is None:
+                    break
+                request_type, _, request_id = struct_LLL.unpack(header)
+                fault = self.proxy.fault
+                if request_type != PING:
+                    self.requests += 1
+                    if fault.reset_every and \
+                            self.requests % fault.reset_every == 0:
+                        self.proxy.resets += 1
+                        self.close(reset=True)
+                        return
+                    if fault.try_again_every and \
+                            self.requests % fault.try_again_every == 0:
+                        self.proxy.try_agains += 1
+                        response = struct.pack('<L', TRY_AGAIN_CODE) + \
+                            TRY_AGAIN_MESSAGE
+                        self._send_response(struct_LLL.pack(
+                            request_type, len(response), request_id) +
+                            response)
+                        continue
+                self.upstream.sendall(header + body)
+        except socket.error:
+            pass
+        self.close()
+
+    def _forward_responses(self):
+        try:
+            while not self.closed:
+                header, body = self._read_packet(self.upstream)
+                if header is None:
+                    break
+                self._send_response(header + body)
+        except socket.error:
+            pass
+        self.close()
+
+    def _send_response(self, packet):
+        fault = self.proxy.fault
+        delay = fault.latency
+        if fault.jitter:
+            delay += random.uniform(0, fault.jitter)
+        if delay:
+            time.sleep(delay)
+        segment = fault.split or len(packet)
+        with self._client_lock:
+            for start in range(0, len(packet), segment):
+                chunk = packet[start:start + segment]
+                self.client.sendall(chunk)
+                if fault.bandwidth:
+                    time.sleep(float(len(chunk)) / fault.bandwidth)
+                elif fault.split:
+                    # Let the segment leave before the next one is sent
+                    time.sleep(0.0001)
+
+
+class FaultProxy(object):
+    """
+    Local TCP proxy injecting faults into the traffic between clients and
+    the server. The fault can be changed while the proxy runs.
+    """
+
+    def __init__(self, upstream_host, upstream_port, fault=None,
+                 host='127.0.0.1', port=0):
+        """
+        :param str upstream_host: Server hostname or IP-address
+        :param int upstream_port: Server port
+        :param fault: faults to inject
+        :type fault: :class:`Fault` instance
+        :param str host: address to listen on
+        :param int port: port to listen on (0 means any free port)
+        """
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.fault = fault or Fault()
+        #: Number of injected connection resets
+        self.resets = 0
+        #: Number of injected try again responses
+        self.try_agains = 0
+        # Open sessions, closed ones remove themselves
+        self._sessions = set()
+        self._sessions_lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(16)
+        self.host, self.port = self._sock.getsockname()
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except socket.error:
+                return
+            try:
+                session = _Session(self, client)
+            except socket.error:
+                # Server is unavailable
+                client.close()
+                continue
+            with self._sessions_lock:
+                if not session.closed:
+                    self._sessions.add(session)
+
+    def _discard(self, session):
+        with self._sessions_lock:
+            self._sessions.discard(session)
+
+    def close(self):
+        """
+        Stop accepting connections and close the proxied ones
+        """
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._sock.close()
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.close()
+
+
+class LatencyReport(object):
+    """
+    Distribution of the client-observed latency
+    """
+
+    #: Reported percentiles
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self, latencies, errors):
+        #: Sorted latencies of all requests (seconds), including failed ones
+        self.latencies = sorted(latencies)
+        #: Number of failed requests
+        self.errors = errors
+
+    def percentile(self, p):
+        """
+        :param p: percentile (0..100)
+        :type p: float
+
+        :return: latency (seconds)
+        :rtype: float
+        """
+        if not self.latencies:
+            return None
+        return self.latencies[min(len(self.latencies) - 1,
+                                  int(len(self.latencies) * p / 100.0))]
+
+    @property
+    def max(self):
+        return self.latencies[-1] if self.latencies else None
+
+    def __repr__(self):
+        if not self.latencies:
+            return '0 requests, %d errors' % self.errors
+        return '%d requests, %d errors, %s, max %.2f ms' % (
+            len(self.latencies), self.errors,
+            ', '.join('p%s %.2f ms' % (p, self.percentile(p) * 1000)
+                      for p in self.PERCENTILES),
+            self.max * 1000)
+
+
+def measure(proxy, request, count=1000, **connection_kwargs):
+    """
+    Send requests through the proxy and measure their latency
+
+    :param proxy: proxy with the faults to measure
+    :type proxy: :class:`FaultProxy` instance
+    :param request: function executing a request: ``request(connection)``
+    :type request: callable
+    :param count: number of requests
+    :type count: int
+    :param connection_kwargs: arguments of
+    :class:`~tarantool.connection.Connection` (e.g. `reconnect_delay`)
+
+    :rtype: :class:`LatencyReport` instance
+    """
+    connection = Connection(proxy.host, proxy.port, **connection_kwargs)
+    latencies = []
+    errors = 0
+    try:
+        for _ in range(count):
+            started = time.time()
+            try:
+                request(connection)
+            except DatabaseError:
+                errors += 1
+            latencies.append(time.time() - started)
+    finally:
+        if connection._socket is not None:
+            connection.close()
+    return LatencyReport(latencies, errors)
+
+
+#: Default scenarios of the command line utility
+SCENARIOS = collections.OrderedDict([
+    ('baseline', Fault()),
+    ('latency 5 ms', Fault(latency=0.005, jitter=0.005)),
+    ('bandwidth 64 KB/s', Fault(bandwidth=64 * 1024)),
+    ('split 16 bytes', Fault(split=16)),
+    ('try again 1/10', Fault(try_again_every=10)),
+    ('reset 1/100', Fault(reset_every=100)),
+])
+
+
+def run_scenarios(host, port, request, scenarios=SCENARIOS, count=1000,
+                  **connection_kwargs):
+    """
+    Measure latency of the requests to the server under each scenario
+
+    :param scenarios: scenario name -> faults
+    :type scenarios: dict
+
+    :return: scenario name -> :class:`LatencyReport`
+    :rtype: `collections.OrderedDict`
+    """
+    reports = collections.OrderedDict()
+    for name, fault in scenarios.items():
+        proxy = FaultProxy(host, port, fault)
+        try:
+            reports[name] = measure(proxy, request, count,
+                                    **connection_kwargs)
+        finally:
+            proxy.close()
+    return reports
+
+
+def main(argv=None):
+    import argparse
+    import warnings
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tarantool.faultproxy',
+        description='Measure client latency under injected network faults')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('--space', type=int, default=0,
+                        help='space to select from (default: 0)')
+    parser.add_argument('--key', type=int, default=0,
+                        help='key to select (default: 0)')
+    parser.add_argument('--requests', type=int, default=1000,
+                        help='requests per scenario (default: 1000)')
+    parser.add_argument('--reconnect-delay', type=float, default=0.1)
+    parser.add_argument('--socket-timeout', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    reports = run_scenarios(
+        args.host, args.port,
+        lambda connection: connection.select(args.space, args.key),
+        count=args.requests, reconnect_delay=args.reconnect_delay,
+        socket_timeout=args.socket_timeout)
+    for name, report in reports.items():
+        sys.stdout.write('%-20s %r\n' % (name, report))
+
+
+if __name__ == '__main__':
+    main()
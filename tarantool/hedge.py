@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`HedgedReader`: hedged read requests over
+several connections to redundant servers (e.g. replicas).
+
+A request is sent to the primary endpoint; if it has not answered within
+the given percentile of recent latency, the same request is sent to
+another endpoint, the first response wins and the other one is discarded.
+The share of hedged requests is capped by the budget, so slow endpoints
+do not double the load.
+
+Example::
+
+    >>> reader = HedgedReader([
+    ...     tarantool.connect('replica1', 33013),
+    ...     tarantool.connect('replica2', 33013)], percentile=99)
+    >>> reader.select(0, 1)
+"""
+import collections
+import threading
+import time
+
+from tarantool._compat import bytes, basestring, queue
+
+
+# Default percentile of recent latency after which the request is hedged
+HEDGE_PERCENTILE = 95
+
+# Default maximum share of requests which are hedged
+HEDGE_BUDGET = 0.05
+
+# Maximum number of hedges which can be accumulated by the budget
+HEDGE_BURST = 10
+
+# Default number of latency samples the percentile is computed over
+HEDGE_SAMPLES = 1000
+
+# Default hedge delay (seconds) used until enough samples are collected
+HEDGE_DELAY = 0.05
+
+
+class _Call(object):
+    """
+    Request sent to one or several endpoints
+    """
+
+    def __init__(self, func):
+        self.func = func
+        #: (worker, result, error) of completed attempts
+        self.results = queue.Queue()
+        #: Set when the result is taken, later attempts are discarded
+        self.done = False
+
+
+class _Worker(object):
+    """
+    Thread executing requests on a connection
+    """
+
+    def __init__(self, connection, on_latency):
+        self.connection = connection
+        #: Number of queued and running requests (updated without locking,
+        #: only used to choose endpoints)
+        self.pending = 0
+        self._on_latency = on_latency
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, call):
+        self.pending += 1
+        self._queue.put(call)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            call = self._queue.get()
+            if call is None:
+                return
+            if call.done:
+                # The request has been answered by another endpoint
+                self.pending -= 1
+                continue
+            started = time.time()
+            try:
+                result, error = call.func(self.connection), None
+                self._on_latency(time.time() - started)
+            except Exception as e:
+                result, error = None, e
+            self.pending -= 1
+            call.results.put((self, result, error))
+
+
+class HedgedReader(object):
+    """
+    Sends read requests to redundant endpoints hedging the slow ones.
+
+    Only idempotent requests may be hedged: a request can be executed by
+    several servers.
+    """
+
+    def __init__(self, connections, percentile=HEDGE_PERCENTILE,
+                 budget=HEDGE_BUDGET, samples=HEDGE_SAMPLES,
+                 delay=HEDGE_DELAY):
+        """
+        :param connections: connections to the redundant servers, the first
+        one is preferred as the primary endpoint
+        :type connections: list of
+        :class:`~tarantool.connection.Connection` instances
+        :param percentile: percentile of recent latency after which
+        the request is sent to another endpoint
+        :type percentile: float
+        :param budget: maximum share of requests which are hedged
+        :type budget: float
+        :param samples: number of recent latency samples
+        :type samples: int
+        :param delay: hedge delay (seconds) used until enough latency
+        samples are collected
+        :type delay: float
+        """
+        if not connections:
+            raise ValueError('At least one connection is required')
+        self.percentile = percentile
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=samples)
+        self._new_samples = 0
+        self._delay = delay
+        self._tokens = 0.0
+        self._workers = [_Worker(connection, self._add_latency)
+                         for connection in connections]
+
+        #: Number of executed requests
+        self.requests = 0
+        #: Number of hedged requests
+        self.hedged = 0
+        #: Number of hedged requests answered by the secondary endpoint
+        self.hedge_wins = 0
+
+    @property
+    def delay(self):
+        """
+        :type: float
+
+        Current delay (seconds) after which the request is hedged
+        """
+        return self._delay
+
+    def _add_latency(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._new_samples += 1
+            # Recompute the percentile periodically: sorting the samples
+            # on each request costs more than it saves
+            if self._new_samples * 10 < self._latencies.maxlen or \
+                    len(self._latencies) * 5 < self._latencies.maxlen:
+                return
+            self._new_samples = 0
+            latencies = sorted(self._latencies)
+            self._delay = latencies[min(
+                len(latencies) - 1,
+                int(len(latencies) * self.percentile / 100.0))]
+
+    def _endpoints(self):
+        """
+        Return primary and secondary (None if there is a single endpoint)
+        workers for a new request
+        """
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self._tokens + self.budget, HEDGE_BURST)
+            # Endpoints busy with requests (e.g. losing hedges) are
+            # chosen last
+            workers = sorted(self._workers, key=lambda w: w.pending)
+            return workers[0], (workers[1] if len(workers) > 1 else None)
+
+    def _take_hedge(self):
+        """
+        Take a hedge from the budget
+
+        :return: False if the budget is exhausted
+        :rtype: bool
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    def _execute(self, func):
+        """
+        Execute `func(connection)` hedging it if necessary
+
+        :return: result of the first successful attempt
+        :raise: error of the last failed attempt if all attempts failed
+        """
+        call = _Call(func)
+        primary, secondary = self._endpoints()
+        primary.submit(call)
+        attempts = 1
+        try:
+            try:
+                worker, result, error = call.results.get(timeout=self._delay)
+            except queue.Empty:
+                if secondary is not None and self._take_hedge():
+                    secondary.submit(call)
+                    attempts += 1
+                worker, result, error = call.results.get()
+            attempts -= 1
+            while error is not None and attempts:
+                # Wait for the other attempt
+                worker, result, error = call.results.get()
+                attempts -= 1
+        finally:
+            call.done = True
+        if error is not None:
+            raise error
+        if worker is secondary:
+            with self._lock:
+                self.hedge_wins += 1
+        return result
+
+    def select(self, space_no, values, **kwargs):
+        """
+        Execute SELECT request (see
+        :meth:`Connection.select() <tarantool.connection.Connection.select>`)
+
+        :rtype: `Response` instance
+        """
+        if not isinstance(values, (int, bytes, basestring, list, tuple)):
+            # Keys can be sent more than once
+            values = list(values)
+        return self._execute(
+            lambda connection: connection.select(space_no, values, **kwargs))
+
+    def call(self, func_name, *args, **kwargs):
+        """
+        Execute CALL request of a read-only stored procedure (see
+        :meth:`Connection.call() <tarantool.connection.Connection.call>`).
+        The procedure can be executed by several servers.
+
+        :rtype: `Response` instance
+        """
+        return self._execute(
+            lambda connection: connection.call(func_name, *args, **kwargs))
+
+    def close(self):
+        """
+        Stop worker threads and close the connections
+        """
+        for worker in self._workers:
+            worker.close()
+            worker.connection.close()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`KeepaliveMonitor`: a background thread which
+checks idle connections with PING requests and keeps a connected standby
+socket for each of them.
+
+When the active socket of a connection fails, the standby socket is
+swapped in at once (by the monitor or by the failed request itself)
+instead of sleeping `reconnect_delay` and connecting on the request path.
+The monitor also measures the round trip time of the pings.
+
+Connections busy with requests are not pinged, they are checked on
+the next round.
+
+Example::
+
+    >>> connection = tarantool.connect('localhost', 33013)
+    >>> monitor = KeepaliveMonitor([connection], interval=1.0)
+    >>> monitor.stats[connection].rtt
+    0.00012
+"""
+import errno
+import socket
+import threading
+import time
+
+from tarantool.const import struct_LLL
+from tarantool.error import NetworkError
+
+
+# Default interval between checks of the connections (seconds)
+KEEPALIVE_INTERVAL = 1.0
+
+# Default time without requests after which a connection is pinged (seconds)
+KEEPALIVE_IDLE = 1.0
+
+# Weight of a new RTT sample in the moving average
+RTT_SMOOTHING = 0.2
+
+PING = 0xff00
+
+
+def ping_socket(sock):
+    """
+    Send PING request through the socket and wait for the response
+
+    :return: round trip time (seconds)
+    :rtype: float
+    :raise: `socket.error`
+    """
+    started = time.time()
+    sock.sendall(struct_LLL.pack(PING, 0, 0))
+    header = b''
+    while len(header) < 12:
+        chunk = sock.recv(12 - len(header))
+        if not chunk:
+            raise socket.error(errno.ECONNABORTED,
+                               'Software caused connection abort')
+        header += chunk
+    request_type, body_length, _ = struct_LLL.unpack(header)
+    if request_type != PING or body_length:
+        raise socket.error('Unexpected response to PING')
+    return time.time() - started
+
+
+class PingStats(object):
+    """
+    Results of the checks of a connection
+    """
+
+    def __init__(self):
+        #: RTT of the last successful ping (seconds)
+        self.last_rtt = None
+        #: Moving average of RTT (seconds)
+        self.rtt = None
+        #: Number of successful pings
+        self.pings = 0
+        #: Number of failed pings (of both active and standby sockets)
+        self.failures = 0
+        #: Number of failed active sockets replaced by the monitor
+        self.swaps = 0
+
+    def add(self, rtt):
+        self.pings += 1
+        self.last_rtt = rtt
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += RTT_SMOOTHING * (rtt - self.rtt)
+
+    def __repr__(self):
+        return '<PingStats rtt %s, %d pings, %d failures, %d swaps>' % (
+            'n/a' if self.rtt is None else '%.2f ms' % (self.rtt * 1000),
+            self.pings, self.failures, self.swaps)
+
+
+class KeepaliveMonitor(object):
+    """
+    Thread checking idle connections and maintaining standby sockets
+    """
+
+    def __init__(self, connections, interval=KEEPALIVE_INTERVAL,
+                 idle=KEEPALIVE_IDLE, standby=True):
+        """
+        :param connections: connections to monitor
+        :type connections: list of
+        :class:`~tarantool.connection.Connection` instances
+        :param interval: interval between checks (seconds)
+        :type interval: float
+        :param idle: a connection is pinged if it has not sent requests
+        for this time (seconds)
+        :type idle: float
+        :param standby: keep a standby socket for each connection
+        :type standby: bool
+        """
+        self.connections = list(connections)
+        self.interval = interval
+        self.idle = idle
+        self.standby = standby
+        #: connection -> :class:`PingStats`
+        self.stats = dict((connection, PingStats())
+                          for connection in self.connections)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            for connection in self.connections:
+                if self._stopped.is_set():
+                    return
+                self.check(connection)
+
+    def check(self, connection):
+        """
+        Ping the connection if it is idle, ping its standby socket and
+        open a new one if there is none.
+        Nothing is done if the connection is busy.
+        """
+        if not connection._lock.acquire(False):
+            return
+        try:
+            if connection._socket is None:
+                # Closed by the user or after an interrupted pipeline,
+                # the next request reconnects
+                return
+            stats = self.stats[connection]
+            if time.time() - connection._last_used >= self.idle:
+                try:
+                    stats.add(ping_socket(connection._socket))
+                except socket.error:
+                    stats.failures += 1
+                    if connection._swap_standby():
+                        stats.swaps += 1
+            if connection._standby is not None:
+                try:
+                    ping_socket(connection._standby)
+                except socket.error:
+                    stats.failures += 1
+                    connection._standby.close()
+                    connection._standby = None
+            if not self.standby or connection._standby is not None:
+                return
+        finally:
+            connection._lock.release()
+
+        # Connecting takes time, requests are not blocked meanwhile
+        try:
+            sock = connection.transport.open(connection.socket_timeout)
+        except (socket.error, NetworkError):
+            return
+        with connection._lock:
+            if connection._socket is None or connection._standby is not None:
+                sock.close()
+                return
+            connection._standby = sock
+
+    def close(self):
+        """
+        Stop the thread and close the standby sockets
+        """
+        self._stopped.set()
+        self._thread.join()
+        for connection in self.connections:
+            with connection._lock:
+                if connection._standby is not None:
+                    connection._standby.close()
+                    connection._standby = None
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`LanePool` which separates latency-critical
+(interactive) requests from bulk ones (scans, loads) over a set of
+connections to the same server.
+
+Some connections are reserved for interactive requests, so point selects
+do not wait behind multi-megabyte responses of bulk requests. Bulk
+requests use the rest of the connections and their SELECT requests are
+split into chunks (see `bulk_select_keys` of
+:class:`~tarantool.connection.Connection`). Interactive requests borrow an
+idle bulk connection when all the reserved ones are busy.
+
+Example::
+
+    >>> pool = LanePool([tarantool.connect('localhost', 33013)
+    ...                  for _ in range(4)], reserved=2)
+    >>> pool.select(0, 1)
+    >>> pool.select(0, range(100000), priority='bulk')
+    >>> scan = pool.space(0, priority='bulk')
+"""
+import threading
+
+from tarantool.const import PRIORITY_INTERACTIVE, PRIORITY_BULK
+from tarantool.error import InterfaceError
+from tarantool.space import Space
+
+
+class LanePool(object):
+    """
+    Connections split into the interactive and the bulk lanes.
+    Each request is sent through the least busy connection of its lane.
+    The pool can be shared by several threads.
+    """
+
+    def __init__(self, connections, reserved=1):
+        """
+        :param connections: connections to the server
+        :type connections: list of
+        :class:`~tarantool.connection.Connection` instances
+        :param reserved: number of connections reserved for interactive
+        requests, the rest are used by bulk requests
+        :type reserved: int
+        """
+        if not 0 < reserved < len(connections):
+            raise ValueError('Both lanes need at least one connection')
+        #: Connections reserved for interactive requests
+        self.interactive = list(connections[:reserved])
+        #: Connections used by bulk requests
+        self.bulk = list(connections[reserved:])
+        #: Number of interactive requests sent through bulk connections
+        self.borrowed = 0
+        # connection -> number of requests using it
+        self._pending = dict((connection, 0) for connection in connections)
+        self._lock = threading.Lock()
+
+    def _acquire(self, priority):
+        if priority not in (PRIORITY_INTERACTIVE, PRIORITY_BULK):
+            raise ValueError('Invalid priority %r' % priority)
+        pending = self._pending
+        with self._lock:
+            if priority == PRIORITY_BULK:
+                connection = min(self.bulk, key=pending.get)
+            else:
+                connection = min(self.interactive, key=pending.get)
+                if pending[connection]:
+                    # All reserved connections are busy, an idle bulk
+                    # connection does not delay bulk requests
+                    idle = [c for c in self.bulk if not pending[c]]
+                    if idle:
+                        connection = idle[0]
+                        self.borrowed += 1
+            pending[connection] += 1
+        return connection
+
+    def _release(self, connection):
+        with self._lock:
+            self._pending[connection] -= 1
+
+    def _execute(self, priority, method, args, kwargs=None):
+        connection = self._acquire(priority)
+        try:
+            return getattr(connection, method)(*args, **(kwargs or {}))
+        finally:
+            self._release(connection)
+
+    def select(self, space_no, values, **kwargs):
+        """
+        Execute SELECT request, see
+        :meth:`~tarantool.connection.Connection.select`
+
+        :param priority: ``'interactive'`` (default) or ``'bulk'``
+        :type priority: str
+        """
+        return self._execute(kwargs.get('priority', PRIORITY_INTERACTIVE),
+                             'select', (space_no, values), kwargs)
+
+    def call(self, func_name, *args, **kwargs):
+        """
+        Execute CALL request, see
+        :meth:`~tarantool.connection.Connection.call`
+
+        :param priority: ``'interactive'`` (default) or ``'bulk'``
+        :type priority: str
+        """
+        return self._execute(kwargs.get('priority', PRIORITY_INTERACTIVE),
+                             'call', (func_name, ) + args, kwargs)
+
+    def insert(self, space_no, values, return_tuple=False, field_types=None,
+               priority=PRIORITY_INTERACTIVE):
+        return self._execute(priority, 'insert', (
+            space_no, values, return_tuple, field_types))
+
+    def delete(self, space_no, key, return_tuple=False, field_types=None,
+               priority=PRIORITY_INTERACTIVE):
+        return self._execute(priority, 'delete', (
+            space_no, key, return_tuple, field_types))
+
+    def update(self, space_no, key, op_list, return_tuple=False,
+               field_types=None, priority=PRIORITY_INTERACTIVE):
+        return self._execute(priority, 'update', (
+            space_no, key, op_list, return_tuple, field_types))
+
+    def space(self, space_no, field_types=None,
+              priority=PRIORITY_INTERACTIVE):
+        """
+        Create `Space` instance sending requests through the pool.
+        Only request methods (select, insert, update, delete and call)
+        are supported by such spaces, the others raise `InterfaceError`.
+
+        :param priority: default priority of the requests to the space
+        :type priority: str
+
+        :rtype: :class:`~tarantool.space.Space` instance
+        """
+        return _LaneSpace(self, space_no, field_types, priority)
+
+    def close(self):
+        """
+        Close all connections of the pool
+        """
+        for connection in self.interactive + self.bulk:
+            connection.close()
+
+
+class _LaneSpace(Space):
+    """
+    Space sending requests through :class:`LanePool`
+    """
+
+    def insert(self, values, return_tuple=False, priority=None):
+        """
+        :param priority: priority of the request (default is `priority`
+        of the space)
+        :type priority: str
+        """
+        return self.connection.insert(
+            self.space_no, values, return_tuple, self.field_types,
+            priority or self.priority)
+
+    def delete(self, key, return_tuple=False, priority=None):
+        return self.connection.delete(
+            self.space_no, key, return_tuple, self.field_types,
+            priority or self.priority)
+
+    def update(self, key, op_list, return_tuple=False, priority=None):
+        return self.connection.update(
+            self.space_no, key, op_list, return_tuple, self.field_types,
+            priority or self.priority)
+
+    def _unsupported(self, name):
+        raise InterfaceError(
+            '%s() is not supported by spaces of LanePool, use a space of '
+            'one of its connections' % name)
+
+    def write_buffer(self, **kwargs):
+        self._unsupported('write_buffer')
+
+    def export(self, *args, **kwargs):
+        self._unsupported('export')
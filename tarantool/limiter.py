@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`ConcurrencyLimiter` which adapts the number
+of requests in flight to the server load.
+
+The limit follows the gradient between the long-term (no load) and
+the recent round-trip time: while the RTT stays close to the no load RTT
+the limit grows, when requests start queueing on the server the limit
+shrinks. The limit is also decreased multiplicatively when the server
+answers with completion_status 1 (try again).
+
+Example::
+
+    >>> limiter = ConcurrencyLimiter(max_limit=64, policy='shed')
+    >>> connection = tarantool.Connection('localhost', 33013,
+    ...                                   limiter=limiter)
+    >>> limiter.limit
+    20
+"""
+import math
+import threading
+import time
+
+from tarantool.error import OverloadError
+
+
+# Default initial number of requests allowed in flight
+LIMIT_INITIAL = 20
+
+# Default bounds of the limit
+LIMIT_MIN = 1
+LIMIT_MAX = 1000
+
+# Default ratio of the recent RTT to the no load RTT tolerated before
+# the limit is decreased
+LIMIT_RTT_TOLERANCE = 2.0
+
+# Default multiplicative decrease of the limit on completion_status 1
+LIMIT_BACKOFF = 0.9
+
+# Weights of a new RTT sample in the recent and the no load RTT averages
+RTT_RECENT_WEIGHT = 0.1
+RTT_NOLOAD_WEIGHT = 0.001
+
+# Requests which exceed the limit wait for a free slot
+POLICY_QUEUE = 'queue'
+# Requests which exceed the limit are rejected with OverloadError
+POLICY_SHED = 'shed'
+
+
+class ConcurrencyLimiter(object):
+    """
+    Adaptive limit of concurrent requests.
+    An instance can be shared by several connections.
+    """
+
+    def __init__(self, initial_limit=LIMIT_INITIAL, min_limit=LIMIT_MIN,
+                 max_limit=LIMIT_MAX, policy=POLICY_QUEUE, max_queue=None,
+                 queue_timeout=None, tolerance=LIMIT_RTT_TOLERANCE,
+                 backoff=LIMIT_BACKOFF):
+        """
+        :param initial_limit: initial number of requests allowed in flight
+        :type initial_limit: int
+        :param min_limit: minimum limit
+        :type min_limit: int
+        :param max_limit: maximum limit
+        :type max_limit: int
+        :param policy: what to do with requests exceeding the limit:
+        ``'queue'`` (wait for a free slot) or ``'shed'`` (reject)
+        :type policy: str
+        :param max_queue: maximum number of waiting requests with
+        the ``'queue'`` policy, the rest are rejected; None means no limit
+        :type max_queue: int
+        :param queue_timeout: maximum time a request waits for a free slot
+        (seconds); None means wait forever
+        :type queue_timeout: float
+        :param tolerance: ratio of the recent RTT to the no load RTT
+        tolerated before the limit is decreased
+        :type tolerance: float
+        :param backoff: the limit is multiplied by this value when
+        the server asks to try again
+        :type backoff: float
+        """
+        if policy not in (POLICY_QUEUE, POLICY_SHED):
+            raise ValueError('Invalid policy %r' % policy)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.policy = policy
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.backoff = backoff
+
+        self._limit = float(initial_limit)
+        self._cond = threading.Condition()
+        self._waiting = 0
+        self._rtt_recent = None
+        self._rtt_noload = None
+
+        #: Number of requests in flight
+        self.in_flight = 0
+        #: Number of rejected requests
+        self.rejected = 0
+
+    @property
+    def limit(self):
+        """
+        :type: int
+
+        Current number of requests allowed in flight
+        """
+        return int(self._limit)
+
+    @property
+    def rtt(self):
+        """
+        :type: tuple
+
+        Recent and no load round-trip time averages (seconds)
+        """
+        return self._rtt_recent, self._rtt_noload
+
+    def acquire(self, wait=True):
+        """
+        Take a slot for a request
+
+        :param wait: if False, return False instead of applying the policy
+        when the limit is reached
+        :type wait: bool
+
+        :return: True if the slot is taken
+        :rtype: bool
+        :raise: `OverloadError` if the request is rejected by the policy
+        """
+        with self._cond:
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return True
+            if not wait:
+                return False
+            if self.policy == POLICY_SHED or (
+                    self.max_queue is not None and
+                    self._waiting >= self.max_queue):
+                self.rejected += 1
+                raise OverloadError(
+                    0, 'Too many requests in flight (limit %d)' % self.limit)
+
+            self._waiting += 1
+            try:
+                deadline = None
+                if self.queue_timeout is not None:
+                    deadline = time.time() + self.queue_timeout
+                while self.in_flight >= self.limit:
+                    timeout = None
+                    if deadline is not None:
+                        timeout = deadline - time.time()
+                        if timeout <= 0:
+                            self.rejected += 1
+                            raise OverloadError(
+                                0, 'Timed out waiting for a request slot '
+                                   '(limit %d)' % self.limit)
+                    self._cond.wait(timeout)
+                self.in_flight += 1
+                return True
+            finally:
+                self._waiting -= 1
+
+    def release(self, rtt=None):
+        """
+        Free the slot of a completed request and adjust the limit
+
+        :param rtt: round-trip time of the request (seconds); None if
+        the request has not completed normally
+        :type rtt: float
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if rtt is not None:
+                self._update(rtt)
+            self._cond.notify()
+
+    def overload(self):
+        """
+        Decrease the limit after the server has asked to try again
+        """
+        with self._cond:
+            self._limit = max(self.min_limit, self._limit * self.backoff)
+
+    def _update(self, rtt):
+        if self._rtt_recent is None:
+            self._rtt_recent = self._rtt_noload = rtt
+            return
+        self._rtt_recent += (rtt - self._rtt_recent) * RTT_RECENT_WEIGHT
+        self._rtt_noload += (rtt - self._rtt_noload) * RTT_NOLOAD_WEIGHT
+        # The no load RTT follows the decrease of RTT immediately
+        self._rtt_noload = min(self._rtt_noload, self._rtt_recent)
+
+        gradient = max(0.5, min(1.0, self.tolerance * self._rtt_noload /
+                                self._rtt_recent))
+        if gradient == 1.0 and self.in_flight + 1 < self._limit / 2:
+            # The limit is not reached, so RTT says nothing about
+            # whether a larger limit is safe
+            return
+        # Allow the queue of about sqrt(limit) requests on the server
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = max(self.min_limit, min(
+            self.max_limit, self._limit * 0.8 + new_limit * 0.2))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`MirroredSpace`: an in-memory copy of a small,
+rarely changing (reference) space with client-side hash indexes.
+
+Example::
+
+    >>> countries = MirroredSpace(
+    ...     connection, 5, 'countries_page', indexes={0: (0, ), 1: (2, )},
+    ...     field_types=(int, unicode), refresh_interval=3600)
+    >>> countries.select(u'DE', index=1)
+    [(49, u'Germany', u'DE')]
+"""
+import time
+
+from tarantool._compat import bytes, basestring
+from tarantool.const import struct_LLL, REQUEST_TYPE_SELECT
+from tarantool.dump import pages, PAGE_SIZE
+from tarantool.response import Response, make_key
+from tarantool.error import DatabaseError, NetworkWarning, warn
+
+
+class MirroredSpace(object):
+    """
+    Local copy of a space answering selects without network requests.
+
+    The space is loaded with :func:`tarantool.dump.pages` (a list of keys
+    or a paginating Lua procedure) and reloaded on :meth:`refresh` or
+    when `refresh_interval` has passed since the last load.
+    """
+
+    def __init__(self, connection, space_no, keys_or_call, indexes=None,
+                 field_types=None, refresh_interval=None, index=0,
+                 page_size=PAGE_SIZE, key_fields=1):
+        """
+        Create the mirror and load the data.
+
+        :param connection: connection to the server
+        :type connection: :class:`~tarantool.connection.Connection` instance
+        :param int space_no: space id
+        :param keys_or_call: keys to load or paginating Lua procedure name
+        (see :func:`tarantool.dump.pages`)
+        :type keys_or_call: iterable or str
+        :param indexes: fields of the local indexes: ``{index_no: (field_no,
+        ...)}``; default is the single index on the first field
+        :type indexes: dict
+        :param field_types: Data types to be used for type conversion
+        :type field_types: tuple
+        :param refresh_interval: reload the data on access if it is older
+        than this (seconds); None means reload only on :meth:`refresh`
+        :type refresh_interval: float
+        :param index: index id used to select `keys_or_call` keys
+        :type index: int
+        """
+        self.connection = connection
+        self.space_no = space_no
+        self.indexes = indexes or {0: (0, )}
+        self.field_types = field_types
+        self.refresh_interval = refresh_interval
+        # Keys are materialized since they are used on each refresh
+        if not isinstance(keys_or_call, basestring):
+            keys_or_call = list(keys_or_call)
+        self._keys_or_call = keys_or_call
+        self._index = index
+        self._page_size = page_size
+        self._key_fields = key_fields
+        # Empty response is used to cast tuples in the same way as
+        # the responses received from the server do
+        self._decoder = Response(
+            struct_LLL.pack(REQUEST_TYPE_SELECT, 0, 0), None, field_types)
+        self._rows = ()
+        self._data = {}
+        self.loaded_at = None
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reload the data from the server and rebuild indexes.
+        Lookups running concurrently see either old or new data.
+
+        :raise: `DatabaseError`
+        """
+        rows = []
+        for response in pages(self.connection, self.space_no,
+                              self._keys_or_call, self._index,
+                              self._page_size, self._key_fields):
+            if self.field_types:
+                rows.extend(self._decoder._cast_tuple(row, position)
+                            for position, row in enumerate(response))
+            else:
+                rows.extend(response)
+
+        data = {}
+        for index_no, field_nos in self.indexes.items():
+            index = data[index_no] = {}
+            for row in rows:
+                key = make_key([row[i] for i in field_nos])
+                index.setdefault(key, []).append(row)
+
+        self._rows, self._data = tuple(rows), data
+        self.loaded_at = time.time()
+
+    def _check_refresh(self):
+        if self.refresh_interval is None or \
+                time.time() - self.loaded_at < self.refresh_interval:
+            return
+        try:
+            self.refresh()
+        except DatabaseError as e:
+            # Keep serving the stale data, retry after the interval
+            self.loaded_at = time.time()
+            warn('Failed to refresh mirror of space %d: %s' % (
+                self.space_no, e), NetworkWarning)
+
+    def select(self, values, index=0):
+        """
+        Select tuples by the local index
+
+        :param values: key or list of keys (same as for
+        :meth:`~tarantool.connection.Connection.select`)
+        :type values: scalar, list of scalars or list of tuples
+        :param index: local index id
+        :type index: int
+
+        :return: list of tuples
+        :rtype: list
+        """
+        self._check_refresh()
+        try:
+            data = self._data[index]
+        except KeyError:
+            raise ValueError('No local index %s' % index)
+
+        if isinstance(values, (int, bytes, basestring)):
+            values = [values]
+        result = []
+        for value in values:
+            result.extend(data.get(make_key(value), ()))
+        return result
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        self._check_refresh()
+        return iter(self._rows)
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`MultiplexProxy`: a local sidecar which
+accepts client connections on a unix socket and forwards their requests
+over a few pipelined connections to the server.
+
+Clients speak the usual binary protocol, so any
+:class:`~tarantool.connection.Connection` can use the proxy unchanged::
+
+    >>> connection = tarantool.Connection(
+    ...     unix_socket='/run/tarantool-proxy.sock')
+
+Each client is bound to one upstream connection when it is accepted, so
+its requests reach the server in the order they were sent (pipelined
+writes depending on each other are not reordered). The proxy rewrites
+`request_id` of each request to keep it unique on the upstream
+connection and restores it in the response. Requests of all
+clients queued for an upstream connection are sent by a single write.
+If an upstream connection breaks, the clients waiting for its responses
+are disconnected (and reconnect as usual).
+
+Command line usage::
+
+    python -m tarantool.proxy localhost 33013 \\
+        --listen /run/tarantool-proxy.sock --upstreams 2
+"""
+import os
+import socket
+import sys
+import threading
+
+from tarantool._compat import queue
+from tarantool.const import struct_LLL
+
+
+# Default number of upstream connections
+PROXY_UPSTREAMS = 2
+
+# Maximum size of requests coalesced into a single write (bytes)
+PROXY_WRITE_SIZE = 65536
+
+
+def _recv_exactly(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(length)
+        if not chunk:
+            return None
+        length -= len(chunk)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def _read_packet(sock):
+    """
+    :return: tuple (request_type, request_id, body) or None if
+    the connection is closed
+    """
+    header = _recv_exactly(sock, 12)
+    if header is None:
+        return None
+    request_type, body_length, request_id = struct_LLL.unpack(header)
+    body = _recv_exactly(sock, body_length) if body_length else b''
+    if body is None:
+        return None
+    return request_type, request_id, body
+
+
+class _Client(object):
+    """
+    Client connection accepted by the proxy
+    """
+
+    def __init__(self, proxy, sock, upstream):
+        self.proxy = proxy
+        self.sock = sock
+        #: Upstream connection forwarding all requests of the client
+        self.upstream = upstream
+        self.closed = False
+        # Reader threads of the broken and the reconnected upstream
+        # connections may write responses at the same time
+        self._lock = threading.Lock()
+
+    def start(self):
+        thread = threading.Thread(target=self._forward_requests)
+        thread.daemon = True
+        thread.start()
+
+    def _forward_requests(self):
+        try:
+            while not self.closed:
+                packet = _read_packet(self.sock)
+                if packet is None:
+                    break
+                if not self.upstream.send(self, *packet):
+                    # Server is unavailable
+                    break
+        except socket.error:
+            pass
+        self.close()
+
+    def send(self, packet):
+        try:
+            with self._lock:
+                self.sock.sendall(packet)
+        except socket.error:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.sock.close()
+        self.proxy._forget(self)
+
+
+class _Upstream(object):
+    """
+    Pipelined connection to the server shared by the clients
+    """
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.sock = None
+        #: Number of requests waiting for responses
+        self.pending = 0
+        #: Number of clients bound to the upstream
+        self.clients = 0
+        # upstream request_id -> (client, client request_id)
+        self._requests = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        # Requests to be written to the current connection
+        self._queue = None
+
+    def _connect(self):
+        """
+        Must be called with the lock held
+
+        :return: True if connected
+        """
+        try:
+            sock = socket.create_connection(
+                (self.proxy.upstream_host, self.proxy.upstream_port))
+        except socket.error:
+            return False
+        sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self._queue = queue.Queue()
+        for target, args in ((self._write, (sock, self._queue)),
+                             (self._read, (sock, ))):
+            thread = threading.Thread(target=target, args=args)
+            thread.daemon = True
+            thread.start()
+        return True
+
+    def send(self, client, request_type, request_id, body):
+        """
+        Queue the request of the client
+
+        :return: False if the server is unavailable
+        """
+        with self._lock:
+            if self.sock is None and not self._connect():
+                return False
+            upstream_id = self._next_id
+            self._next_id = (self._next_id + 1) & 0xffffffff
+            self._requests[upstream_id] = (client, request_id)
+            self.pending += 1
+            self._queue.put(struct_LLL.pack(
+                request_type, len(body), upstream_id) + body)
+        return True
+
+    def _write(self, sock, packets_queue):
+        while True:
+            packets = [packets_queue.get()]
+            if packets[0] is None:
+                return
+            # Take everything queued meanwhile and send it at once
+            size = len(packets[0])
+            while size < PROXY_WRITE_SIZE:
+                try:
+                    packet = packets_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if packet is None:
+                    packets_queue.put(None)
+                    break
+                packets.append(packet)
+                size += len(packet)
+            try:
+                sock.sendall(b''.join(packets))
+            except socket.error:
+                self._fail(sock)
+                return
+            self.proxy.writes += 1
+            self.proxy.requests += len(packets)
+
+    def _read(self, sock):
+        try:
+            while True:
+                packet = _read_packet(sock)
+                if packet is None:
+                    break
+                request_type, upstream_id, body = packet
+                with self._lock:
+                    origin = self._requests.pop(upstream_id, None)
+                    if origin is not None:
+                        self.pending -= 1
+                if origin is None:
+                    continue
+                client, request_id = origin
+                if not client.closed:
+                    client.send(struct_LLL.pack(
+                        request_type, len(body), request_id) + body)
+        except socket.error:
+            pass
+        self._fail(sock)
+
+    def _fail(self, sock):
+        """
+        Close the broken connection and disconnect the clients waiting
+        for its responses; the next request reconnects
+        """
+        with self._lock:
+            if self.sock is not sock:
+                # Already handled
+                return
+            self.sock = None
+            requests, self._requests = self._requests, {}
+            self.pending = 0
+            # Stop the writer, the requests queued for it are lost
+            self._queue.put(None)
+        try:
+            # Wakes up the reader
+            sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        sock.close()
+        for client, _ in requests.values():
+            client.close()
+
+    def close(self):
+        with self._lock:
+            sock = self.sock
+        if sock is not None:
+            self._fail(sock)
+
+
+class MultiplexProxy(object):
+    """
+    Unix socket proxy multiplexing client connections onto a few
+    upstream connections to the server
+    """
+
+    def __init__(self, upstream_host, upstream_port, path,
+                 upstreams=PROXY_UPSTREAMS):
+        """
+        :param str upstream_host: Server hostname or IP-address
+        :param int upstream_port: Server port
+        :param str path: path of the unix socket to listen on
+        :param upstreams: number of connections to the server
+        :type upstreams: int
+        """
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.path = path
+        #: Number of forwarded requests
+        self.requests = 0
+        #: Number of writes to the upstream connections
+        self.writes = 0
+        self._upstreams = [_Upstream(self) for _ in range(upstreams)]
+        self._clients = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            # Stale socket of the previous run
+            os.unlink(path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(path)
+        self._sock.listen(128)
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                sock, _ = self._sock.accept()
+            except socket.error:
+                return
+            with self._lock:
+                upstream = self._choose_upstream()
+                upstream.clients += 1
+                client = _Client(self, sock, upstream)
+                self._clients.add(client)
+            client.start()
+
+    def _choose_upstream(self):
+        """
+        Must be called with the lock held
+        """
+        return min(self._upstreams, key=lambda upstream: (
+            upstream.clients, upstream.pending))
+
+    def _forget(self, client):
+        with self._lock:
+            if client in self._clients:
+                self._clients.discard(client)
+                client.upstream.clients -= 1
+
+    @property
+    def clients(self):
+        """
+        :type: int
+
+        Number of connected clients
+        """
+        return len(self._clients)
+
+    def serve_forever(self):
+        """
+        Block until the proxy is closed
+        """
+        self._thread.join()
+
+    def close(self):
+        """
+        Stop accepting clients, close all connections and remove
+        the unix socket
+        """
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._sock.close()
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.close()
+        for upstream in self._upstreams:
+            upstream.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tarantool.proxy',
+        description='Multiplex local clients onto a few connections '
+                    'to the server')
+    parser.add_argument('host')
+    parser.add_argument('port', type=int)
+    parser.add_argument('--listen', required=True,
+                        help='path of the unix socket to listen on')
+    parser.add_argument('--upstreams', type=int, default=PROXY_UPSTREAMS,
+                        help='number of connections to the server '
+                             '(default: %d)' % PROXY_UPSTREAMS)
+    args = parser.parse_args(argv)
+
+    proxy = MultiplexProxy(args.host, args.port, args.listen,
+                           upstreams=args.upstreams)
+    sys.stderr.write('Proxying %s to %s:%d\n' % (
+        args.listen, args.host, args.port))
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.close()
+
+
+if __name__ == '__main__':
+    main()
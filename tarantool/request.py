@@ -5,10 +5,11 @@ Request types definitions
 
 import struct
 
-from tarantool._compat import bytes, basestring, long
+from tarantool._compat import bytes, basestring, long, unicode
 
 from tarantool.const import (
     struct_B, struct_BB, struct_BBB, struct_BBBB, struct_BBBBB, struct_BL,
+    struct_BQ,
     struct_L, struct_LL, struct_LLL, struct_LLLLL, struct_LB,
     REQUEST_TYPE_SELECT, REQUEST_TYPE_INSERT, REQUEST_TYPE_DELETE,
     REQUEST_TYPE_UPDATE, REQUEST_TYPE_CALL, UPDATE_OPERATION_CODE
@@ -28,12 +29,9 @@ class Request(object):
     request_type = None
 
     # Pre-generated results of pack_int_base128()
-    # for small arguments (0..16383)
-    _int_base128 = tuple((
-        struct_B.pack(val) if val < 128 else
-        struct_BB.pack(val >> 7 & 0xff | 0x80, val & 0x7F)
-        for val in range(0x4000)
-    ))
+    # for small arguments (0..16383), generated on the first use
+    # to keep `import tarantool` fast
+    _int_base128 = None
 
     def __init__(self):
         self._bytes = None
@@ -43,6 +41,22 @@ class Request(object):
         return self._bytes
     __str__ = __bytes__
 
+    @property
+    def request_id(self):
+        """
+        :type: int
+
+        Identifier of the request (`<request_id>` field of the header).
+        The server returns it back in the response header, so it is used to
+        match responses when several requests are sent at once.
+        """
+        return struct_L.unpack_from(self._bytes, 8)[0]
+
+    @request_id.setter
+    def request_id(self, value):
+        self._bytes = self._bytes[:8] + struct_L.pack(value) + \
+            self._bytes[12:]
+
     @classmethod
     def header(cls, body_length):
         return struct_LLL.pack(cls.request_type, body_length, 0)
@@ -61,6 +75,20 @@ class Request(object):
         """
         return struct_BL.pack(4, value)
 
+    @staticmethod
+    def pack_int64(value):
+        """
+        Pack 64 bit integer field
+        <field> ::= <int32_varint><data>
+
+        :param value: integer value to be packed
+        :type value: int
+
+        :return: packed value
+        :rtype: bytes
+        """
+        return struct_BQ.pack(8, value)
+
     @classmethod
     def pack_int_base128(cls, value):
         """
@@ -73,7 +101,15 @@ class Request(object):
         """
 
         if value < 1 << 14:
-            return cls._int_base128[value]
+            try:
+                return cls._int_base128[value]
+            except TypeError:
+                Request._int_base128 = tuple((
+                    struct_B.pack(val) if val < 128 else
+                    struct_BB.pack(val >> 7 & 0xff | 0x80, val & 0x7F)
+                    for val in range(0x4000)
+                ))
+                return cls._int_base128[value]
 
         if value < 1 << 21:
             return struct_BBB.pack(
@@ -113,6 +149,8 @@ class Request(object):
         :return: packed value
         :rtype: bytes
         """
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
         value_len_packed = cls.pack_int_base128(len(value))
         return struct.pack('<%ds%ds' % (
             len(value_len_packed), len(value)), value_len_packed, value)
@@ -132,6 +170,8 @@ class Request(object):
         if isinstance(value, (bytes, basestring)):
             return cls.pack_str(value)
         elif isinstance(value, (int, long)):
+            if value > 0xffffffff:
+                return cls.pack_int64(value)
             return cls.pack_int(value)
         else:
             raise TypeError('Invalid argument type %s. '
@@ -168,13 +208,15 @@ class RequestInsert(Request):
     """
     request_type = REQUEST_TYPE_INSERT
 
-    def __init__(self, space_no, values, return_tuple):
+    def __init__(self, space_no, values, return_tuple, layout=None):
         assert isinstance(values, (tuple, list))
         flags = 1 if return_tuple else 0
 
-        request_body = \
-            struct_LL.pack(space_no, flags) + \
-            self.pack_tuple(values)
+        # The layout packs the whole tuple at once if the values fit it
+        packed = layout.pack(values) if layout is not None else None
+        if packed is None:
+            packed = self.pack_tuple(values)
+        request_body = struct_LL.pack(space_no, flags) + packed
 
         self._bytes = self.header(len(request_body)) + request_body
 
@@ -309,13 +351,52 @@ class RequestCall(Request):
     """
     request_type = REQUEST_TYPE_CALL
 
-    def __init__(self, proc_name, args, return_tuple):
+    def __init__(self, proc_name, args, return_tuple, arg_types=None):
         flags = 1 if return_tuple else 0
         assert isinstance(args, (list, tuple))
-        # args explicitly casted to string due tarantool bug
+        if arg_types:
+            args = self.cast_args(args, arg_types)
+        else:
+            # args explicitly casted to string due tarantool bug
+            args = [arg if isinstance(arg, bytes) else str(arg)
+                    for arg in args]
         request_body = \
             struct_L.pack(flags) + \
             self.pack_field(proc_name) +\
-            self.pack_tuple(map(str, args))
+            self.pack_tuple(args)
 
         self._bytes = self.header(len(request_body)) + request_body
+
+    @staticmethod
+    def cast_args(args, arg_types):
+        """
+        Convert arguments to the declared types.
+        Integers are packed natively (4 or 8 bytes, see
+        :meth:`Request.pack_field`) and can be read in Lua
+        with ``box.unpack('i', arg)`` or ``box.unpack('l', arg)``.
+
+        :param args: function arguments
+        :type args: list or tuple
+        :param arg_types: types of the arguments (``int``, ``bytes``,
+        ``unicode`` or ``any`` to keep the value as is), the last type is
+        applied to the rest of the arguments
+        :type arg_types: tuple
+
+        :return: converted arguments
+        :rtype: list
+        """
+        result = []
+        for i, arg in enumerate(args):
+            cast_to = arg_types[i] if i < len(arg_types) else arg_types[-1]
+            if cast_to in (int, long):
+                result.append(int(arg))
+            elif cast_to in (bytes, unicode):
+                if isinstance(arg, (bytes, unicode)):
+                    result.append(arg)
+                else:
+                    result.append(str(arg))
+            elif cast_to is any:
+                result.append(arg)
+            else:
+                raise TypeError('Invalid argument type %s' % cast_to)
+        return result
@@ -1,20 +1,27 @@
 # -*- coding: utf-8 -*-
 import struct
 import sys
+from array import array
 
 from tarantool._compat import PY3, long, unicode
+from tarantool.compression import Compressed
 
 from tarantool.const import (
-    struct_L, struct_Q, REQUEST_TYPE_SELECT,
+    struct_L, struct_LL, struct_LLL, struct_Q, REQUEST_TYPE_SELECT,
     REQUEST_TYPE_INSERT, REQUEST_TYPE_DELETE, REQUEST_TYPE_UPDATE
 )
 from tarantool.error import DatabaseError
 
 
 if PY3:
-    to_ord = lambda a: a
+    def as_buffer(buff):
+        """
+        Return contents of the buffer as an object which yields integers
+        when indexed
+        """
+        return buff if isinstance(buff, bytes) else bytes(buff)
 else:
-    to_ord = ord
+    as_buffer = bytearray
 
 
 class field(bytes):
@@ -73,6 +80,222 @@ class field(bytes):
             return self.decode('utf-8', 'replace')
 
 
+def make_key(values):
+    """
+    Return hashable representation of a key: tuple of fields, so that
+    e.g. ``1`` and ``b'\\x01\\x00\\x00\\x00'`` give the same key
+
+    :param values: scalar key or tuple of values
+    :type values: int, str, bytes or tuple
+
+    :rtype: tuple of `field` instances
+    """
+    if not isinstance(values, (list, tuple)):
+        values = (values, )
+    return tuple([field(v) for v in values])
+
+
+# Raw bytes are stored in the field as is, so type checks of field.__new__
+# are skipped while decoding responses
+new_field = bytes.__new__
+
+
+def _has_interned(field_types):
+    """
+    :return: True if some of the fields (of some of the tuples) are interned
+    :rtype: bool
+    """
+    for field_type in field_types:
+        if isinstance(field_type, (list, tuple)):
+            if _has_interned(field_type):
+                return True
+        elif isinstance(field_type, Interned):
+            return True
+    return False
+
+
+class Interned(object):
+    """
+    Field type for low-cardinality fields (statuses, country codes etc).
+
+    Repeated values of the field are decoded once and the same object is
+    returned for each occurrence, so a large response does not hold many
+    copies of the same few values.
+
+    Use an instance in place of a type in ``field_types``::
+
+        >>> status = Interned(unicode)
+        >>> demo = connection.space(0, field_types=(int, status, bytes))
+
+    By default the table of values is shared by all responses decoded with
+    the same instance (e.g. by all selects from the same space).
+    With ``per_response=True`` each response gets its own table.
+    """
+
+    def __init__(self, cast_to=bytes, max_size=1024, per_response=False):
+        """
+        :param cast_to: native python type to cast values to
+        :type cast_to: a type object (one of bytes, int,
+            unicode (str for py3k))
+        :param max_size: maximum number of distinct values kept in the table,
+        values beyond this limit are decoded as usual
+        :type max_size: int
+        :param per_response: use a separate table for each response
+        :type per_response: bool
+        """
+        self.cast_to = cast_to
+        self.max_size = max_size
+        self.per_response = per_response
+        self._table = {}
+
+    def copy(self):
+        """
+        Return an instance with the same settings and an empty table
+        """
+        return Interned(self.cast_to, self.max_size, self.per_response)
+
+    def lookup(self, value):
+        """
+        Return decoded value from the table, add it to the table if missing
+
+        :param value: raw value from the database; the field is built
+        from it only if the value is missing in the table
+        :type value: bytes
+        """
+        try:
+            return self._table[value]
+        except KeyError:
+            result = Response._cast_field(
+                self.cast_to, new_field(field, value))
+            if len(self._table) < self.max_size:
+                self._table[value] = result
+            return result
+
+    def __len__(self):
+        return len(self._table)
+
+    def __repr__(self):
+        return 'Interned(%s)' % getattr(
+            self.cast_to, '__name__', self.cast_to)
+
+
+class FixedLayout(tuple):
+    """
+    Field types of tuples made of fixed-width fields: 32 and 64 bit
+    integers and strings of fixed length.
+
+    The whole tuple is encoded or decoded by a single precompiled
+    `struct.Struct` instead of field by field. Use an instance in place
+    of ``field_types``, it is applied both to the tuples sent by
+    INSERT requests and to the tuples of responses::
+
+        >>> counters = connection.space(0, field_types=FixedLayout('L', 'Q'))
+
+    Fields are declared with `struct` format codes: ``'L'`` (32 bit
+    unsigned integer), ``'Q'`` (64 bit unsigned integer) and ``'<N>s'``
+    (string of exactly N < 128 bytes).
+    Tuples which do not match the layout (e.g. strings of other length)
+    are encoded and decoded as usual with ``(int, int, bytes)`` types;
+    the layout itself is the tuple of these types.
+    """
+
+    #: Field type of each format code
+    TYPES = {'L': int, 'Q': int, 's': bytes}
+
+    def __new__(cls, *codes):
+        """
+        :param codes: format code of each field
+        :type codes: str
+        """
+        types = []
+        widths = []
+        for code in codes:
+            if code in ('L', 'Q'):
+                widths.append(struct.calcsize('<' + code))
+            elif code.endswith('s') and code[:-1].isdigit() and \
+                    0 < int(code[:-1]) < 128:
+                widths.append(int(code[:-1]))
+            else:
+                raise ValueError('Invalid field format %r' % code)
+            types.append(cls.TYPES[code[-1]])
+        layout = super(FixedLayout, cls).__new__(cls, types)
+        layout.codes = codes
+        #: Length byte of each field (the width fits a single varint byte)
+        layout.widths = tuple(widths)
+        # <cardinality>(<length><value>)+ of requests
+        fields = ''.join('B' + code for code in codes)
+        layout._tuple = struct.Struct('<L' + fields)
+        # <size><cardinality>(<length><value>)+ of responses
+        layout._row = struct.Struct('<LL' + fields)
+        layout._size = len(widths) + sum(widths)
+        # Expected <size><cardinality> of a row
+        layout._head = (layout._size, len(widths))
+        # Arguments of _tuple.pack() with the values to be filled in
+        layout._args = [len(widths)]
+        for width in widths:
+            layout._args.extend((width, None))
+        layout._strings = [2 + 2 * i for i, code in enumerate(codes)
+                           if code[-1] == 's']
+        return layout
+
+    def __reduce__(self):
+        # Pickled by the format codes (e.g. for bulk.parallel_load())
+        return FixedLayout, tuple(self.codes)
+
+    def pack(self, values):
+        """
+        Pack the tuple of values
+        <tuple> ::= <cardinality><field>+
+
+        :rtype: bytes or None if the values do not match the layout
+        """
+        if len(values) != len(self.widths):
+            return None
+        args = list(self._args)
+        args[2::2] = values
+        for i in self._strings:
+            value = args[i]
+            if isinstance(value, unicode):
+                value = args[i] = value.encode('utf-8')
+            if len(value) != args[i - 1]:
+                return None
+        try:
+            return self._tuple.pack(*args)
+        except struct.error:
+            return None
+
+    def unpack_rows(self, buff, offset, end, count):
+        """
+        Unpack `count` tuples (<fq_tuple>*) filling the buffer from
+        `offset` to `end`
+
+        :return: list of tuples or None if the tuples do not match
+        the layout
+        :rtype: list
+        """
+        row_size = self._row.size
+        if end - offset != count * row_size:
+            return None
+        if hasattr(self._row, 'iter_unpack'):
+            rows = self._row.iter_unpack(memoryview(buff)[offset:end])
+        else:
+            unpack_from = self._row.unpack_from
+            rows = (unpack_from(buff, start)
+                    for start in range(offset, end, row_size))
+        head = self._head
+        widths = self.widths
+        result = []
+        append = result.append
+        for row in rows:
+            if row[:2] != head or row[2::2] != widths:
+                return None
+            append(row[3::2])
+        return result
+
+    def __repr__(self):
+        return 'FixedLayout(%s)' % ', '.join(repr(c) for c in self.codes)
+
+
 class Response(list):
     """
     Represents a single response from the server in compliance with the
@@ -105,6 +328,12 @@ class Response(list):
         self._return_code = None
         self._return_message = None
         self._rowcount = None
+        if field_types and any(
+                isinstance(t, Interned) and t.per_response
+                for t in field_types):
+            field_types = tuple(
+                t.copy() if isinstance(t, Interned) and t.per_response else t
+                for t in field_types)
         self.field_types = field_types
 
         # Unpack header
@@ -115,22 +344,36 @@ class Response(list):
             self._unpack_body(body)
 
     @staticmethod
-    def _unpack_int_base128(varint, offset):
-        """Implement Perl unpack's 'w' option, aka base 128 decoding."""
-        res = to_ord(varint[offset])
-        if to_ord(varint[offset]) >= 0x80:
+    def _index_fields(data, offset, cardinality, index):
+        """
+        Scan <field>+ of the tuple and append start and end offsets
+        of each field data to `index`.
+        Field length is packed using base 128 encoding (Perl unpack's 'w').
+
+        :param data: buffer as returned by `as_buffer()`
+        :param offset: offset of the first field in the buffer
+        :type offset: int
+        :param cardinality: number of fields
+        :type cardinality: int
+        :param index: array to append offsets to
+        :type index: array('I')
+
+        :return: offset of the end of the tuple
+        :rtype: int
+        """
+        append = index.append
+        for _ in range(cardinality):
+            byte = data[offset]
             offset += 1
-            res = ((res - 0x80) << 7) + to_ord(varint[offset])
-            if to_ord(varint[offset]) >= 0x80:
+            length = byte & 0x7f
+            while byte >= 0x80:
+                byte = data[offset]
                 offset += 1
-                res = ((res - 0x80) << 7) + to_ord(varint[offset])
-                if to_ord(varint[offset]) >= 0x80:
-                    offset += 1
-                    res = ((res - 0x80) << 7) + to_ord(varint[offset])
-                    if to_ord(varint[offset]) >= 0x80:
-                        offset += 1
-                        res = ((res - 0x80) << 7) + to_ord(varint[offset])
-        return res, offset + 1
+                length = (length << 7) | (byte & 0x7f)
+            append(offset)
+            offset += length
+            append(offset)
+        return offset
 
     def _unpack_tuple(self, buff):
         """
@@ -138,24 +381,17 @@ class Response(list):
         <tuple> ::= <cardinality><field>+
 
         :param buff: byte array of the form <cardinality><field>+
-        :type buff: ctypes buffer or bytes
+        :type buff: bytes
 
         :return: tuple of unpacked values
         :rtype: tuple
         """
-
-        cardinality = struct_L.unpack_from(buff)[0]
-        _tuple = [''] * cardinality
-        # The first 4 bytes in the response body
-        # is the <count> we have already read
-        offset = 4
-        for i in range(cardinality):
-            field_size, offset = self._unpack_int_base128(buff, offset)
-            field_data = struct.unpack_from('<%ds' % field_size, buff, offset)
-            _tuple[i] = field(field_data[0])
-            offset += field_size
-
-        return tuple(_tuple)
+        data = as_buffer(buff)
+        index = array('I')
+        # The first 4 bytes is the <cardinality>
+        self._index_fields(data, 4, struct_L.unpack_from(data)[0], index)
+        return tuple([new_field(field, data[index[i]:index[i + 1]])
+                      for i in range(0, len(index), 2)])
 
     def _unpack_body(self, buff):
         """
@@ -170,7 +406,7 @@ class Response(list):
         <call_response_body>   ::= <count><fq_tuple>
 
         :param buff: buffer containing request body
-        :type byff: ctypes buffer
+        :type byff: bytes
         """
 
         # Unpack <return_code>
@@ -185,6 +421,9 @@ class Response(list):
             self._return_message = unicode(buff[4:-1], 'utf8', 'replace')
             if self._completion_status == 2:
                 raise DatabaseError(self._return_code, self._return_message)
+            # The body of the try again response (completion_status 1)
+            # contains the message only
+            return
 
         # If the response don't contains any tuples - there is
         # no tuples to unpack
@@ -198,25 +437,80 @@ class Response(list):
         if self._rowcount > 0:
             # The first 4 bytes in the response body
             # is the <count> we have already read
-            offset = 8
-            while offset < self._body_length:
-                # In response tuples have the form
-                # <size><tuple> (<fq_tuple> ::= <size><tuple>).
-                # Attribute <size> takes into account only size of tuple's
-                # <field> payload, but does not include 4-byte of
-                # <cardinality> field.
-                # Therefore the actual size of the <tuple> is greater
-                # to 4 bytes.
-                tuple_size = struct.unpack_from('<L', buff, offset)[0] + 4
-                tuple_data = struct.unpack_from(
-                    '<%ds' % (tuple_size), buff, offset + 4)[0]
-                tuple_value = self._unpack_tuple(tuple_data)
-                if self.field_types:
-                    self.append(self._cast_tuple(tuple_value))
-                else:
-                    self.append(tuple_value)
-                # This '4' is a size of <size> attribute
-                offset = offset + tuple_size + 4
+            self._unpack_tuples(buff, 8)
+
+    def _unpack_tuples(self, buff, offset):
+        """
+        Parse tuples of the response body (<fq_tuple>*) and append them to
+        the response
+
+        The body is scanned once and offsets of all fields are collected
+        into a compact array, then each field is a slice of the body.
+
+        :param buff: buffer containing request body
+        :type byff: bytes
+        :param offset: offset of the first tuple in the buffer
+        :type offset: int
+        """
+        if isinstance(self.field_types, FixedLayout):
+            rows = self.field_types.unpack_rows(
+                buff, offset, self._body_length, self._rowcount)
+            if rows is not None:
+                self.extend(rows)
+                return
+
+        data = as_buffer(buff)
+        # [<cardinality>, <start>, <end>, <start>, <end>, ..., <cardinality>,
+        # ...] for each tuple
+        index = array('I')
+        while offset < self._body_length:
+            # In response tuples have the form
+            # <size><tuple> (<fq_tuple> ::= <size><tuple>).
+            # Attribute <size> takes into account only size of tuple's
+            # <field> payload, but does not include 4-byte of
+            # <cardinality> field, so it is not used here.
+            cardinality = struct_LL.unpack_from(data, offset)[1]
+            index.append(cardinality)
+            offset = self._index_fields(data, offset + 8, cardinality, index)
+
+        interned = self.field_types and _has_interned(self.field_types)
+        i = 0
+        while i < len(index):
+            end = i + 1 + index[i] * 2
+            if interned:
+                self.append(self._cast_indexed(data, index, i + 1, end))
+                i = end
+                continue
+            tuple_value = tuple([new_field(field, data[index[j]:index[j + 1]])
+                                 for j in range(i + 1, end, 2)])
+            if self.field_types:
+                self.append(self._cast_tuple(tuple_value))
+            else:
+                self.append(tuple_value)
+            i = end
+
+    def _cast_indexed(self, data, index, start, end):
+        """
+        Decode the tuple from the field offsets collected by
+        _index_fields(). Interned values are looked up by the raw bytes,
+        so a field is built only for the values missing in the table.
+
+        :param start: position of the offsets of the first field in `index`
+        :param end: position following the offsets of the last field
+        """
+        field_types = self._tuple_types(len(self))
+        last = len(field_types) - 1
+        result = []
+        for n, j in enumerate(range(start, end, 2)):
+            cast_to = field_types[min(n, last)]
+            value = data[index[j]:index[j + 1]]
+            if isinstance(cast_to, Interned):
+                # Slices of bytearray (Python 2) are not hashable
+                result.append(cast_to.lookup(value if PY3 else bytes(value)))
+            else:
+                result.append(
+                    self._cast_field(cast_to, new_field(field, value)))
+        return tuple(result)
 
     @property
     def completion_status(self):
@@ -288,29 +582,63 @@ class Response(list):
             return cast_to(value)
         elif cast_to in (any, bytes):
             return value
+        elif isinstance(cast_to, Interned):
+            return cast_to.lookup(value)
+        elif isinstance(cast_to, Compressed):
+            return cast_to.decode(value)
         else:
             raise TypeError('Invalid field type %s' % cast_to)
 
-    def _cast_tuple(self, values):
+    def _tuple_types(self, position):
+        """
+        :param position: position of the tuple in the response
+        :type position: int
+
+        :return: field types of the tuple
+        :rtype: tuple
+        """
+        field_types = self.field_types
+        if isinstance(field_types[0], (list, tuple)):
+            # Types are declared for each tuple of the response separately,
+            # the last declaration is applied to the rest of the tuples
+            field_types = field_types[min(position, len(field_types) - 1)]
+        return field_types
+
+    def _cast_tuple(self, values, position=None):
         """
         Convert values of the tuple from raw bytes to native python types
 
         :param values: tuple of the raw database values
         :type value: tuple of bytes
+        :param position: position of the tuple in the response, selects
+        the field types if they are declared for each tuple (default is
+        the position following the tuples already in the response)
+        :type position: int
 
         :return: converted tuple value
         :rtype: value of native python types (bytes, int,
             unicode (or str for py3k))
         """
+        field_types = self._tuple_types(
+            len(self) if position is None else position)
         result = []
         for i, value in enumerate(values):
-            if i < len(self.field_types):
-                result.append(self._cast_field(self.field_types[i], value))
+            if i < len(field_types):
+                result.append(self._cast_field(field_types[i], value))
             else:
-                result.append(self._cast_field(self.field_types[-1], value))
+                result.append(self._cast_field(field_types[-1], value))
 
         return tuple(result)
 
+    def last_tuple(self):
+        """
+        Return the last tuple of the response
+
+        :return: tuple of values or None if the response is empty
+        :rtype: tuple
+        """
+        return self[-1] if self else None
+
     def __repr__(self):
         """
         Return user friendy string representation of the object.
@@ -337,3 +665,53 @@ class Response(list):
             reqs.get(self._request_type, 'affected')
         )
         return affected
+
+
+class RawResponse(Response):
+    """
+    Response which keeps the tuples in the wire format without decoding.
+
+    Raw tuples (<fq_tuple>*) are available as :attr:`data`, the response
+    list itself is always empty.
+    """
+
+    #: Tuples of the response in the wire format
+    data = b''
+
+    def _unpack_tuples(self, buff, offset):
+        self.data = buff[offset:self._body_length]
+
+    def packet(self):
+        """
+        Encode the response back to the wire format
+
+        :return: response header and body
+        :rtype: bytes
+        """
+        body = struct_LL.pack(
+            self._return_code << 8 | self._completion_status,
+            self._rowcount or 0) + bytes(self.data)
+        return struct_LLL.pack(self._request_type, len(body),
+                               self._request_id) + body
+
+    def last_tuple(self):
+        """
+        Decode the last tuple of the response
+
+        :return: tuple of unpacked values or None if the response is empty
+        :rtype: tuple
+        """
+        offset = 0
+        last = None
+        position = -1
+        while offset < len(self.data):
+            last = offset
+            position += 1
+            # <size> does not include <size> itself and <cardinality>
+            offset += struct_L.unpack_from(self.data, offset)[0] + 8
+        if last is None:
+            return None
+        tuple_value = self._unpack_tuple(self.data[last + 4:offset])
+        if self.field_types:
+            return self._cast_tuple(tuple_value, position)
+        return tuple_value
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`AccessSampler` which finds the most requested
+keys and stored procedures (hot keys) and the ones returning the most data.
+
+A sampled share of requests is decoded into :class:`Access` items which
+are counted by :class:`SpaceSaving` sketches of bounded size: one counts
+requests, the other one counts response bytes.
+
+Example::
+
+    >>> sampler = AccessSampler(rate=0.01)
+    >>> connection = tarantool.Connection('localhost', 33013,
+    ...                                   sampler=sampler)
+    >>> sampler.top(3)
+    [(Access(kind='select', space_no=0, index_no=0, key=(...)), 1200), ...]
+"""
+import collections
+import random
+import threading
+
+from tarantool._compat import bytes
+from tarantool.const import (
+    struct_L, struct_LL,
+    REQUEST_TYPE_SELECT, REQUEST_TYPE_INSERT, REQUEST_TYPE_DELETE,
+    REQUEST_TYPE_UPDATE, REQUEST_TYPE_CALL
+)
+from tarantool.response import Response, as_buffer, make_key
+
+
+# Default share of sampled requests
+SAMPLE_RATE = 0.01
+
+# Default number of items tracked by a sketch
+SAMPLE_CAPACITY = 1000
+
+
+#: Sampled access: `kind` is the request type ('select', 'insert',
+#: 'update', 'delete' or 'call'), `key` is the tuple of raw key fields
+#: (the first field of the inserted tuple) or the procedure name
+Access = collections.namedtuple(
+    'Access', ('kind', 'space_no', 'index_no', 'key'))
+
+
+class SpaceSaving(object):
+    """
+    Space-Saving sketch of the heaviest items.
+
+    At most `capacity` items are counted; a new item replaces the lightest
+    one and inherits its count as the possible error, so the counts of
+    the heavy items are overestimated by at most ``total / capacity``.
+    """
+
+    def __init__(self, capacity=SAMPLE_CAPACITY):
+        self.capacity = capacity
+        #: Total weight of the added items
+        self.total = 0
+        # item -> [count, error]
+        self._counters = {}
+
+    def add(self, item, weight=1):
+        self.total += weight
+        counter = self._counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self._counters) < self.capacity:
+            self._counters[item] = [weight, 0]
+            return
+        lightest = min(self._counters, key=lambda k: self._counters[k][0])
+        count = self._counters.pop(lightest)[0]
+        self._counters[item] = [count + weight, count]
+
+    def top(self, n):
+        """
+        Return `n` heaviest items
+
+        :return: list of tuples (item, count, error) in order of count
+        :rtype: list
+        """
+        items = sorted(self._counters.items(), key=lambda kv: -kv[1][0])
+        return [(item, count, error) for item, (count, error) in items[:n]]
+
+    def __len__(self):
+        return len(self._counters)
+
+
+def _unpack_fields(data, offset, cardinality):
+    """
+    Unpack `cardinality` fields starting at `offset`
+
+    :return: pair (tuple of fields, offset of the end of the fields)
+    """
+    index = []
+    end = Response._index_fields(data, offset, cardinality, index)
+    return make_key([bytes(data[index[i]:index[i + 1]])
+                     for i in range(0, len(index), 2)]), end
+
+
+def parse_request(request):
+    """
+    Decode the accessed space, index and keys from the encoded request
+
+    :param request: encoded request (header and body)
+    :type request: bytes
+
+    :return: list of accessed items
+    :rtype: list of :class:`Access`
+    """
+    data = as_buffer(request)
+    request_type = struct_L.unpack_from(data, 0)[0]
+    if request_type == REQUEST_TYPE_SELECT:
+        # <space_no><index_no><offset><limit><count><tuple>+
+        space_no, index_no = struct_LL.unpack_from(data, 12)
+        count = struct_L.unpack_from(data, 28)[0]
+        offset = 32
+        result = []
+        for _ in range(count):
+            cardinality = struct_L.unpack_from(data, offset)[0]
+            key, offset = _unpack_fields(data, offset + 4, cardinality)
+            result.append(Access('select', space_no, index_no, key))
+        return result
+    if request_type in (REQUEST_TYPE_INSERT, REQUEST_TYPE_DELETE,
+                        REQUEST_TYPE_UPDATE):
+        # <space_no><flags><tuple>...
+        space_no = struct_L.unpack_from(data, 12)[0]
+        cardinality = struct_L.unpack_from(data, 20)[0]
+        if request_type == REQUEST_TYPE_INSERT:
+            # The primary key is assumed to be the first field
+            kind, cardinality = 'insert', min(cardinality, 1)
+        elif request_type == REQUEST_TYPE_DELETE:
+            kind = 'delete'
+        else:
+            kind = 'update'
+        key = _unpack_fields(data, 24, cardinality)[0]
+        return [Access(kind, space_no, 0, key)]
+    if request_type == REQUEST_TYPE_CALL:
+        # <flags><proc_name>
+        proc_name = _unpack_fields(data, 16, 1)[0][0]
+        return [Access('call', None, None, bytes(proc_name))]
+    return []
+
+
+class AccessSampler(object):
+    """
+    Collects statistics of the sampled requests: the most frequently
+    accessed keys and procedures and the ones returning the most bytes.
+    """
+
+    def __init__(self, rate=SAMPLE_RATE, capacity=SAMPLE_CAPACITY):
+        """
+        :param rate: share of the sampled requests (0..1)
+        :type rate: float
+        :param capacity: number of items tracked by each sketch
+        :type capacity: int
+        """
+        self.rate = rate
+        #: Sketch of the number of requests
+        self.requests = SpaceSaving(capacity)
+        #: Sketch of the response bytes
+        self.bytes = SpaceSaving(capacity)
+        self._lock = threading.Lock()
+        self._random = random.random
+
+    def sample(self, request, response):
+        """
+        Account the request with probability `rate`
+
+        :param request: sent request
+        :type request: `Request` instance
+        :param response: received response
+        :type response: `Response` instance
+        """
+        if self._random() >= self.rate:
+            return
+        items = parse_request(bytes(request))
+        if not items:
+            return
+        # Response size is split evenly between the keys of the request
+        size = float(response._body_length or 0) / len(items)
+        with self._lock:
+            for item in items:
+                self.requests.add(item)
+                self.bytes.add(item, size)
+
+    def top(self, n=10, by='requests'):
+        """
+        Return the heaviest items
+
+        :param n: number of items
+        :type n: int
+        :param by: ``'requests'`` to order by the number of requests or
+        ``'bytes'`` to order by the response size
+        :type by: str
+
+        :return: list of pairs (:class:`Access`, estimated number of
+        requests or bytes) scaled by the sample rate
+        :rtype: list
+        """
+        if by not in ('requests', 'bytes'):
+            raise ValueError('Invalid order %r' % by)
+        with self._lock:
+            top = getattr(self, by).top(n)
+        return [(item, count / self.rate) for item, count, _ in top]
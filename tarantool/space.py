@@ -3,6 +3,15 @@
 This module provides :class:`~tarantool.space.Space` class.
 It is an object-oriented wrapper for request over Tarantool space.
 """
+from tarantool._compat import long
+from tarantool.compression import LazyField
+from tarantool.const import struct_Q, PAGE_SIZE, PRIORITY_INTERACTIVE
+from tarantool.response import field
+
+
+def _decoded(value):
+    # Values of compressed fields are compared and sent decompressed
+    return value.value if isinstance(value, LazyField) else value
 
 
 class Space(object):
@@ -12,7 +21,8 @@ class Space(object):
     syntax for database operations.
     """
 
-    def __init__(self, connection, space_no, field_types=None):
+    def __init__(self, connection, space_no, field_types=None,
+                 priority=PRIORITY_INTERACTIVE):
         """
         Create Space instance.
 
@@ -22,11 +32,15 @@ class Space(object):
         :type space_no: int
         :param field_types: Data types to be used for type conversion
         :type field_types: tuple
+        :param priority: default priority of the requests, ``'interactive'``
+        or ``'bulk'`` (see :class:`~tarantool.lanes.LanePool`)
+        :type priority: str
         """
 
         self.connection = connection
         self.space_no = space_no
         self.field_types = field_types
+        self.priority = priority
 
     def insert(self, values, return_tuple=False):
         """
@@ -52,6 +66,90 @@ class Space(object):
         return self.connection.update(
             self.space_no, key, op_list, return_tuple, self.field_types)
 
+    def update_from_diff(self, key, old_row, new_row, deltas=False,
+                         return_tuple=False):
+        """
+        Update single record so that it becomes `new_row`, sending only
+        the fields which differ from `old_row` (see :meth:`diff`).
+        Nothing is sent if the rows are equal.
+
+        :param key: key that identifies a record
+        :type key: int or str or tuple
+        :param old_row: current record (e.g. as returned by select)
+        :type old_row: tuple
+        :param new_row: modified record
+        :type new_row: tuple
+        :param deltas: send changes of integer fields as '+' operations
+        :type deltas: bool
+        :param return_tuple: indicates that it is required to return
+        the updated tuple back
+        :type return_tuple: bool
+
+        :rtype: :class:`~tarantool.response.Response` instance or None
+        if the rows are equal
+        """
+        op_list = self.diff(old_row, new_row, deltas)
+        if not op_list:
+            return None
+        return self.update(key, op_list, return_tuple)
+
+    @staticmethod
+    def diff(old_row, new_row, deltas=False):
+        """
+        Build the list of UPDATE operations turning `old_row` into `new_row`
+
+        Changed fields are assigned ('='). With `deltas` changes of integer
+        fields are sent as additions ('+') of the difference modulo the
+        field width, so concurrent increments are not lost.
+        Fields appended to or removed from the end of the row are inserted
+        or deleted.
+
+        :param old_row: current record; raw fields are compared as bytes,
+        :class:`~tarantool.compression.LazyField` values as decoded values
+        :type old_row: tuple
+        :param new_row: modified record
+        :type new_row: tuple
+        :param deltas: use '+' for integer fields
+        :type deltas: bool
+
+        :return: list of operations
+        :rtype: list of tuples (field_no, op_symbol, op_arg)
+        """
+        old_row = [_decoded(value) for value in old_row]
+        new_row = [_decoded(value) for value in new_row]
+        op_list = []
+        for field_no in range(min(len(old_row), len(new_row))):
+            old, new = field(old_row[field_no]), field(new_row[field_no])
+            if old == new:
+                continue
+            if deltas and isinstance(new_row[field_no], (int, long)) and \
+                    len(old) == len(new):
+                delta = int(new) - int(old)
+                if len(new) == 4:
+                    op_list.append((field_no, '+', delta % (1 << 32)))
+                else:
+                    # Pack as 8 bytes even if the value fits 32 bits
+                    op_list.append(
+                        (field_no, '+', struct_Q.pack(delta % (1 << 64))))
+            else:
+                op_list.append((field_no, '=', new_row[field_no]))
+        for field_no in range(len(old_row), len(new_row)):
+            op_list.append((field_no, 'insert', new_row[field_no]))
+        for field_no in reversed(range(len(new_row), len(old_row))):
+            op_list.append((field_no, 'delete', b''))
+        return op_list
+
+    def write_buffer(self, **kwargs):
+        """
+        Create write-behind buffer for the space.
+        Arguments are passed to :class:`~tarantool.writebuffer.WriteBuffer`.
+
+        :rtype: :class:`~tarantool.writebuffer.WriteBuffer` instance
+        """
+        # Imported here to keep `import tarantool` fast
+        from tarantool.writebuffer import WriteBuffer
+        return WriteBuffer(self, **kwargs)
+
     def select(self, values, **kwargs):
 
         # Initialize arguments and its defaults from **kwargs
@@ -61,10 +159,37 @@ class Space(object):
         offset = kwargs.get('offset', 0)
         limit = kwargs.get('limit', 0xffffffff)
         field_types = kwargs.get('field_types', self.field_types)
+        max_response_bytes = kwargs.get('max_response_bytes')
+        max_rows = kwargs.get('max_rows')
+        priority = kwargs.get('priority', self.priority)
+        # The default number of keys depends on the priority
+        chunking = {}
+        if 'max_keys' in kwargs:
+            chunking['max_keys'] = kwargs['max_keys']
 
         return self.connection.select(
             self.space_no, values, index=index, offset=offset, limit=limit,
-            field_types=field_types)
+            field_types=field_types, max_response_bytes=max_response_bytes,
+            max_rows=max_rows, priority=priority, **chunking)
 
     def call(self, func_name, *args, **kwargs):
+        kwargs.setdefault('priority', self.priority)
         return self.connection.call(func_name, *args, **kwargs)
+
+    def export(self, path, keys_or_call, index=0, page_size=PAGE_SIZE,
+               key_fields=1):
+        """
+        Export tuples of the space into the dump file without decoding them.
+        See :func:`tarantool.dump.export` for details.
+
+        :param path: dump file name
+        :type path: str
+        :param keys_or_call: keys to select or paginating Lua procedure name
+        :type keys_or_call: iterable or str
+
+        :return: number of exported tuples
+        :rtype: int
+        """
+        from tarantool.dump import export
+        return export(self.connection, self.space_no, path, keys_or_call,
+                      index=index, page_size=page_size, key_fields=key_fields)
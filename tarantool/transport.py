@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides transports used by
+:class:`~tarantool.connection.Connection` to reach the server.
+
+A transport is responsible only for establishing the connection.
+It returns a connected socket-like object which must provide ``sendall()``,
+``recv()``, ``settimeout()`` and ``close()`` methods.
+"""
+import socket
+import threading
+import time
+
+from tarantool._compat import queue
+from tarantool.const import DNS_CACHE_TTL, CONNECT_STAGGER
+
+
+# (host, port) -> (expiration time, addresses)
+_dns_cache = {}
+_dns_lock = threading.Lock()
+
+
+def _interleave(addresses):
+    """
+    Alternate address families keeping the order within a family,
+    so a broken family does not delay the other one (RFC 8305)
+    """
+    families = []
+    by_family = {}
+    for family, address in addresses:
+        if family not in by_family:
+            families.append(family)
+            by_family[family] = []
+        by_family[family].append((family, address))
+    result = []
+    while any(by_family.values()):
+        for family in families:
+            if by_family[family]:
+                result.append(by_family[family].pop(0))
+    return result
+
+
+def resolve(host, port, ttl=DNS_CACHE_TTL):
+    """
+    Resolve the server address (both IPv6 and IPv4), the result is cached
+    for `ttl` seconds
+
+    :param str host: Server hostname or IP-address
+    :param int port: Server port
+    :param ttl: cache time (seconds), 0 disables the cache
+    :type ttl: float
+
+    :return: list of pairs (address family, socket address) in order
+    of connection attempts
+    :rtype: list
+    :raise: `socket.error`
+    """
+    key = (host, port)
+    now = time.time()
+    if ttl:
+        with _dns_lock:
+            cached = _dns_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+    addresses = _interleave(
+        (family, address) for family, _, _, _, address in
+        socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM))
+    if ttl:
+        with _dns_lock:
+            _dns_cache[key] = (now + ttl, addresses)
+    return addresses
+
+
+def flush_dns_cache(host=None, port=None):
+    """
+    Forget the resolved addresses of the server (of all servers if `host`
+    is not passed)
+    """
+    with _dns_lock:
+        if host is None:
+            _dns_cache.clear()
+        else:
+            _dns_cache.pop((host, port), None)
+
+
+class Transport(object):
+    """
+    Abstract transport.
+    Specific transports are implemented by the inherited classes.
+    """
+
+    def open(self, timeout):
+        """
+        Establish new connection to the server
+
+        :param timeout: socket timeout (seconds)
+        :type timeout: float
+
+        :return: connected socket-like object
+        :raise: `socket.error`
+        """
+        raise NotImplementedError('Abstract method must be overridden')
+
+    @staticmethod
+    def _connect(sock, address, timeout):
+        try:
+            sock.settimeout(timeout)
+            sock.connect(address)
+        except socket.error:
+            sock.close()
+            raise
+        return sock
+
+
+class TCPTransport(Transport):
+    """
+    TCP/IP transport (the default one).
+
+    The server hostname is resolved once per `dns_ttl` seconds.
+    If it has several addresses (e.g. IPv6 and IPv4 ones) they are tried
+    "happy eyeballs" style: the next attempt starts if the previous ones
+    do not complete in `stagger` seconds, the first established connection
+    is used and the rest are closed.
+    """
+
+    def __init__(self, host, port, dns_ttl=DNS_CACHE_TTL,
+                 stagger=CONNECT_STAGGER):
+        """
+        :param str host: Server hostname or IP-address
+        :param int port: Server port
+        :param dns_ttl: time resolved addresses are cached for (seconds)
+        :type dns_ttl: float
+        :param stagger: delay between connection attempts (seconds)
+        :type stagger: float
+        """
+        self.host = host
+        self.port = port
+        self.dns_ttl = dns_ttl
+        self.stagger = stagger
+
+    def open(self, timeout):
+        addresses = resolve(self.host, self.port, self.dns_ttl)
+        try:
+            if len(addresses) == 1:
+                return self._open_address(addresses[0][0], addresses[0][1],
+                                          timeout)
+            return self._open_parallel(addresses, timeout)
+        except socket.error:
+            # The server may have moved, resolve it again next time
+            flush_dns_cache(self.host, self.port)
+            raise
+
+    def _open_address(self, family, address, timeout):
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+        return self._connect(sock, address, timeout)
+
+    def _open_parallel(self, addresses, timeout):
+        """
+        Connect to the addresses with staggered parallel attempts
+
+        :return: the first connected socket
+        :raise: `socket.error` of the last attempt if all of them failed
+        """
+        results = queue.Queue()
+        lock = threading.Lock()
+        connected = []
+
+        def attempt(family, address):
+            try:
+                sock = self._open_address(family, address, timeout)
+            except socket.error as e:
+                results.put((None, e))
+                return
+            with lock:
+                if connected:
+                    # Another attempt has won
+                    sock.close()
+                    return
+                connected.append(sock)
+            results.put((sock, None))
+
+        addresses = list(addresses)
+        pending = 0
+        error = None
+        while addresses or pending:
+            if addresses:
+                thread = threading.Thread(target=attempt,
+                                          args=addresses.pop(0))
+                thread.daemon = True
+                thread.start()
+                pending += 1
+            try:
+                # Start the next attempt if none complete in time
+                sock, e = results.get(
+                    timeout=self.stagger if addresses else None)
+            except queue.Empty:
+                continue
+            if sock is not None:
+                return sock
+            pending -= 1
+            error = e
+        raise error
+
+    def __repr__(self):
+        return '%s:%s' % (self.host, self.port)
+
+
+class UnixTransport(Transport):
+    """
+    Unix domain socket transport for the server running on the same host.
+    It bypasses TCP/IP stack and gives lower per-request latency.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: path to the server unix socket
+        """
+        self.path = path
+
+    def open(self, timeout):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        return self._connect(sock, self.path, timeout)
+
+    def __repr__(self):
+        return 'unix:%s' % self.path
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides :class:`WriteBuffer` which accumulates INSERT and
+UPDATE requests to a space and sends them to the server in pipelined
+batches from a background thread (write-behind).
+
+Consecutive updates of the same key are merged into a single request:
+'+' operations on the same field are summed and the last '=' wins.
+
+Example::
+
+    >>> counters = connection.space(1).write_buffer(flush_interval=0.5)
+    >>> counters.update(page_id, [(1, '+', 1)])
+    >>> counters.close()
+"""
+import threading
+
+from tarantool._compat import long
+from tarantool.connection import insert_request, update_request
+from tarantool.const import PIPELINE_WINDOW
+from tarantool.response import FixedLayout, make_key
+from tarantool.error import DatabaseError, NetworkError, warn
+
+
+# Default maximum number of buffered requests before flush
+WRITE_BUFFER_SIZE = 1000
+
+# Default interval between flushes (seconds)
+WRITE_BUFFER_FLUSH_INTERVAL = 1.0
+
+
+class Future(object):
+    """
+    Result of a buffered request (or of a flush) which becomes available
+    when the server acknowledges it
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._result = None
+        self._error = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        """
+        :rtype: bool
+
+        True if the result or the error is available
+        """
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the result
+
+        :param timeout: maximum time to wait (seconds)
+        :type timeout: float
+
+        :return: response of the request
+        :rtype: :class:`~tarantool.response.Response` instance
+        :raise: the error the request failed with;
+        `RuntimeError` on timeout
+        """
+        if not self._event.wait(timeout):
+            raise RuntimeError('Timed out waiting for the result')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def add_done_callback(self, callback):
+        """
+        Call `callback(future)` when the result is available
+        (immediately if it is already available)
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set(self, result, error):
+        with self._lock:
+            self._result = result
+            self._error = error
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+# Operations changing the value of a field in place
+_VALUE_OPS = ('=', '+', '&', '^', '|')
+
+# Operations shifting the numbers of the following fields
+_SHIFTING_OPS = ('insert', 'delete')
+
+
+def _int_width(value):
+    """
+    :return: size of the packed integer (4 or 8 bytes) or None if it
+    is out of range
+    """
+    if 0 <= value <= 0xffffffff:
+        return 4
+    if 0 <= value <= 0xffffffffffffffff:
+        return 8
+    return None
+
+
+def _field_widths(field_types):
+    """
+    :return: width of each integer field declared by the fixed layout
+    :rtype: tuple
+    """
+    if not isinstance(field_types, FixedLayout):
+        return ()
+    return tuple({'L': 4, 'Q': 8}.get(code) for code in field_types.codes)
+
+
+class _Update(object):
+    """
+    Buffered UPDATE request accumulating operations on the same key
+    """
+
+    def __init__(self, key, widths=()):
+        """
+        :param widths: width (4 or 8 bytes) of each integer field if it
+        is known, None otherwise
+        :type widths: tuple
+        """
+        self.key = key
+        self.widths = widths
+        self.op_list = []
+        self.futures = []
+
+    def merge(self, op_list):
+        for op in op_list:
+            field_no, op_symbol, op_arg = op
+            if any(prev[1] in _SHIFTING_OPS for prev in self.op_list) or \
+                    op_symbol in _SHIFTING_OPS:
+                # Field numbers of the following operations refer to
+                # the shifted fields, the operations are kept as is
+                self.op_list.append(op)
+                continue
+            last = None
+            for i, (prev_field_no, _, _) in enumerate(self.op_list):
+                if prev_field_no == field_no:
+                    last = i
+            if last is None:
+                self.op_list.append(op)
+                continue
+            _, prev_symbol, prev_arg = self.op_list[last]
+            if op_symbol == '=' and all(
+                    prev[1] in _VALUE_OPS for prev in self.op_list
+                    if prev[0] == field_no):
+                # Assignment overrides all previous operations on the field
+                self.op_list = [
+                    prev for prev in self.op_list if prev[0] != field_no]
+                self.op_list.append(op)
+            elif op_symbol == '+' and prev_symbol in ('+', '=') and \
+                    isinstance(prev_arg, (int, long)) and \
+                    isinstance(op_arg, (int, long)):
+                value = self._add(field_no, prev_symbol, prev_arg, op_arg)
+                if value is None:
+                    self.op_list.append(op)
+                else:
+                    self.op_list[last] = (field_no, prev_symbol, value)
+            else:
+                self.op_list.append(op)
+
+    def _add(self, field_no, prev_symbol, prev_arg, op_arg):
+        """
+        Merge '+' operation into the previous '+' or '=' operation
+
+        :return: argument of the merged operation or None if the result
+        of the merged operation could differ
+        """
+        if prev_symbol == '=':
+            # The assignment sets the width of the field
+            width = _int_width(prev_arg)
+        elif field_no < len(self.widths):
+            width = self.widths[field_no]
+        else:
+            width = None
+        arg_widths = (_int_width(prev_arg), _int_width(op_arg))
+        if None in arg_widths:
+            return None
+        if width is None:
+            # 32 and 64 bit fields give the same result only if the sum
+            # does not wrap around and is packed as the arguments are
+            value = prev_arg + op_arg
+            if _int_width(value) != max(arg_widths):
+                return None
+            return value
+        if max(arg_widths) > width:
+            # Rejected by the server
+            return None
+        # Addition wraps around on the server
+        value = (prev_arg + op_arg) % (1 << width * 8)
+        if prev_symbol == '=' and _int_width(value) != width:
+            # The assigned value would change the width of the field
+            return None
+        return value
+
+    def request(self, space_no, field_types):
+        return update_request(
+            space_no, self.key, self.op_list, False, field_types)
+
+
+class _Insert(object):
+    """
+    Buffered INSERT request
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.futures = []
+
+    def request(self, space_no, field_types):
+        return insert_request(space_no, self.values, False, field_types)
+
+
+class WriteBuffer(object):
+    """
+    Write-behind buffer of INSERT and UPDATE requests to a space.
+
+    Requests are accepted without blocking and sent by the background
+    thread when the buffer holds `max_size` requests or every
+    `flush_interval` seconds. Each call returns a :class:`Future`
+    resolved when the server acknowledges the request.
+    """
+
+    def __init__(self, space, max_size=WRITE_BUFFER_SIZE,
+                 flush_interval=WRITE_BUFFER_FLUSH_INTERVAL,
+                 window=PIPELINE_WINDOW, key_fields=1, on_error=None):
+        """
+        :param space: space to write to
+        :type space: :class:`~tarantool.space.Space` instance
+        :param max_size: number of buffered requests triggering a flush
+        :type max_size: int
+        :param flush_interval: maximum time requests are kept in the buffer
+        (seconds)
+        :type flush_interval: float
+        :param window: maximum number of requests in flight during a flush
+        :type window: int
+        :param key_fields: number of leading fields of an inserted tuple
+        forming the primary key
+        :type key_fields: int
+        :param on_error: function called as ``on_error(request, error)``
+        for each failed request
+        :type on_error: callable
+        """
+        self.space = space
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.window = window
+        self.key_fields = key_fields
+        self.on_error = on_error
+
+        self._entries = []
+        # Buffered updates which can still be merged, by key
+        self._updates = {}
+        self._flush_futures = []
+        self._closed = False
+        self._broken = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def insert(self, values):
+        """
+        Buffer INSERT request
+
+        :param values: record to be inserted
+        :type values: tuple
+
+        :rtype: :class:`Future` instance
+        """
+        entry = _Insert(values)
+        future = Future()
+        entry.futures.append(future)
+        with self._cond:
+            self._check_closed()
+            # Updates buffered before the insert must not be merged with
+            # the following ones
+            self._updates.pop(make_key(values[:self.key_fields]), None)
+            self._append(entry)
+        return future
+
+    def update(self, key, op_list):
+        """
+        Buffer UPDATE request, merge it with the buffered update of
+        the same key if possible
+
+        :param key: key that identifies a record
+        :type key: int or str or tuple
+        :param op_list: list of operations
+        :type op_list: list of tuples (field_no, op_symbol, op_arg)
+
+        :rtype: :class:`Future` instance
+        """
+        future = Future()
+        with self._cond:
+            self._check_closed()
+            entry = self._updates.get(make_key(key))
+            if entry is None:
+                entry = _Update(key, _field_widths(self.space.field_types))
+                self._updates[make_key(key)] = entry
+                self._append(entry)
+            entry.merge(op_list)
+            entry.futures.append(future)
+        return future
+
+    def flush(self):
+        """
+        Send buffered requests now
+
+        :return: future resolved when all requests buffered so far are
+        acknowledged (the result is the number of failed requests)
+        :rtype: :class:`Future` instance
+        """
+        future = Future()
+        with self._cond:
+            self._check_closed()
+            self._flush_futures.append(future)
+            self._cond.notify()
+        return future
+
+    def close(self):
+        """
+        Flush buffered requests and stop the background thread
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check_closed(self):
+        if self._closed:
+            raise RuntimeError('WriteBuffer is closed')
+
+    def _append(self, entry):
+        self._entries.append(entry)
+        if len(self._entries) >= self.max_size:
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not (self._closed or self._flush_futures or
+                        len(self._entries) >= self.max_size):
+                    self._cond.wait(self.flush_interval)
+                entries, self._entries = self._entries, []
+                self._updates = {}
+                flush_futures, self._flush_futures = self._flush_futures, []
+                closed = self._closed
+
+            errors = self._send(entries) if entries else 0
+            for future in flush_futures:
+                future._set(errors, None)
+            if closed:
+                return
+
+    def _send(self, entries):
+        """
+        Send entries in a pipelined batch and resolve their futures
+
+        :return: number of failed requests
+        """
+        space_no = self.space.space_no
+        field_types = self.space.field_types
+        pending = {}
+
+        def requests():
+            for entry in entries:
+                request = entry.request(space_no, field_types)
+                pending[request] = entry
+                yield request
+
+        connection = self.space.connection
+        errors = 0
+        try:
+            if self._broken:
+                with connection._lock:
+                    connection.connect()
+                self._broken = False
+            for request, result in connection._send_requests(
+                    requests(), self.window):
+                entry = pending.pop(request)
+                if isinstance(result, DatabaseError):
+                    errors += 1
+                    self._resolve(request, entry, None, result)
+                else:
+                    self._resolve(request, entry, result, None)
+        except NetworkError as e:
+            # Requests in flight and not sent yet are failed (it is unknown
+            # whether the server has applied the requests in flight),
+            # the connection is re-established before the next flush
+            self._broken = True
+            sent = dict((id(entry), request)
+                        for request, entry in pending.items())
+            for entry in entries:
+                if not entry.futures[0].done():
+                    errors += 1
+                    self._resolve(sent.get(id(entry)), entry, None, e)
+        return errors
+
+    def _resolve(self, request, entry, result, error):
+        if error is not None and self.on_error is not None:
+            try:
+                self.on_error(request, error)
+            except Exception as e:
+                warn('WriteBuffer error callback failed: %s' % e,
+                     RuntimeWarning)
+        for future in entry.futures:
+            future._set(result, error)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.admin module
+"""
+import threading
+import unittest
+
+import tarantool.admin
+from tarantool.error import DatabaseError
+
+from tests.tarantool.server import FakeAdminServer
+
+
+STAT = """---
+statistics:
+  REPLACE:              { rps:  2    , total:  %d           }
+  SELECT:               { rps:  10   , total:  %d           }
+  DELETE_1_3:           { rps:  0    , total:  0           }
+...
+"""
+
+SLAB = """---
+slab statistics:
+  classes:
+    - { item_size: 64, slabs: 1, items: 3, bytes_used: 192, bytes_free: 4194112 }
+    - { item_size: 72, slabs: 1, items: 1, bytes_used: 72, bytes_free: 4194232 }
+  items_used: 0.01%
+  arena_used: 12.50%
+...
+"""
+
+INFO = """---
+info:
+  version: "1.5.3-57-g2d9d7c4"
+  uptime: 1342
+  pid: 4521
+  lsn: 120
+  recovery_lag: 0.000
+  status: primary
+  config: "/etc/tarantool/tarantool.cfg"
+...
+"""
+
+
+class Parse(unittest.TestCase):
+
+    def test__stat(self):
+        self.assertEqual(tarantool.admin.parse(STAT % (7, 100)), {
+            'statistics': {
+                'REPLACE': {'rps': 2, 'total': 7},
+                'SELECT': {'rps': 10, 'total': 100},
+                'DELETE_1_3': {'rps': 0, 'total': 0}}})
+
+    def test__slab(self):
+        slab = tarantool.admin.parse(SLAB)['slab statistics']
+        self.assertEqual(slab['arena_used'], 12.5)
+        self.assertEqual(slab['items_used'], 0.01)
+        self.assertEqual(len(slab['classes']), 2)
+        self.assertEqual(slab['classes'][1], {
+            'item_size': 72, 'slabs': 1, 'items': 1, 'bytes_used': 72,
+            'bytes_free': 4194232})
+
+    def test__info(self):
+        info = tarantool.admin.parse(INFO)['info']
+        self.assertEqual(info['version'], '1.5.3-57-g2d9d7c4')
+        self.assertEqual(info['recovery_lag'], 0.0)
+        self.assertEqual(info['status'], 'primary')
+
+    def test__block_list(self):
+        text = '---\n- name: a\n  size: 1\n- name: b\n  size: [1, 2]\n...\n'
+        self.assertEqual(tarantool.admin.parse(text), [
+            {'name': 'a', 'size': 1}, {'name': 'b', 'size': [1, 2]}])
+
+    def test__scalar(self):
+        text = '---\nunknown command. try typing help.\n...\n'
+        self.assertEqual(tarantool.admin.parse(text),
+                         'unknown command. try typing help.')
+
+
+class AdminConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.totals = [0, 0]
+
+        def handler(command):
+            if command == 'show stat':
+                return STAT % tuple(self.totals)
+            if command == 'show slab':
+                return SLAB
+            if command == 'show info':
+                return INFO
+            return '---\nunknown command. try typing help.\n...\n'
+
+        self.server = FakeAdminServer(handler)
+        self.admin = tarantool.admin.AdminConnection(
+            self.server.host, self.server.port)
+
+    def tearDown(self):
+        self.admin.close()
+        self.server.close()
+
+    def test__commands(self):
+        self.assertEqual(self.admin.stat()['SELECT'],
+                         {'rps': 10, 'total': 0})
+        self.assertEqual(self.admin.slab()['arena_used'], 12.5)
+        self.assertEqual(self.admin.info()['uptime'], 1342)
+        with self.assertRaises(DatabaseError):
+            self.admin._section('show nothing', 'nothing')
+        self.assertEqual(self.server.requests, [
+            'show stat', 'show slab', 'show info', 'show nothing'])
+
+    def test__poll(self):
+        poller = tarantool.admin.Poller(self.admin)
+        first = poller.poll()
+        self.assertEqual(first.rates, None)
+        self.assertEqual(first.slab['arena_used'], 12.5)
+        self.totals[:] = [50, 1000]
+        poller.last.time -= 2
+        second = poller.poll()
+        self.assertAlmostEqual(second.rates['REPLACE'], 25, delta=1)
+        self.assertAlmostEqual(second.rates['SELECT'], 500, delta=10)
+        self.assertEqual(second.rates['DELETE_1_3'], 0)
+
+    def test__background(self):
+        samples = []
+        polled = threading.Event()
+
+        def callback(sample):
+            samples.append(sample)
+            if len(samples) == 2:
+                polled.set()
+
+        poller = tarantool.admin.Poller(self.admin, 0.01, callback)
+        poller.start()
+        self.assertTrue(polled.wait(5))
+        poller.stop()
+        self.assertIsNot(samples[1].rates, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.bulk module
+"""
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import tarantool.bulk
+import tarantool.connection
+from tarantool.response import FixedLayout
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def handler(request_type, request_id, body):
+    # Reject rows with the first field equal to 0
+    space_no, flags, cardinality, length, key = struct.unpack_from(
+        '<LLLBL', body)
+    if key == 0:
+        return pack_response(request_type, request_id,
+                             return_code=0x3802, message=b'Duplicate key')
+    return pack_response(request_type, request_id, rowcount=1)
+
+
+class Load(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__load(self):
+        """
+        Test pipelined load with failed rows
+        """
+        rows = [(i % 10, b'row') for i in range(100)]
+        stats = tarantool.bulk.load(self.conn, 1, iter(rows), window=7)
+        self.assertEqual(stats.rows, 90)
+        self.assertEqual(len(stats.errors), 10)
+        self.assertEqual(stats.errors[0][0], (0, b'row'))
+        self.assertEqual(stats.errors[0][1].args[0], 0x38)
+        self.assertFalse(stats.stopped)
+        self.assertEqual(len(self.server.requests), 100)
+
+        # The connection is usable after the load
+        self.assertEqual(self.conn.insert(1, (1, )).return_code, 0)
+
+    def test__max_errors(self):
+        """
+        Test that load stops when the error threshold is reached
+        """
+        rows = [(i % 10, ) for i in range(1000)]
+        stats = tarantool.bulk.load(self.conn, 1, rows, window=5,
+                                    max_errors=2)
+        self.assertTrue(stats.stopped)
+        self.assertEqual(len(stats.errors), 3)
+        self.assertTrue(len(self.server.requests) < 50)
+
+    def test__parallel_load(self):
+        """
+        Test load using a pool of worker processes
+        """
+        rows = [(i, ) for i in range(1, 1001)]
+        stats = tarantool.bulk.parallel_load(
+            self.server.host, self.server.port, 1, rows, processes=2,
+            chunk_size=100)
+        self.assertEqual(stats.rows, 1000)
+        self.assertEqual(stats.errors, [])
+        self.assertEqual(len(self.server.requests), 1000)
+
+        # Field types are passed to the workers
+        stats = tarantool.bulk.parallel_load(
+            self.server.host, self.server.port, 1, [(1, 2)], processes=1,
+            field_types=FixedLayout('L', 'Q'))
+        self.assertEqual(stats.rows, 1)
+        self.assertEqual(len(self.server.requests[-1]), 12 + 12 + 5 + 9)
+
+    def test__field_types(self):
+        """
+        Test that rows are encoded by the field types
+        """
+        tarantool.bulk.load(self.conn, 1, [(1, 2)],
+                            field_types=FixedLayout('L', 'Q'))
+        # <space_no><flags><cardinality> and two fields of 4 and 8 bytes
+        self.assertEqual(len(self.server.requests[0]), 12 + 12 + 5 + 9)
+
+
+class ReadCSV(unittest.TestCase):
+
+    def test__read_csv(self):
+        """
+        Test reading rows from the CSV file
+        """
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'data.tsv')
+            with open(path, 'wb') as f:
+                f.write(b'id\tname\tcity\n1\tAAA\tBBB\n2\tCCC\tDDD\n')
+            self.assertEqual(
+                list(tarantool.bulk.read_csv(
+                    path, (int, bytes), delimiter='\t', skip_header=True)),
+                [(1, b'AAA', b'BBB'), (2, b'CCC', b'DDD')])
+        finally:
+            shutil.rmtree(tmpdir)
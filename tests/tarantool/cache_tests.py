@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.cache module
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+import tarantool.cache
+import tarantool.connection
+import tarantool.request
+from tarantool.const import REQUEST_TYPE_SELECT
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def _fill(path, start):
+    cache = tarantool.cache.SharedCache(path)
+    for n in range(start, start + 100):
+        cache.set(b'key %d' % n, b'value %d' % n)
+    cache.close()
+
+
+class SharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test__set_get(self):
+        """
+        Test storing, replacing, expiration and invalidation of entries
+        """
+        cache = tarantool.cache.SharedCache(self.path, size=64 * 1024)
+        self.assertEqual(cache.get_packet(b'key'), None)
+        self.assertTrue(cache.set(b'key', b'value'))
+        self.assertTrue(cache.set(b'other', b'value 2'))
+        self.assertEqual(cache.get_packet(b'key'), b'value')
+        cache.set(b'key', b'new value')
+        self.assertEqual(cache.get_packet(b'key'), b'new value')
+        cache.invalidate(b'key')
+        self.assertEqual(cache.get_packet(b'key'), None)
+        cache.set(b'key', b'value', ttl=-1)
+        self.assertEqual(cache.get_packet(b'key'), None)
+        # Too large entries are not cached
+        self.assertFalse(cache.set(b'key', b'x' * cache.slot_size))
+        self.assertEqual(cache.get_packet(b'other'), b'value 2')
+        cache.clear()
+        self.assertEqual(cache.get_packet(b'other'), None)
+        cache.close()
+
+    def test__eviction(self):
+        """
+        Test that the least recently used entry of the set is evicted
+        """
+        # A single set of 4 slots
+        cache = tarantool.cache.SharedCache(
+            self.path, size=16 + 4 * 256, slot_size=256, ways=4)
+        for n in range(4):
+            cache.set(b'key %d' % n, b'value')
+        cache.get_packet(b'key 0')
+        cache.set(b'key 4', b'value')
+        self.assertEqual(cache.get_packet(b'key 1'), None)
+        for n in (0, 2, 3, 4):
+            self.assertEqual(cache.get_packet(b'key %d' % n), b'value')
+        cache.close()
+
+    def test__processes(self):
+        """
+        Test that entries are shared by processes
+        """
+        cache = tarantool.cache.SharedCache(
+            self.path, size=1024 * 1024, slot_size=256)
+        workers = [multiprocessing.Process(target=_fill,
+                                           args=(self.path, start))
+                   for start in (0, 100)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        for n in range(200):
+            self.assertEqual(cache.get_packet(b'key %d' % n),
+                             b'value %d' % n)
+        cache.close()
+
+    def test__invalid_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'x' * 100)
+        with self.assertRaises(ValueError):
+            tarantool.cache.SharedCache(self.path)
+
+
+class ConnectionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = tarantool.cache.SharedCache(
+            os.path.join(self.dir, 'cache'), size=64 * 1024)
+        self.server = FakeServer(handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, select_cache=self.cache)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+        self.cache.close()
+        shutil.rmtree(self.dir)
+
+    def test__select(self):
+        """
+        Test that repeated selects are answered from the cache
+        """
+        first = self.conn.select(1, [1, 2], field_types=(int, bytes))
+        self.assertEqual(list(first), ROWS[:2])
+        self.assertEqual(first.rowcount, 2)
+        requests = len(self.server.requests)
+        second = self.conn.select(1, [1, 2], field_types=(int, bytes))
+        self.assertEqual(list(second), ROWS[:2])
+        self.assertEqual(second.rowcount, 2)
+        self.assertEqual(len(self.server.requests), requests)
+        self.conn.select(1, [3])
+        self.assertEqual(len(self.server.requests), requests + 1)
+
+    def test__errors_not_cached(self):
+        def error_handler(request_type, request_id, body):
+            return pack_response(REQUEST_TYPE_SELECT, request_id,
+                                 return_code=0x0202, message=b'Failed')
+        self.server.handler = error_handler
+        for _ in range(2):
+            with self.assertRaises(tarantool.error.DatabaseError):
+                self.conn.select(1, [1])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test__write_invalidates(self):
+        """
+        Test that writes hide the cached selects from the written space
+        """
+        def write_handler(request_type, request_id, body):
+            if request_type == REQUEST_TYPE_SELECT:
+                return handler(request_type, request_id, body)
+            return pack_response(request_type, request_id, [])
+        self.server.handler = write_handler
+        self.conn.select(1, [1])
+        self.conn.select(2, [1])
+        requests = len(self.server.requests)
+        self.conn.insert(1, (6, b'value 6'))
+        self.conn.select(2, [1])
+        self.assertEqual(len(self.server.requests), requests + 1)
+        self.conn.select(1, [1])
+        self.assertEqual(len(self.server.requests), requests + 2)
+        # Writes sent in a pipeline invalidate the space as well
+        list(self.conn._send_requests(
+            [tarantool.request.RequestInsert(2, (7, b'value 7'), False)]))
+        self.conn.select(1, [1])
+        self.conn.select(2, [1])
+        self.assertEqual(len(self.server.requests), requests + 4)
+
+    def test__memory_budget(self):
+        """
+        Test that responses built from the cache are counted in the budget
+        """
+        conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, select_cache=self.cache,
+            memory_budget=1024)
+        try:
+            response = conn.select(1, [1, 2])
+            first = conn.memory_used
+            self.assertTrue(first > 0)
+            cached = conn.select(1, [1, 2])
+            self.assertEqual(conn.memory_used, 2 * first)
+            del response, cached
+            self.assertEqual(conn.memory_used, 0)
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.capture module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import tarantool.capture
+import tarantool.connection
+import tarantool.request
+from tarantool.error import NetworkError, NetworkWarning
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+class Capture(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(
+            lambda request_type, request_id, body: pack_response(
+                request_type, request_id, [(1, b'AAA')]))
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'traffic.log')
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test__record(self):
+        """
+        Test recording of requests sent through the connection
+        """
+        recorder = tarantool.capture.Recorder(self.path)
+        conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, recorder=recorder)
+        conn.insert(1, (1, b'AAA'))
+        conn.select(1, 1)
+        conn.close()
+        recorder.close()
+
+        records = list(tarantool.capture.read_log(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(
+            records[0].request,
+            bytes(tarantool.request.RequestInsert(1, (1, b'AAA'), False)))
+        self.assertEqual(
+            records[1].request,
+            bytes(tarantool.request.RequestSelect(1, 0, [(1, )], 0,
+                                                  0xffffffff)))
+        self.assertEqual(
+            records[1].response, pack_response(17, 0, [(1, b'AAA')]))
+        self.assertTrue(records[0].timestamp <= records[1].timestamp)
+
+    def test__append(self):
+        """
+        Test that recorder appends to the existing log
+        """
+        for _ in range(2):
+            recorder = tarantool.capture.Recorder(self.path)
+            recorder.record(1.0, b'request', b'header', b'body')
+            recorder.close()
+        records = list(tarantool.capture.read_log(self.path))
+        self.assertEqual(
+            records, [(1.0, b'request', b'headerbody')] * 2)
+
+    def test__replay(self):
+        """
+        Test replaying of the log over several connections
+        """
+        recorder = tarantool.capture.Recorder(self.path)
+        for i in range(10):
+            recorder.record(
+                i * 0.001, bytes(tarantool.request.RequestInsert(
+                    1, (i, ), False)), b'', b'')
+        recorder.close()
+
+        result = tarantool.capture.replay(
+            self.path, self.server.host, self.server.port,
+            connections=3, speed=None)
+        self.assertEqual(result.requests, 10)
+        self.assertEqual(result.errors, 0)
+        self.assertEqual(len(self.server.requests), 10)
+
+    def test__recorder_error(self):
+        """
+        Test that an error of the recorder is not taken for a network error
+        (the request is not resent)
+        """
+        class BrokenRecorder(object):
+            def record(self, *args):
+                raise IOError(28, 'No space left on device')
+
+        conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, recorder=BrokenRecorder())
+        with self.assertRaises(IOError) as context:
+            conn.insert(1, (1, b'AAA'))
+        self.assertNotIsInstance(context.exception, NetworkError)
+        conn.close()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test__replay_network_error(self):
+        """
+        Test that the error stopping a connection is raised by replay()
+        """
+        recorder = tarantool.capture.Recorder(self.path)
+        recorder.record(0.0, bytes(tarantool.request.RequestInsert(
+            1, (1, ), False)), b'', b'')
+        recorder.close()
+
+        self.server.handler = lambda *args: None
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', NetworkWarning)
+            with self.assertRaises(NetworkError):
+                tarantool.capture.replay(
+                    self.path, self.server.host, self.server.port,
+                    speed=None)
+
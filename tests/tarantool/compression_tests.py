@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.compression module
+"""
+import json
+import struct
+import unittest
+
+import tarantool.connection
+from tarantool._compat import unicode
+from tarantool.compression import (
+    Compressed, LazyField, benchmark, encode_operations, make_payload
+)
+
+from tests.tarantool.server import FakeServer
+
+
+def echo_handler(request_type, request_id, body):
+    # INSERT returns the inserted tuple: <space_no><flags><tuple>
+    packed = body[8:]
+    response = struct.pack('<LLL', 0, 1, len(packed) - 4) + packed
+    return struct.pack('<LLL', request_type, len(response),
+                       request_id) + response
+
+
+class Codec(unittest.TestCase):
+
+    def test__roundtrip(self):
+        codec = Compressed(threshold=100)
+        payload = make_payload(5000)
+        encoded = codec.encode(payload)
+        self.assertEqual(encoded[:1], b'\x01')
+        self.assertLess(len(encoded), len(payload) / 2)
+        decoded = codec.decode(encoded)
+        self.assertIsInstance(decoded, LazyField)
+        self.assertEqual(decoded, payload)
+        self.assertEqual(decoded.value, payload)
+        self.assertEqual(len(decoded), len(payload))
+        self.assertEqual(decoded.compressed_size, len(encoded))
+        self.assertEqual(Compressed(lazy=False).decode(encoded), payload)
+
+    def test__small(self):
+        codec = Compressed(threshold=100)
+        self.assertEqual(codec.encode(b'short'), b'short')
+        decoded = codec.decode(b'short')
+        self.assertIsInstance(decoded, LazyField)
+        self.assertFalse(decoded.compressed)
+        self.assertEqual(decoded.value, b'short')
+        # Values starting with the marker bytes are escaped
+        self.assertEqual(codec.encode(b'\x01abc'), b'\x00\x01abc')
+        self.assertEqual(codec.decode(b'\x00\x01abc').value, b'\x01abc')
+        self.assertEqual(
+            Compressed(lazy=False).decode(b'\x00\x01abc'), b'\x01abc')
+        # Integers are not compressed
+        self.assertEqual(codec.encode(5), 5)
+
+    def test__incompressible(self):
+        codec = Compressed(threshold=10)
+        payload = bytes(bytearray(range(256)))
+        self.assertEqual(codec.encode(payload), b'\x00' + payload)
+
+    def test__unicode(self):
+        codec = Compressed(unicode, threshold=10)
+        text = u'значение ' * 100
+        self.assertEqual(codec.decode(codec.encode(text)).value, text)
+        with self.assertRaises(TypeError):
+            Compressed(int)
+
+    def test__operations(self):
+        codec = Compressed(threshold=100)
+        payload = make_payload(1000)
+        op_list = encode_operations(
+            [(1, '=', payload), (1, 'splice', payload), (2, '=', payload)],
+            (int, codec, bytes))
+        self.assertEqual(op_list[0], (1, '=', codec.encode(payload)))
+        self.assertEqual(op_list[1:], [(1, 'splice', payload),
+                                       (2, '=', payload)])
+
+    def test__benchmark(self):
+        results = benchmark(sizes=(5, ), levels=(1, 9), repeat=2)
+        self.assertEqual([r[:2] for r in results], [(5, 1), (5, 9)])
+        for _, _, ratio, compress_time, decompress_time in results:
+            self.assertLess(ratio, 0.5)
+            self.assertGreater(compress_time, 0)
+
+
+class Connection(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(echo_handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__insert(self):
+        document = make_payload(20000)
+        space = self.conn.space(1, field_types=(int, Compressed()))
+        response = space.insert((1, document), return_tuple=True)
+        # The value is compressed on the wire
+        self.assertLess(len(self.server.requests[0]), len(document) / 2)
+        self.assertEqual(response[0][0], 1)
+        self.assertEqual(response[0][1].value, document)
+
+    def test__field_type(self):
+        """
+        Test that small and large values are decoded to the same type
+        """
+        for lazy, field_type in ((True, LazyField), (False, unicode)):
+            space = self.conn.space(
+                1, field_types=(int, Compressed(unicode, lazy=lazy)))
+            for document in (u'{}', make_payload(20000).decode('utf-8')):
+                field = space.insert((1, document), return_tuple=True)[0][1]
+                self.assertIsInstance(field, field_type)
+                if lazy:
+                    field = field.value
+                self.assertEqual(json.loads(field), json.loads(document))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.connection module
+"""
+import struct
+import unittest
+import warnings
+
+import tarantool.connection
+import tarantool.response
+from tarantool.error import NetworkError, NetworkWarning
+from tarantool.limiter import ConcurrencyLimiter
+from tarantool.request import RequestInsert
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def select_handler(request_type, request_id, body):
+    # Return a tuple (key, key * 2) for every requested integer key
+    count = struct.unpack_from('<L', body, 16)[0]
+    result = []
+    for i in range(count):
+        key = struct.unpack_from('<L', body, 20 + i * 9 + 5)[0]
+        result.append((key, key * 2))
+    return pack_response(request_type, request_id, result)
+
+
+def insert_handler(request_type, request_id, body):
+    # Return the inserted tuple of a single integer field
+    key = struct.unpack_from('<L', body, 13)[0]
+    if key == 13:
+        # Response to a request which has not been sent
+        request_id += 1000
+    return pack_response(request_type, request_id, [(key, )])
+
+
+class SelectChunked(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(select_handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, max_select_keys=10)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__chunks(self):
+        """
+        Test that large key lists are split into chunks and merged in order
+        """
+        keys = list(range(1, 96))
+        response = self.conn.select(1, keys, field_types=(int, ))
+        self.assertEqual(response, [(k, k * 2) for k in keys])
+        self.assertEqual(response.rowcount, 95)
+        self.assertEqual(len(self.server.requests), 10)
+
+    def test__generator(self):
+        """
+        Test select using generator of keys
+        """
+        response = self.conn.select(
+            1, ((k, ) for k in range(1, 26)), field_types=(int, ),
+            offset=3, limit=5, max_keys=4)
+        self.assertEqual(response, [(k, k * 2) for k in range(4, 9)])
+        self.assertEqual(len(self.server.requests), 7)
+
+    def test__small(self):
+        """
+        Test that short key lists are sent as a single request
+        """
+        response = self.conn.space(1, field_types=(int, )).select([1, 2, 3])
+        self.assertEqual(response, [(1, 2), (2, 4), (3, 6)])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test__fixed_layout(self):
+        """
+        Test select with the fixed layout of tuples
+        """
+        layout = tarantool.response.FixedLayout('L', 'L')
+        response = self.conn.space(1, field_types=layout).select(
+            list(range(1, 16)))
+        self.assertEqual(response, [(k, k * 2) for k in range(1, 16)])
+        self.assertEqual(len(self.server.requests), 2)
+
+
+class Pipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(insert_handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+        warnings.simplefilter('ignore', NetworkWarning)
+
+    def tearDown(self):
+        warnings.resetwarnings()
+        self.conn.close()
+        self.server.close()
+
+    def requests(self, keys):
+        return (RequestInsert(1, (key, ), True) for key in keys)
+
+    def test__close_early(self):
+        """
+        Test that responses left in flight are not read by the next request
+        """
+        results = self.conn._send_requests(self.requests(range(10)),
+                                           field_types=(int, ))
+        request, response = next(results)
+        self.assertEqual(response, [(0, )])
+        results.close()
+        self.assertIsNone(self.conn._socket)
+        # The connection is reopened without a reconnect delay
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response = self.conn.insert(1, (777, ), True,
+                                        field_types=(int, ))
+        self.assertEqual(response, [(777, )])
+        self.assertEqual(caught, [])
+
+        results = self.conn._send_requests(self.requests(range(10)))
+        next(results)
+        results.close()
+        self.assertGreater(self.conn.ping(), 0)
+
+    def test__iterator_error(self):
+        """
+        Test that the limiter slot is released if the requests fail
+        """
+        self.conn.limiter = ConcurrencyLimiter(initial_limit=4)
+
+        def requests():
+            for request in self.requests(range(3)):
+                yield request
+            raise ValueError('Invalid row')
+
+        with self.assertRaises(ValueError):
+            list(self.conn._send_requests(requests()))
+        self.assertEqual(self.conn.limiter.in_flight, 0)
+
+    def test__unknown_request_id(self):
+        with self.assertRaises(NetworkError):
+            list(self.conn._send_requests(self.requests(range(10, 20))))
+        # The connection is reopened
+        response = self.conn.insert(1, (5, ), True, field_types=(int, ))
+        self.assertEqual(response, [(5, )])
+
+    def test__request_id_mismatch(self):
+        """
+        Test that a response to another request is not returned
+        """
+        self.conn.reconnect_max_attempts = 1
+        with self.assertRaises(NetworkError):
+            self.conn.insert(1, (13, ), True)
+        # Each attempt gets the response of a wrong request id
+        self.assertEqual(len(self.server.requests),
+                         self.conn.reconnect_max_attempts + 1)
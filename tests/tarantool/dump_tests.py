@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.dump module
+"""
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import tarantool.connection
+import tarantool.dump
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+ROWS = [(i, b'value %d' % i) for i in range(1, 6)]
+
+
+def unpack_fields(body, offset):
+    """
+    Unpack <tuple> with fields shorter than 128 bytes
+    """
+    cardinality = struct.unpack_from('<L', body, offset)[0]
+    offset += 4
+    fields = []
+    for _ in range(cardinality):
+        length = struct.unpack_from('<B', body, offset)[0]
+        fields.append(body[offset + 1:offset + 1 + length])
+        offset += 1 + length
+    return fields, offset
+
+
+def handler(request_type, request_id, body):
+    if request_type == 17:
+        # select: return rows with the given keys
+        count = struct.unpack_from('<L', body, 16)[0]
+        offset = 20
+        result = []
+        for _ in range(count):
+            key, offset = unpack_fields(body, offset)
+            key = struct.unpack('<L', key[0])[0]
+            result.extend(row for row in ROWS if row[0] == key)
+        return pack_response(request_type, request_id, result)
+    # call: return the page following the key
+    # <flags><proc_name><tuple>
+    offset = 5 + struct.unpack_from('<B', body, 4)[0]
+    args, _ = unpack_fields(body, offset)
+    limit = int(args[0])
+    last = struct.unpack('<L', args[1])[0] if len(args) > 1 else 0
+    page = [row for row in ROWS if row[0] > last][:limit]
+    return pack_response(request_type, request_id, page)
+
+
+class Export(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'space.dump')
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test__export_keys(self):
+        """
+        Test export using multi-key selects
+        """
+        space = self.conn.space(1)
+        self.assertEqual(
+            space.export(self.path, iter([1, 3, 4, 10, 5]), page_size=2), 4)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(
+            list(tarantool.dump.DumpReader(self.path, (int, bytes))),
+            [ROWS[0], ROWS[2], ROWS[3], ROWS[4]])
+
+    def test__export_call(self):
+        """
+        Test export using paginating Lua procedure
+        """
+        space = self.conn.space(1)
+        self.assertEqual(space.export(self.path, 'dump', page_size=2), 5)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(
+            list(tarantool.dump.DumpReader(self.path, (int, bytes))), ROWS)
+
+    def test__empty(self):
+        """
+        Test reading of the empty dump
+        """
+        self.assertEqual(self.conn.space(1).export(self.path, [100]), 0)
+        self.assertEqual(list(tarantool.dump.DumpReader(self.path)), [])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.faultproxy module
+"""
+import collections
+import time
+import unittest
+import warnings
+
+import tarantool.connection
+from tarantool.error import NetworkWarning, RetryWarning
+from tarantool.faultproxy import (
+    Fault, FaultProxy, LatencyReport, measure, run_scenarios
+)
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer
+
+
+def select(connection):
+    return connection.select(1, 1, field_types=(int, bytes))
+
+
+class Proxy(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.proxy = FaultProxy(self.server.host, self.server.port)
+        self.conn = None
+        warnings.simplefilter('ignore', NetworkWarning)
+        warnings.simplefilter('ignore', RetryWarning)
+
+    def tearDown(self):
+        warnings.resetwarnings()
+        if self.conn is not None and self.conn._socket is not None:
+            self.conn.close()
+        self.proxy.close()
+        self.server.close()
+
+    def connect(self):
+        self.conn = tarantool.connection.Connection(
+            self.proxy.host, self.proxy.port, reconnect_delay=0.01)
+        return self.conn
+
+    def test__forward(self):
+        self.proxy.fault = Fault(split=3, bandwidth=100000)
+        conn = self.connect()
+        self.assertEqual(list(select(conn)), [ROWS[0]])
+        self.assertEqual(list(conn.call('page', 2, field_types=(int, bytes))),
+                         ROWS[:2])
+        # PING response arrives in several segments too
+        self.assertGreater(conn.ping(), 0)
+
+    def test__latency(self):
+        self.proxy.fault = Fault(latency=0.05)
+        conn = self.connect()
+        started = time.time()
+        select(conn)
+        self.assertGreaterEqual(time.time() - started, 0.05)
+
+    def test__try_again(self):
+        """
+        Test that synthetic try again responses are retried by the client
+        """
+        self.proxy.fault = Fault(try_again_every=2)
+        conn = self.connect()
+        for _ in range(3):
+            self.assertEqual(list(select(conn)), [ROWS[0]])
+        self.assertEqual(self.proxy.try_agains, 2)
+
+    def test__reset(self):
+        """
+        Test that the client reconnects after the connection reset
+        """
+        self.proxy.fault = Fault(reset_every=3)
+        conn = self.connect()
+        for _ in range(4):
+            self.assertEqual(list(select(conn)), [ROWS[0]])
+        self.assertEqual(self.proxy.resets, 1)
+        # The reset session is dropped
+        self.assertEqual(len(self.proxy._sessions), 1)
+
+    def test__measure(self):
+        self.proxy.fault = Fault(latency=0.001, reset_every=10)
+        report = measure(self.proxy, select, 20, reconnect_delay=0.01)
+        self.assertEqual(len(report.latencies), 20)
+        self.assertEqual(report.errors, 0)
+        self.assertGreaterEqual(report.percentile(50), 0.001)
+        # Reconnect delay is visible in the tail
+        self.assertGreaterEqual(report.max, 0.01)
+        self.assertIn('p99.9', repr(report))
+
+    def test__run_scenarios(self):
+        reports = run_scenarios(
+            self.server.host, self.server.port, select,
+            collections.OrderedDict([
+                ('baseline', Fault()),
+                ('try again', Fault(try_again_every=5))]),
+            count=10)
+        self.assertEqual(list(reports), ['baseline', 'try again'])
+        for report in reports.values():
+            self.assertEqual(report.errors, 0)
+
+
+class Report(unittest.TestCase):
+
+    def test__percentile(self):
+        report = LatencyReport([i / 1000.0 for i in range(100, 0, -1)], 1)
+        self.assertEqual(report.percentile(50), 0.051)
+        self.assertEqual(report.percentile(99.9), 0.1)
+        self.assertEqual(report.max, 0.1)
+        self.assertEqual(LatencyReport([], 0).percentile(50), None)
+        self.assertEqual(repr(LatencyReport([], 2)), '0 requests, 2 errors')
+
+
+if __name__ == '__main__':
+    unittest.main()
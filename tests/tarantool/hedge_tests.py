@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.hedge module
+"""
+import time
+import unittest
+
+import tarantool.connection
+import tarantool.hedge
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer
+
+
+def slow(delay):
+    def slow_handler(request_type, request_id, body):
+        time.sleep(delay)
+        return handler(request_type, request_id, body)
+    return slow_handler
+
+
+class HedgedReader(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = []
+        self.reader = None
+
+    def tearDown(self):
+        if self.reader is not None:
+            self.reader.close()
+        for server in self.servers:
+            server.close()
+
+    def make_reader(self, handlers, **kwargs):
+        connections = []
+        for server_handler in handlers:
+            server = FakeServer(server_handler)
+            self.servers.append(server)
+            connections.append(tarantool.connection.Connection(
+                server.host, server.port))
+        self.reader = tarantool.hedge.HedgedReader(connections, **kwargs)
+        return self.reader
+
+    def test__fast_primary(self):
+        reader = self.make_reader([handler, handler], budget=1)
+        response = reader.select(1, [1, 2], field_types=(int, bytes))
+        self.assertEqual(list(response), ROWS[:2])
+        response = reader.call('page', 2, field_types=(int, bytes))
+        self.assertEqual(list(response), ROWS[:2])
+        self.assertEqual(reader.requests, 2)
+        self.assertEqual(reader.hedged, 0)
+        self.assertEqual(len(self.servers[1].requests), 0)
+
+    def test__hedge(self):
+        """
+        Test that the slow primary is hedged and the first response wins
+        """
+        reader = self.make_reader([slow(0.5), handler], budget=1, delay=0.01)
+        started = time.time()
+        response = reader.select(1, (key for key in [3]),
+                                 field_types=(int, bytes))
+        self.assertLess(time.time() - started, 0.4)
+        self.assertEqual(list(response), [ROWS[2]])
+        self.assertEqual(reader.hedged, 1)
+        self.assertEqual(reader.hedge_wins, 1)
+        # The busy endpoint is not chosen as the primary
+        reader.select(1, 4)
+        self.assertEqual(len(self.servers[1].requests), 2)
+
+    def test__budget(self):
+        """
+        Test that requests are not hedged when the budget is exhausted
+        """
+        reader = self.make_reader([slow(0.1), handler], budget=0.5,
+                                  delay=0.01)
+        reader.select(1, 1)
+        self.assertEqual(reader.hedged, 0)
+        self.assertEqual(len(self.servers[1].requests), 0)
+
+    def test__delay(self):
+        """
+        Test that the delay follows the percentile of recent latency
+        """
+        reader = self.make_reader([handler], percentile=90, samples=100)
+        for n in range(100):
+            reader._add_latency(n / 1000.0)
+        self.assertAlmostEqual(reader.delay, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `import tarantool` cost
+"""
+import subprocess
+import sys
+import unittest
+
+import tarantool
+from tarantool.request import Request
+
+
+IMPORTED_MODULES = """
+import sys
+import tarantool
+print(' '.join(sorted(sys.modules)))
+"""
+
+
+def imported_modules():
+    """
+    :return: names of the modules imported by `import tarantool`
+    :rtype: set
+    """
+    output = subprocess.check_output([sys.executable, '-c', IMPORTED_MODULES])
+    return set(output.decode('utf-8').split())
+
+
+class Import(unittest.TestCase):
+
+    def test__lazy_modules(self):
+        """
+        Test that heavy modules are not imported by `import tarantool`
+        """
+        modules = imported_modules()
+        for name in ('ctypes', 'socket', 'tarantool.connection',
+                     'tarantool.request', 'tarantool.dump',
+                     'tarantool.writebuffer'):
+            self.assertNotIn(name, modules)
+
+    def test__lazy_attributes(self):
+        self.assertIs(tarantool.Connection,
+                      tarantool.connection.Connection)
+        self.assertIs(tarantool.hedge, sys.modules['tarantool.hedge'])
+        self.assertIn('connect', tarantool.__all__)
+        self.assertIn('Connection', tarantool.__all__)
+        self.assertIn('NetworkError', tarantool.__all__)
+        self.assertIn('Compressed', dir(tarantool))
+        # Modules and helpers imported by the submodules are not exported
+        for name in ('os', 'sys', 'struct', 'warnings', 'warn', 'const',
+                     'error', 'struct_L'):
+            self.assertNotIn(name, tarantool.__all__)
+        namespace = {}
+        exec('from tarantool import *', namespace)
+        self.assertIs(namespace['Connection'], tarantool.Connection)
+        with self.assertRaises(AttributeError):
+            tarantool.nothing
+
+    def test__int_base128_table(self):
+        self.assertEqual(Request.pack_int_base128(5), b'\x05')
+        self.assertEqual(Request.pack_int_base128(300), b'\x82\x2c')
+        self.assertEqual(len(Request._int_base128), 0x4000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.keepalive module
+"""
+import socket
+import threading
+import time
+import unittest
+import warnings
+
+import tarantool.connection
+from tarantool.keepalive import KeepaliveMonitor
+
+from tests.tarantool.dump_tests import handler
+from tests.tarantool.server import FakeServer
+
+
+def closing_once():
+    closed = []
+
+    def closing(request_type, request_id, body):
+        # Close the client connection on the first CALL request
+        if request_type == 22 and not closed:
+            closed.append(request_id)
+            return None
+        return handler(request_type, request_id, body)
+    return closing
+
+
+class Keepalive(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(closing_once())
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, reconnect_delay=1)
+        # Checks are run by the tests
+        self.monitor = KeepaliveMonitor([self.conn], interval=60, idle=0)
+
+    def tearDown(self):
+        self.monitor.close()
+        self.conn.close()
+        self.server.close()
+
+    def test__ping(self):
+        self.monitor.check(self.conn)
+        stats = self.monitor.stats[self.conn]
+        self.assertEqual(stats.pings, 1)
+        self.assertGreater(stats.rtt, 0)
+        self.assertIsNotNone(self.conn._standby)
+        self.monitor.check(self.conn)
+        self.assertEqual(stats.pings, 2)
+        self.assertEqual(stats.failures, 0)
+
+    def test__swap_on_request(self):
+        """
+        Test that the failed request switches to the standby socket
+        without the reconnect delay
+        """
+        self.monitor.check(self.conn)
+        started = time.time()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(len(self.conn.call('page', 1)), 1)
+        self.assertLess(time.time() - started, 0.5)
+        self.assertIn('Switched to the standby connection',
+                      [str(w.message) for w in caught])
+        self.assertEqual(len(self.conn.select(1, 1)), 1)
+
+    def test__swap_by_monitor(self):
+        self.monitor.check(self.conn)
+        standby = self.conn._standby
+        self.conn._socket.shutdown(socket.SHUT_RDWR)
+        self.monitor.check(self.conn)
+        stats = self.monitor.stats[self.conn]
+        self.assertEqual(stats.swaps, 1)
+        self.assertIs(self.conn._socket, standby)
+        # A new standby socket is opened
+        self.assertIsNotNone(self.conn._standby)
+        self.assertIsNot(self.conn._standby, standby)
+        self.assertEqual(len(self.conn.select(1, 1)), 1)
+
+    def test__busy(self):
+        self.monitor.idle = 60
+        self.monitor.check(self.conn)
+        self.assertEqual(self.monitor.stats[self.conn].pings, 0)
+        self.monitor.idle = 0
+        with self.conn._lock:
+            # The lock is reentrant, check the connection in another thread
+            thread = threading.Thread(target=self.monitor.check,
+                                      args=(self.conn, ))
+            thread.start()
+            thread.join()
+        self.assertEqual(self.monitor.stats[self.conn].pings, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.lanes module
+"""
+import threading
+import time
+import unittest
+
+import tarantool.connection
+from tarantool.const import PRIORITY_BULK
+from tarantool.error import InterfaceError
+from tarantool.lanes import LanePool
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def slow_calls(request_type, request_id, body):
+    # CALL requests are slow, SELECT requests are fast
+    if request_type == 22:
+        time.sleep(0.3)
+    return handler(request_type, request_id, body)
+
+
+class Lanes(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(slow_calls)
+        self.connections = [
+            tarantool.connection.Connection(
+                self.server.host, self.server.port, bulk_select_keys=2)
+            for _ in range(3)]
+        self.pool = LanePool(self.connections, reserved=1)
+        self.used = []
+        for connection in self.connections:
+            connection.select = self.recording(connection)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close()
+
+    def recording(self, connection):
+        select = connection.select
+
+        def recording_select(*args, **kwargs):
+            self.used.append(connection)
+            return select(*args, **kwargs)
+        return recording_select
+
+    def test__routing(self):
+        self.pool.select(1, 1)
+        self.pool.space(1, priority=PRIORITY_BULK).select(2)
+        self.pool.space(1).select(3, priority=PRIORITY_BULK)
+        self.assertIs(self.used[0], self.pool.interactive[0])
+        self.assertIn(self.used[1], self.pool.bulk)
+        self.assertIn(self.used[2], self.pool.bulk)
+        with self.assertRaises(ValueError):
+            self.pool.select(1, 1, priority='urgent')
+
+    def test__bulk_chunks(self):
+        response = self.pool.select(1, [1, 2, 3, 4, 5], priority=PRIORITY_BULK,
+                                    field_types=(int, bytes))
+        self.assertEqual(list(response), ROWS)
+        self.assertEqual(len(self.server.requests), 3)
+        # Interactive selects are not split
+        self.pool.select(1, [1, 2, 3])
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test__interactive_latency(self):
+        """
+        Test that interactive requests do not wait behind bulk ones
+        """
+        threads = [threading.Thread(target=self.pool.call, args=('page', 5),
+                                    kwargs={'priority': PRIORITY_BULK})
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        started = time.time()
+        self.assertEqual(len(self.pool.select(1, [1, 2])), 2)
+        self.assertLess(time.time() - started, 0.2)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.pool.borrowed, 0)
+
+    def test__borrow_idle(self):
+        thread = threading.Thread(target=self.pool.call, args=('page', 5))
+        thread.start()
+        time.sleep(0.05)
+        # The reserved connection is busy, the idle bulk one is used
+        self.pool.select(1, 1)
+        thread.join()
+        self.assertEqual(self.pool.borrowed, 1)
+        self.assertIn(self.used[0], self.pool.bulk)
+
+    def test__space_writes(self):
+        """
+        Test that writes of the space are routed by the priority
+        """
+        def write_handler(request_type, request_id, body):
+            if request_type in (17, 22):
+                return slow_calls(request_type, request_id, body)
+            return pack_response(request_type, request_id, [])
+        self.server.handler = write_handler
+        used = []
+        for connection in self.connections:
+            connection.insert = self.recording_insert(connection, used)
+        space = self.pool.space(1, priority=PRIORITY_BULK)
+        space.insert((6, b'value 6'))
+        space.insert((7, b'value 7'), priority='interactive')
+        self.assertIn(used[0], self.pool.bulk)
+        self.assertIs(used[1], self.pool.interactive[0])
+        self.assertEqual(len(self.server.requests), 2)
+
+    @staticmethod
+    def recording_insert(connection, used):
+        insert = connection.insert
+
+        def recording_insert(*args):
+            used.append(connection)
+            return insert(*args)
+        return recording_insert
+
+    def test__space_unsupported(self):
+        space = self.pool.space(1)
+        with self.assertRaises(InterfaceError):
+            space.write_buffer()
+        with self.assertRaises(InterfaceError):
+            space.export('space.dump', [1])
+
+    def test__invalid(self):
+        with self.assertRaises(ValueError):
+            LanePool(self.connections, reserved=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
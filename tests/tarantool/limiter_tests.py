@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.limiter module
+"""
+import threading
+import unittest
+import warnings
+
+import tarantool.bulk
+import tarantool.connection
+from tarantool.error import OverloadError, RetryWarning
+from tarantool.limiter import ConcurrencyLimiter
+
+from tests.tarantool.bulk_tests import handler
+from tests.tarantool.server import FakeServer, pack_response
+
+
+class Limiter(unittest.TestCase):
+
+    def test__shed(self):
+        limiter = ConcurrencyLimiter(initial_limit=2, policy='shed')
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(wait=False))
+        with self.assertRaises(OverloadError):
+            limiter.acquire()
+        self.assertEqual(limiter.rejected, 1)
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+
+    def test__queue(self):
+        limiter = ConcurrencyLimiter(initial_limit=1, queue_timeout=0.01)
+        limiter.acquire()
+        with self.assertRaises(OverloadError):
+            limiter.acquire()
+        # A waiting request gets the slot when it is released
+        limiter.queue_timeout = None
+        timer = threading.Timer(0.01, limiter.release)
+        timer.start()
+        self.assertTrue(limiter.acquire())
+        timer.join()
+        self.assertEqual(limiter.in_flight, 1)
+
+    def test__max_queue(self):
+        limiter = ConcurrencyLimiter(initial_limit=1, max_queue=0)
+        limiter.acquire()
+        with self.assertRaises(OverloadError):
+            limiter.acquire()
+
+    def test__gradient(self):
+        """
+        Test that the limit grows while RTT is stable and shrinks
+        when RTT grows
+        """
+        limiter = ConcurrencyLimiter(initial_limit=10, max_limit=100)
+        for _ in range(50):
+            while limiter.acquire(wait=False):
+                pass
+            limiter.release(0.001)
+        grown = limiter.limit
+        self.assertGreater(grown, 10)
+        for _ in range(50):
+            limiter.acquire(wait=False)
+            limiter.release(0.1)
+        self.assertLess(limiter.limit, grown)
+        recent, noload = limiter.rtt
+        self.assertGreater(recent, noload)
+
+    def test__not_saturated(self):
+        """
+        Test that the limit does not grow if it is not reached
+        """
+        limiter = ConcurrencyLimiter(initial_limit=10)
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.001)
+        self.assertEqual(limiter.limit, 10)
+
+    def test__overload(self):
+        limiter = ConcurrencyLimiter(initial_limit=10, min_limit=5,
+                                     backoff=0.5)
+        limiter.overload()
+        self.assertEqual(limiter.limit, 5)
+        limiter.overload()
+        self.assertEqual(limiter.limit, 5)
+
+
+class ConnectionLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.limiter = ConcurrencyLimiter(initial_limit=4)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, limiter=self.limiter)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__pipeline(self):
+        stats = tarantool.bulk.load(
+            self.conn, 0, [(i, ) for i in range(100)], window=64)
+        self.assertEqual(stats.rows, 99)
+        self.assertEqual(self.limiter.in_flight, 0)
+        self.assertNotEqual(self.limiter.rtt, (None, None))
+
+    def test__try_again(self):
+        """
+        Test that the limit is decreased when the server asks to try again
+        """
+        replies = [0x0101, 0]
+
+        def busy_handler(request_type, request_id, body):
+            return pack_response(request_type, request_id,
+                                 return_code=replies.pop(0),
+                                 message=b'Busy', rowcount=1)
+        self.server.handler = busy_handler
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RetryWarning)
+            self.conn.insert(0, (1, ))
+        self.assertEqual(self.limiter.limit, 3)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test__shed(self):
+        self.limiter.policy = 'shed'
+        self.limiter._limit = 0
+        with self.assertRaises(OverloadError):
+            self.conn.insert(0, (1, ))
+        self.assertEqual(self.limiter.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.mirror module
+"""
+import unittest
+
+import tarantool.connection
+import tarantool.mirror
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer
+
+
+class MirroredSpace(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__select(self):
+        """
+        Test local lookups by several indexes
+        """
+        mirror = tarantool.mirror.MirroredSpace(
+            self.conn, 1, 'page', indexes={0: (0, ), 1: (1, )},
+            field_types=(int, bytes), page_size=2)
+        requests = len(self.server.requests)
+        self.assertEqual(len(mirror), 5)
+        self.assertEqual(mirror.select(2), [ROWS[1]])
+        self.assertEqual(mirror.select([3, 4, 10]), [ROWS[2], ROWS[3]])
+        self.assertEqual(mirror.select(b'value 5', index=1), [ROWS[4]])
+        self.assertEqual(mirror.select([(1, )]), [ROWS[0]])
+        self.assertEqual(list(mirror), ROWS)
+        with self.assertRaises(ValueError):
+            mirror.select(1, index=2)
+        # Lookups are served locally
+        self.assertEqual(len(self.server.requests), requests)
+
+    def test__refresh(self):
+        """
+        Test loading by keys and periodic refresh
+        """
+        mirror = tarantool.mirror.MirroredSpace(
+            self.conn, 1, [1, 2], refresh_interval=0)
+        self.assertEqual(mirror.select(1), [(b'\x01\x00\x00\x00', b'value 1')])
+        mirror.select(2)
+        self.assertEqual(len(self.server.requests), 3)
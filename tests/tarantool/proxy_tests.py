@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.proxy module
+"""
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import unittest
+
+import tarantool.connection
+from tarantool.proxy import MultiplexProxy
+from tarantool.request import RequestInsert, RequestSelect
+
+from tests.tarantool.dump_tests import ROWS, handler, unpack_fields
+from tests.tarantool.server import FakeServer, pack_response
+
+
+class Proxy(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'proxy.sock')
+        self.server = FakeServer(handler)
+        self.proxy = MultiplexProxy(self.server.host, self.server.port,
+                                    self.path, upstreams=1)
+
+    def tearDown(self):
+        self.proxy.close()
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test__select(self):
+        conn = tarantool.connection.Connection(unix_socket=self.path)
+        self.assertEqual(
+            list(conn.select(1, [1, 2], field_types=(int, bytes))), ROWS[:2])
+        self.assertGreater(conn.ping(), 0)
+        conn.close()
+
+    def test__multiplex(self):
+        """
+        Test that requests of many clients share the upstream connection
+        """
+        errors = []
+
+        def client(key):
+            conn = tarantool.connection.Connection(unix_socket=self.path)
+            try:
+                for _ in range(20):
+                    response = conn.select(1, key, field_types=(int, bytes))
+                    if list(response) != [ROWS[key - 1]]:
+                        errors.append(list(response))
+            finally:
+                conn.close()
+
+        threads = [threading.Thread(target=client, args=(key, ))
+                   for key in [1, 2, 3, 4, 5] * 2]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.proxy.requests, 200)
+        self.assertLessEqual(self.proxy.writes, 200)
+        # Request ids are unique on the upstream connection
+        request_ids = [struct.unpack_from('<L', packet, 8)[0]
+                       for packet in self.server.requests]
+        self.assertEqual(sorted(request_ids), list(range(200)))
+
+    def test__pipeline(self):
+        conn = tarantool.connection.Connection(unix_socket=self.path)
+        requests = [RequestSelect(1, 0, [(key, )], 0, 100)
+                    for key in range(1, 6)]
+        results = list(conn._send_requests(iter(requests), window=5,
+                                           field_types=(int, bytes)))
+        self.assertEqual(sorted(tuple(response[0])
+                                for _, response in results), ROWS)
+        conn.close()
+
+    def test__pipeline_order(self):
+        """
+        Test that pipelined writes of a client are applied in order
+        with several upstream connections
+        """
+        values = {}
+
+        def replacing(request_type, request_id, body):
+            # <space_no><flags><tuple>
+            key, value = unpack_fields(body, 8)[0]
+            values.setdefault(key, []).append(struct.unpack('<L', value)[0])
+            return pack_response(request_type, request_id, [])
+
+        self.server.handler = replacing
+        proxy = MultiplexProxy(self.server.host, self.server.port,
+                               self.path + '.2', upstreams=2)
+        connections = [
+            tarantool.connection.Connection(unix_socket=self.path + '.2')
+            for _ in range(2)]
+        try:
+            for key, conn in enumerate(connections):
+                requests = [RequestInsert(1, (key, n), False)
+                            for n in range(50)]
+                results = list(conn._send_requests(iter(requests), window=50))
+                self.assertEqual(len(results), 50)
+            # The clients are bound to different upstream connections
+            self.assertEqual(
+                [upstream.clients for upstream in proxy._upstreams], [1, 1])
+        finally:
+            for conn in connections:
+                conn.close()
+            proxy.close()
+        for key in range(2):
+            self.assertEqual(values[struct.pack('<L', key)], list(range(50)))
+
+    def test__upstream_failure(self):
+        """
+        Test that clients are disconnected when the server closes
+        the connection and the proxy reconnects
+        """
+        closed = []
+
+        def closing(request_type, request_id, body):
+            if not closed:
+                closed.append(request_id)
+                return None
+            return handler(request_type, request_id, body)
+
+        self.server.handler = closing
+        conn = tarantool.connection.Connection(unix_socket=self.path, reconnect_delay=0)
+        # The connection reconnects to the proxy and retries
+        self.assertEqual(len(conn.select(1, 1)), 1)
+        self.assertEqual(len(closed), 1)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
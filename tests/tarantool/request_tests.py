@@ -8,6 +8,7 @@ import unittest
 
 
 import tarantool.request
+import tarantool.response
 
 
 class RequestInsert(unittest.TestCase):
@@ -26,6 +27,41 @@ class RequestInsert(unittest.TestCase):
             binascii.unhexlify("0d0000001c0000000000000001000000000000000300000003414141044242424206434343434343")
         )
 
+    def test__request_id(self):
+        """
+        Test setting request_id of the packet
+        """
+        request = tarantool.request.RequestInsert(1, (1, ), False)
+        self.assertEqual(request.request_id, 0)
+        request.request_id = 0x11223344
+        self.assertEqual(request.request_id, 0x11223344)
+        self.assertEqual(
+            bytes(request),
+            binascii.unhexlify("0d00000011000000443322110100000000000000010000000401000000")
+        )
+
+    def test__layout(self):
+        """
+        Test packing the tuple with a fixed layout
+        """
+        layout = tarantool.response.FixedLayout('L', 'L', 'L')
+        self.assertEqual(
+            bytes(tarantool.request.RequestInsert(
+                1, (1, 2000, 30000), False, layout)),
+            bytes(tarantool.request.RequestInsert(1, (1, 2000, 30000), False))
+        )
+        # 64 bit field is packed as 8 bytes even if the value is small
+        self.assertEqual(
+            bytes(tarantool.request.RequestInsert(
+                1, (1, ), False, tarantool.response.FixedLayout('Q'))),
+            binascii.unhexlify("0d0000001500000000000000010000000000000001000000080100000000000000")
+        )
+        # Values which do not fit the layout are packed as usual
+        self.assertEqual(
+            bytes(tarantool.request.RequestInsert(1, (b"AAA", ), False, layout)),
+            bytes(tarantool.request.RequestInsert(1, (b"AAA", ), False))
+        )
+
 
 class RequestDelete(unittest.TestCase):
 
@@ -247,3 +283,30 @@ class RequestUpdate(unittest.TestCase):
             "Update: OR single integer value using an integer key"
         )
 
+
+
+class RequestCall(unittest.TestCase):
+
+    def test__cast_to_bytes(self):
+        """
+        Test binary CALL request representation
+        """
+        # box.select(1, 0, 2) with arguments casted to strings
+        self.assertEqual(
+            bytes(tarantool.request.RequestCall("box.select", (1, 0, b"2"), True)),
+            binascii.unhexlify("16000000190000000000000001000000" + "0a626f782e73656c656374" + "03000000013101300132")
+        )
+
+    def test__typed_args(self):
+        """
+        Test CALL request with typed arguments
+        """
+        self.assertEqual(
+            bytes(tarantool.request.RequestCall("f", (1, "2", 0x100000000), True, arg_types=(int, bytes, int))),
+            binascii.unhexlify("160000001a0000000000000001000000" + "0166" + "03000000" + "0401000000" + "0132" + "080000000001000000")
+        )
+
+        self.assertEqual(
+            bytes(tarantool.request.RequestCall("f", ("1", b"2"), True, arg_types=(int, ))),
+            binascii.unhexlify("16000000140000000000000001000000" + "0166" + "02000000" + "0401000000" + "0402000000")
+        )
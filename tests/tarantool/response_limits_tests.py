@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the response size limits and the memory budget
+"""
+import gc
+import os
+import unittest
+
+import tarantool.connection
+from tarantool.dump import StreamedResponse
+from tarantool.error import ResponseTooLargeError
+from tarantool.request import RequestSelect
+
+from tests.tarantool.dump_tests import ROWS, handler
+from tests.tarantool.server import FakeServer
+
+
+class Limits(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def connect(self, **kwargs):
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, **kwargs)
+        return self.conn
+
+    def test__max_rows(self):
+        conn = self.connect(max_rows=3)
+        with self.assertRaises(ResponseTooLargeError) as cm:
+            conn.call('page', 5)
+        self.assertIsNotNone(cm.exception.request_id)
+        # The body is drained, the connection is usable
+        self.assertEqual(len(conn.call('page', 3)), 3)
+        self.assertEqual(len(conn.select(1, [1, 2], max_rows=2)), 2)
+
+    def test__max_response_bytes(self):
+        conn = self.connect()
+        size = conn.call('page', 5)._body_length
+        with self.assertRaises(ResponseTooLargeError):
+            conn.call('page', 5, max_response_bytes=size - 1)
+        self.assertEqual(
+            len(conn.call('page', 5, max_response_bytes=size)), 5)
+        with self.assertRaises(ResponseTooLargeError):
+            conn.space(1).select([1, 2], max_response_bytes=8)
+        self.assertEqual(len(conn.space(1).select(1)), 1)
+
+    def test__per_call_override(self):
+        conn = self.connect(max_rows=1)
+        self.assertEqual(len(conn.call('page', 5, max_rows=5)), 5)
+        with self.assertRaises(ResponseTooLargeError):
+            conn.call('page', 2)
+
+    def test__pipeline(self):
+        conn = self.connect(max_rows=1)
+        requests = [RequestSelect(1, 0, [(1, ), (2, )], 0, 100),
+                    RequestSelect(1, 0, [(3, )], 0, 100)]
+        results = list(conn._send_requests(iter(requests)))
+        self.assertIs(results[0][0], requests[0])
+        self.assertIsInstance(results[0][1], ResponseTooLargeError)
+        self.assertEqual(list(results[1][1]), [(b'\x03\x00\x00\x00', b'value 3')])
+
+    def test__invalid_policy(self):
+        with self.assertRaises(ValueError):
+            self.connect(budget_policy='spill')
+        self.connect()
+
+
+class MemoryBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__accounting(self):
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, memory_budget=1 << 20)
+        response = self.conn.call('page', 5)
+        self.assertEqual(self.conn.memory_used, response._body_length)
+        del response
+        gc.collect()
+        self.assertEqual(self.conn.memory_used, 0)
+
+    def test__stream(self):
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, memory_budget=64)
+        small = self.conn.select(1, 1, field_types=(int, bytes))
+        self.assertEqual(list(small), [ROWS[0]])
+        response = self.conn.call('page', 5, field_types=(int, bytes))
+        self.assertIsInstance(response, StreamedResponse)
+        self.assertEqual(len(response), 5)
+        self.assertEqual(response.return_code, 0)
+        self.assertEqual(list(response), ROWS)
+        path = response.path
+        self.assertTrue(os.path.exists(path))
+        response.close()
+        self.assertFalse(os.path.exists(path))
+
+    def test__chunked(self):
+        """
+        Test that chunks of a select are not spooled and the merged
+        result is accounted as a whole
+        """
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, memory_budget=40,
+            max_select_keys=2)
+        with self.assertRaises(ResponseTooLargeError):
+            self.conn.select(1, [1, 2, 3, 4, 5])
+        self.conn.close()
+        gc.collect()
+
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, memory_budget=1 << 20,
+            max_select_keys=2)
+        response = self.conn.select(1, [1, 2, 3, 4, 5],
+                                    field_types=(int, bytes))
+        self.assertEqual(list(response), ROWS)
+        # Three chunks: 8 byte heads and 5 tuples of 21 bytes (with
+        # the size prefix)
+        self.assertEqual(self.conn.memory_used, 3 * 8 + 5 * 21)
+        del response
+        gc.collect()
+        self.assertEqual(self.conn.memory_used, 0)
+
+    def test__drop(self):
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, memory_budget=64,
+            budget_policy=tarantool.BUDGET_DROP)
+        with self.assertRaises(ResponseTooLargeError):
+            self.conn.call('page', 5)
+        self.assertEqual(len(self.conn.call('page', 1)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
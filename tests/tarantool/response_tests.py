@@ -204,6 +204,30 @@ class Response(unittest.TestCase):
             "Create Response instance - multiple records with multiple fields"
         )
 
+    def test__init_long_fields(self):
+        """
+        Test Response instance creation: fields with multi-byte length
+        """
+        header = from_hex(
+            "11000000"  # request_type = 0x11 ("select")
+            "ef400000"  # body_length = 16623
+            "00000000"  # request_id
+        )
+        body = from_hex(
+            "00000000"  # return_code = 0
+            "01000000"  # count = 1
+            "df400000"  # tuple_size = 16607
+            "03000000"  # cardinality = 3
+                        # tuple = ("A" * 200, "B" * 16400, "C")
+            "8148" + "41" * 200 + "818010" + "42" * 16400 + "01 43"
+        )
+
+        self.assertEqual(
+            tarantool.response.Response(header, body),
+            [(b"A" * 200, b"B" * 16400, b"C")],
+            "Create Response instance - fields longer than 127 bytes"
+        )
+
     def test__init_attrs(self):
 
         # Check instanse attributes
@@ -221,3 +245,155 @@ class Response(unittest.TestCase):
             r._request_id, 0x44332211,
             "Check _request_id attribute"
         )
+
+
+class Interned(unittest.TestCase):
+    """
+    Tests for response.Interned
+    """
+
+    header = from_hex("11000000 24000000 00000000")
+    body = from_hex(
+        "00000000"  # return_code = 0
+        "02000000"  # count = 2
+        "06000000 02000000 01 31 03 414141"  # tuple = ("1", "AAA")
+        "06000000 02000000 01 32 03 414141"  # tuple = ("2", "AAA")
+    )
+
+    def test__intern(self):
+        """
+        Test that repeated values are decoded into the same object
+        """
+        interned = tarantool.response.Interned(bytes)
+        r = tarantool.response.Response(
+            self.header, self.body, (bytes, interned))
+        self.assertEqual(r, [(b"1", b"AAA"), (b"2", b"AAA")])
+        self.assertIs(r[0][1], r[1][1])
+        self.assertEqual(len(interned), 1)
+
+        # The table is shared by responses
+        r2 = tarantool.response.Response(self.header, self.body, (interned, ))
+        self.assertIs(r2[0][1], r[0][1])
+        self.assertEqual(len(interned), 3)
+
+    def test__no_field_on_hit(self):
+        """
+        Test that fields are built only for values missing in the table
+        """
+        interned = tarantool.response.Interned(bytes)
+        built = []
+        new_field = tarantool.response.new_field
+
+        def counting_new_field(cls, value):
+            built.append(value)
+            return new_field(cls, value)
+
+        tarantool.response.new_field = counting_new_field
+        try:
+            r = tarantool.response.Response(
+                self.header, self.body, (interned, ))
+        finally:
+            tarantool.response.new_field = new_field
+        self.assertEqual(r, [(b"1", b"AAA"), (b"2", b"AAA")])
+        self.assertEqual(sorted(built), [b"1", b"2", b"AAA"])
+
+    def test__per_response(self):
+        """
+        Test per-response and bounded tables
+        """
+        interned = tarantool.response.Interned(int, per_response=True)
+        body = from_hex(
+            "00000000 02000000"
+            "05000000 01000000 04 01000000"
+            "05000000 01000000 04 01000000")
+        header = from_hex("11000000 22000000 00000000")
+        r = tarantool.response.Response(header, body, (interned, ))
+        self.assertEqual(r, [(1, ), (1, )])
+        self.assertEqual(len(interned), 0)
+
+        interned = tarantool.response.Interned(bytes, max_size=1)
+        r = tarantool.response.Response(self.header, self.body, (interned, ))
+        self.assertEqual(len(interned), 1)
+        self.assertIsNot(r[0][1], r[1][1])
+
+
+class FixedLayout(unittest.TestCase):
+    """
+    Tests for response.FixedLayout
+    """
+
+    header = from_hex("11000000 34000000 00000000")
+    body = from_hex(
+        "00000000"  # return_code = 0
+        "02000000"  # count = 2
+        "0e000000 02000000 04 01000000 08 0200000000000000"  # (1, 2)
+        "0e000000 02000000 04 03000000 08 0400000000000000"  # (3, 4)
+    )
+
+    def test__unpack(self):
+        layout = tarantool.response.FixedLayout('L', 'Q')
+        self.assertEqual(tuple(layout), (int, int))
+        r = tarantool.response.Response(self.header, self.body, layout)
+        self.assertEqual(r, [(1, 2), (3, 4)])
+        self.assertEqual(r.rowcount, 2)
+
+    def test__fallback(self):
+        """
+        Test that tuples not matching the layout are decoded as usual
+        """
+        layout = tarantool.response.FixedLayout('L', '2s')
+        header = from_hex("11000000 22000000 00000000")
+        body = from_hex(
+            "00000000 02000000"
+            "08000000 02000000 04 01000000 02 4141"  # (1, "AA")
+            "07000000 02000000 04 02000000 01 42")   # (2, "B")
+        r = tarantool.response.Response(header, body, layout)
+        self.assertEqual(r, [(1, b"AA"), (2, b"B")])
+        # The whole row is checked, not only its size
+        r = tarantool.response.Response(
+            self.header, self.body, tarantool.response.FixedLayout('Q', 'L'))
+        self.assertEqual(r, [(1, 2), (3, 4)])
+
+    def test__pack(self):
+        layout = tarantool.response.FixedLayout('L', 'Q', '3s')
+        self.assertEqual(
+            layout.pack((1, 2, u"abc")),
+            from_hex("03000000 04 01000000 08 0200000000000000 03 616263"))
+        self.assertIsNone(layout.pack((1, 2, b"ab")))
+        self.assertIsNone(layout.pack((1, 2)))
+        self.assertIsNone(layout.pack((1, -2, b"abc")))
+
+    def test__invalid(self):
+        for code in ('H', '0s', '128s', 's'):
+            with self.assertRaises(ValueError):
+                tarantool.response.FixedLayout('L', code)
+
+
+class ResponseCallTypes(unittest.TestCase):
+    """
+    Tests for per-tuple field types
+    """
+
+    def test__cast_per_tuple(self):
+        """
+        Test casting of tuples with separate types for each tuple
+        """
+        header = from_hex("16000000 3b000000 00000000")
+        body = from_hex(
+            "00000000"  # return_code = 0
+            "03000000"  # count = 3
+            "07000000 02000000 04 01000000 01 41"  # tuple = (1, "A")
+            "0a000000 02000000 04 02000000 04 03000000"  # tuple = (2, 3)
+            "0a000000 02000000 04 04000000 04 05000000"  # tuple = (4, 5)
+        )
+        self.assertEqual(
+            tarantool.response.Response(
+                header, body, [(int, bytes), (int, )]),
+            [(1, b"A"), (2, 3), (4, 5)])
+        # The types of the last tuple are selected by its position
+        raw = tarantool.response.RawResponse(
+            header, body, [(int, bytes), (int, )])
+        self.assertEqual(raw.last_tuple(), (4, 5))
+        raw = tarantool.response.RawResponse(
+            header, body, [(int, ), (int, ), (int, bytes)])
+        self.assertEqual(raw.last_tuple(), (4, b"\x05\x00\x00\x00"))
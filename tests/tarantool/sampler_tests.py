@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.sampler module
+"""
+import unittest
+
+import tarantool.connection
+from tarantool.request import (
+    RequestCall, RequestDelete, RequestInsert, RequestSelect, RequestUpdate
+)
+from tarantool.response import make_key
+from tarantool.sampler import (
+    Access, AccessSampler, SpaceSaving, parse_request
+)
+
+from tests.tarantool.dump_tests import handler
+from tests.tarantool.server import FakeServer
+
+
+class Sketch(unittest.TestCase):
+
+    def test__space_saving(self):
+        sketch = SpaceSaving(3)
+        for item in 'aaaaabbbcdddde':
+            sketch.add(item)
+        self.assertEqual(len(sketch), 3)
+        self.assertEqual(sketch.total, 14)
+        top = sketch.top(2)
+        self.assertEqual([item for item, _, _ in top], ['a', 'd'])
+        # Counts are overestimated by at most the error
+        for item, count, error in sketch.top(3):
+            self.assertLessEqual(count - error, 'aaaaabbbcdddde'.count(item))
+
+    def test__weights(self):
+        sketch = SpaceSaving(10)
+        sketch.add('a', 100)
+        sketch.add('b')
+        sketch.add('b')
+        self.assertEqual(sketch.top(1), [('a', 100, 0)])
+
+
+class ParseRequest(unittest.TestCase):
+
+    def test__requests(self):
+        self.assertEqual(
+            parse_request(bytes(RequestSelect(1, 2, [(1, b'x'), (2, )],
+                                              0, 100))),
+            [Access('select', 1, 2, make_key((1, b'x'))),
+             Access('select', 1, 2, make_key(2))])
+        self.assertEqual(
+            parse_request(bytes(RequestInsert(3, (7, b'a', b'b'), False))),
+            [Access('insert', 3, 0, make_key(7))])
+        self.assertEqual(
+            parse_request(bytes(RequestDelete(3, (7, ), False))),
+            [Access('delete', 3, 0, make_key(7))])
+        self.assertEqual(
+            parse_request(bytes(RequestUpdate(3, 8, [(1, '+', 1)], False))),
+            [Access('update', 3, 0, make_key(8))])
+        self.assertEqual(
+            parse_request(bytes(RequestCall('box.select', (1, ), True))),
+            [Access('call', None, None, b'box.select')])
+
+
+class Sampler(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.sampler = AccessSampler(rate=1.0)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port, sampler=self.sampler)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__top(self):
+        for _ in range(2):
+            self.conn.select(1, 1)
+        self.conn.select(1, [2, 3])
+        self.conn.select(1, 4)
+        self.conn.call('page', 5)
+        top = self.sampler.top(2)
+        self.assertEqual(top[0], (Access('select', 1, 0, make_key(1)), 2))
+        self.assertEqual(top[1][1], 1)
+        # The call returns all five rows, it is the heaviest by bytes
+        heaviest = self.sampler.top(1, by='bytes')[0][0]
+        self.assertEqual(heaviest, Access('call', None, None, b'page'))
+        with self.assertRaises(ValueError):
+            self.sampler.top(by='time')
+
+    def test__rate(self):
+        self.sampler.rate = 0.0
+        self.conn.select(1, 1)
+        self.assertEqual(self.sampler.top(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
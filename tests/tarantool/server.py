@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal stand-in for the Tarantool binary protocol used by the tests
+"""
+import socket
+import struct
+import threading
+
+from tarantool.request import Request
+
+
+def pack_response(request_type, request_id, tuples=(), return_code=0,
+                  message=None, rowcount=None):
+    """
+    Build a response packet (header and body) in the wire format
+
+    :param tuples: list of tuples to put into the body
+    :param int return_code: <return_code> value (completion status included)
+    :param message: error message used when `return_code` is non-zero
+    :param rowcount: value of <count>, defaults to the number of tuples
+    """
+    if return_code:
+        body = struct.pack('<L', return_code) + (message or b'') + b'\x00'
+    else:
+        if rowcount is None:
+            rowcount = len(tuples)
+        chunks = [struct.pack('<LL', return_code, rowcount)]
+        for values in tuples:
+            packed = Request.pack_tuple(values)
+            chunks.append(struct.pack('<L', len(packed) - 4))
+            chunks.append(packed)
+        body = b''.join(chunks)
+    return struct.pack('<LLL', request_type, len(body), request_id) + body
+
+
+def recv_exactly(sock, length):
+    chunks = []
+    while length:
+        chunk = sock.recv(length)
+        if not chunk:
+            return None
+        length -= len(chunk)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+class FakeServer(object):
+    """
+    Threaded TCP server answering each request with `handler` result.
+
+    `handler(request_type, request_id, body)` returns response packet bytes
+    (see `pack_response`) or None to close the client connection.
+    PING requests are answered automatically.
+    If `unix_socket` path is passed the server listens on the unix socket
+    instead of TCP.
+    """
+
+    def __init__(self, handler, unix_socket=None):
+        self.handler = handler
+        self.requests = []
+        if unix_socket is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.bind(('127.0.0.1', 0))
+            self.host, self.port = self._sock.getsockname()
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.bind(unix_socket)
+            self.host, self.port = unix_socket, None
+        self._sock.listen(16)
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self._handle, args=(client, ))
+            thread.daemon = True
+            thread.start()
+
+    def _handle(self, client):
+        try:
+            while True:
+                header = recv_exactly(client, 12)
+                if header is None:
+                    break
+                request_type, length, request_id = struct.unpack(
+                    '<LLL', header)
+                body = recv_exactly(client, length) if length else b''
+                if body is None:
+                    break
+                if request_type == 0xff00:
+                    client.sendall(header)
+                    continue
+                self.requests.append(header + body)
+                response = self.handler(request_type, request_id, body)
+                if response is None:
+                    break
+                client.sendall(response)
+        except socket.error:
+            pass
+        finally:
+            client.close()
+
+    def close(self):
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self._sock.close()
+
+
+class FakeAdminServer(FakeServer):
+    """
+    Threaded TCP server of the text administrative console.
+
+    `handler(command)` returns the output (YAML document) for the command
+    line or None to close the client connection.
+    """
+
+    def _handle(self, client):
+        data = b''
+        try:
+            while True:
+                while b'\n' not in data:
+                    chunk = client.recv(4096)
+                    if not chunk:
+                        return
+                    data += chunk
+                line, data = data.split(b'\n', 1)
+                command = line.decode('utf-8').strip()
+                self.requests.append(command)
+                response = self.handler(command)
+                if response is None:
+                    break
+                client.sendall(response.encode('utf-8'))
+        except socket.error:
+            pass
+        finally:
+            client.close()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.space module
+"""
+import unittest
+
+import tarantool.space
+from tarantool.compression import Compressed
+
+
+class Connection(object):
+    """
+    Records requests instead of sending them
+    """
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *args):
+        self.updates.append(args)
+        return args
+
+
+class UpdateFromDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = Connection()
+        self.space = tarantool.space.Space(self.conn, 1)
+
+    def test__diff(self):
+        """
+        Test building operations for changed fields
+        """
+        diff = tarantool.space.Space.diff
+        self.assertEqual(diff((1, b'AAA', 10), (1, b'AAA', 10)), [])
+        self.assertEqual(
+            diff((1, b'AAA', 10), (1, b'BBB', 12)),
+            [(1, '=', b'BBB'), (2, '=', 12)])
+        # Raw fields are compared with encoded values
+        self.assertEqual(
+            diff((b'\x01\x00\x00\x00', b'AAA'), (1, u'AAA')), [])
+        self.assertEqual(
+            diff((1, b'AAA', 10, 0x100000000), (1, b'AAA', 7, 0x100000002),
+                 deltas=True),
+            [(2, '+', 0xfffffffd),
+             (3, '+', b'\x02\x00\x00\x00\x00\x00\x00\x00')])
+        self.assertEqual(
+            diff((1, b'AAA', 10), (1, b'BBB'), deltas=True),
+            [(1, '=', b'BBB'), (2, 'delete', b'')])
+        self.assertEqual(
+            diff((1, ), (1, 2, 3)), [(1, 'insert', 2), (2, 'insert', 3)])
+
+    def test__update_from_diff(self):
+        """
+        Test that update is sent only if something changed
+        """
+        self.assertIsNone(self.space.update_from_diff(1, (1, 2), (1, 2)))
+        self.assertEqual(self.conn.updates, [])
+        self.space.update_from_diff(1, (1, 2), (1, 3), deltas=True)
+        self.assertEqual(
+            self.conn.updates,
+            [(1, 1, [(1, '+', 1)], False, None)])
+
+    def test__compressed(self):
+        """
+        Test diff of the rows of a compressed space
+        """
+        codec = Compressed(threshold=10)
+        space = tarantool.space.Space(self.conn, 1, (int, codec))
+        text = b'compressed ' * 10
+        old_row = (1, codec.decode(codec.encode(text)))
+        self.assertIsNone(space.update_from_diff(1, old_row, (1, text)))
+        self.assertIsNone(space.update_from_diff(1, old_row, old_row))
+        space.update_from_diff(1, old_row, (1, b'changed'), deltas=True)
+        space.update_from_diff(
+            1, (1, codec.decode(b'old')), (1, codec.decode(b'new')))
+        self.assertEqual(
+            self.conn.updates,
+            [(1, 1, [(1, '=', b'changed')], False, (int, codec)),
+             (1, 1, [(1, '=', b'new')], False, (int, codec))])
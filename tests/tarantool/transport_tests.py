@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.transport module
+"""
+import os
+import shutil
+import socket
+import tempfile
+import time
+import unittest
+
+import tarantool
+import tarantool.connection
+import tarantool.transport
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def handler(request_type, request_id, body):
+    return pack_response(request_type, request_id, [(1, b'AAA')])
+
+
+class UnixTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'tarantool.sock')
+        self.server = FakeServer(handler, unix_socket=self.path)
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test__connect(self):
+        """
+        Test connection through the unix socket
+        """
+        conn = tarantool.connect(unix_socket=self.path)
+        self.assertIsInstance(
+            conn.transport, tarantool.transport.UnixTransport)
+        self.assertEqual(conn.select(1, 1), [(b'\x01\x00\x00\x00', b'AAA')])
+        conn.close()
+
+        conn = tarantool.connection.Connection(unix_socket=self.path)
+        self.assertEqual(conn.select(1, 1), [(b'\x01\x00\x00\x00', b'AAA')])
+        conn.close()
+
+    def test__port_required(self):
+        """
+        Test that a host without port is not taken for a socket path
+        """
+        with self.assertRaises(ValueError):
+            tarantool.connection.Connection(self.path)
+        with self.assertRaises(ValueError):
+            tarantool.connection.Connection('db-host')
+
+    def test__connect_error(self):
+        """
+        Test that connection failure is reported as NetworkError
+        """
+        with self.assertRaises(tarantool.NetworkError):
+            tarantool.connection.Connection(
+                unix_socket=self.path + '.missing')
+
+
+def closed_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class TCPTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.resolved = []
+        self.addresses = [(socket.AF_INET, (self.server.host,
+                                            self.server.port))]
+        self._getaddrinfo = socket.getaddrinfo
+        socket.getaddrinfo = self.getaddrinfo
+        tarantool.transport.flush_dns_cache()
+
+    def tearDown(self):
+        socket.getaddrinfo = self._getaddrinfo
+        tarantool.transport.flush_dns_cache()
+        self.server.close()
+
+    def getaddrinfo(self, host, port, family, socktype):
+        self.resolved.append((host, port))
+        return [(family, socktype, 6, '', address)
+                for family, address in self.addresses]
+
+    def test__dns_cache(self):
+        for _ in range(3):
+            conn = tarantool.connection.Connection('tarantool.local', 1)
+            conn.close()
+        self.assertEqual(self.resolved, [('tarantool.local', 1)])
+        transport = tarantool.transport.TCPTransport(
+            'tarantool.local', 1, dns_ttl=0)
+        transport.open(1).close()
+        transport.open(1).close()
+        self.assertEqual(len(self.resolved), 3)
+
+    def test__fallback(self):
+        """
+        Test that the next address is tried if the first one refuses
+        """
+        self.addresses.insert(0, (socket.AF_INET,
+                                  ('127.0.0.1', closed_port())))
+        conn = tarantool.connection.Connection('tarantool.local', 1)
+        self.assertEqual(conn.select(1, 1), [(b'\x01\x00\x00\x00', b'AAA')])
+        conn.close()
+
+    def test__stagger(self):
+        """
+        Test that a hanging address does not delay the connection
+        """
+        self.addresses.insert(0, (socket.AF_INET, ('192.0.2.1', 1)))
+        opened = []
+
+        class Transport(tarantool.transport.TCPTransport):
+            def _open_address(self, family, address, timeout):
+                opened.append(address)
+                if address[0] == '192.0.2.1':
+                    time.sleep(timeout)
+                    raise socket.timeout('timed out')
+                return super(Transport, self)._open_address(
+                    family, address, timeout)
+
+        transport = Transport('tarantool.local', 1, stagger=0.05)
+        started = time.time()
+        transport.open(1).close()
+        self.assertLess(time.time() - started, 0.5)
+        self.assertEqual(len(opened), 2)
+
+    def test__unreachable(self):
+        self.addresses = [(socket.AF_INET, ('127.0.0.1', closed_port()))
+                          for _ in range(2)]
+        transport = tarantool.transport.TCPTransport('tarantool.local', 1)
+        with self.assertRaises(socket.error):
+            transport.open(1)
+        # The addresses are resolved again after the failure
+        self.addresses = [(socket.AF_INET, (self.server.host,
+                                            self.server.port))]
+        transport.open(1).close()
+        self.assertEqual(len(self.resolved), 2)
+
+    def test__interleave(self):
+        v4 = socket.AF_INET
+        v6 = socket.AF_INET6
+        self.assertEqual(
+            tarantool.transport._interleave(
+                [(v6, 'a'), (v6, 'b'), (v4, 'c'), (v4, 'd'), (v4, 'e')]),
+            [(v6, 'a'), (v4, 'c'), (v6, 'b'), (v4, 'd'), (v4, 'e')])
+
+
+class CustomTransport(unittest.TestCase):
+
+    def test__transport(self):
+        """
+        Test that connection uses the transport passed explicitly
+        """
+        server = FakeServer(handler)
+        opened = []
+
+        class Transport(tarantool.transport.TCPTransport):
+            def open(self, timeout):
+                opened.append(timeout)
+                return super(Transport, self).open(timeout)
+
+        conn = tarantool.connection.Connection(
+            None, None, socket_timeout=2,
+            transport=Transport(server.host, server.port))
+        conn.select(1, 1)
+        conn.connect()
+        conn.close()
+        server.close()
+        self.assertEqual(opened, [2, 2])
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for tarantool.writebuffer module
+"""
+import struct
+import unittest
+
+import tarantool.connection
+import tarantool.request
+import tarantool.response
+import tarantool.writebuffer
+
+from tests.tarantool.server import FakeServer, pack_response
+
+
+def handler(request_type, request_id, body):
+    # Reject requests with key 0
+    key = struct.unpack_from('<L', body, 13)[0]
+    if key == 0:
+        return pack_response(request_type, request_id,
+                             return_code=0x3802, message=b'Error')
+    return pack_response(request_type, request_id, rowcount=1)
+
+
+class Merge(unittest.TestCase):
+
+    def test__merge(self):
+        """
+        Test merging of operations on the same key
+        """
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, '+', 1), (2, '=', b'A')])
+        update.merge([(1, '+', 2), (3, '+', 1)])
+        update.merge([(2, '=', b'B'), (3, '|', 4)])
+        self.assertEqual(
+            update.op_list,
+            [(1, '+', 3), (3, '+', 1), (2, '=', b'B'), (3, '|', 4)])
+
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, '=', 10), (1, '+', 5)])
+        self.assertEqual(update.op_list, [(1, '=', 15)])
+
+    def test__merge_width(self):
+        """
+        Test that additions are merged only if the field width is known or
+        does not matter
+        """
+        # Unknown width: 32 bit sum would wrap around, 64 bit would not
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, '+', 3000000000), (1, '+', 3000000000)])
+        self.assertEqual(update.op_list,
+                         [(1, '+', 3000000000), (1, '+', 3000000000)])
+        update.merge([(2, '+', 1 << 40), (2, '+', 1 << 40)])
+        self.assertEqual(update.op_list[2:], [(2, '+', 1 << 41)])
+
+        # Width declared by the fixed layout
+        layout = tarantool.response.FixedLayout('L', 'L', 'Q')
+        update = tarantool.writebuffer._Update(
+            1, tarantool.writebuffer._field_widths(layout))
+        update.merge([(1, '+', 3000000000), (1, '+', 3000000000),
+                      (2, '+', 3000000000), (2, '+', 3000000000)])
+        self.assertEqual(update.op_list, [(1, '+', 6000000000 % (1 << 32)),
+                                          (2, '+', 6000000000)])
+
+        # Assignment sets the width, the result must keep it
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, '=', 0xfffffff0), (1, '+', 0x20)])
+        self.assertEqual(update.op_list, [(1, '=', 0x10)])
+        update.merge([(2, '=', 1 << 32), (2, '+', 1)])
+        self.assertEqual(update.op_list[1:], [(2, '=', (1 << 32) + 1)])
+        update.merge([(3, '=', 5), (3, '+', 1 << 32)])
+        self.assertEqual(update.op_list[2:], [(3, '=', 5), (3, '+', 1 << 32)])
+
+    def test__merge_shifting(self):
+        """
+        Test that operations shifting fields are not merged
+        """
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, 'delete', 0)])
+        update.merge([(1, '=', b'A'), (2, '+', 1)])
+        update.merge([(2, '+', 1)])
+        self.assertEqual(
+            update.op_list,
+            [(1, 'delete', 0), (1, '=', b'A'), (2, '+', 1), (2, '+', 1)])
+
+        update = tarantool.writebuffer._Update(1)
+        update.merge([(1, '+', 1), (1, 'splice', (0, 1, b'A'))])
+        update.merge([(1, '=', b'B')])
+        self.assertEqual(
+            update.op_list,
+            [(1, '+', 1), (1, 'splice', (0, 1, b'A')), (1, '=', b'B')])
+
+
+class WriteBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeServer(handler)
+        self.conn = tarantool.connection.Connection(
+            self.server.host, self.server.port)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.close()
+
+    def test__flush(self):
+        """
+        Test that buffered updates are merged and sent on flush
+        """
+        errors = []
+        buffer = self.conn.space(1).write_buffer(
+            flush_interval=60, on_error=lambda r, e: errors.append(e))
+        futures = [buffer.update(1, [(1, '+', 1)]) for _ in range(100)]
+        futures.append(buffer.insert((2, 10)))
+        futures.append(buffer.update(2, [(1, '+', 1)]))
+        futures.append(buffer.update(0, [(1, '+', 1)]))
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.flush().result(5), 1)
+
+        merged = tarantool.request.RequestUpdate(1, 1, [(1, '+', 100)], False)
+        merged.request_id = 1
+        self.assertEqual(self.server.requests[0], bytes(merged))
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(futures[0].result(), futures[99].result())
+        self.assertEqual(futures[101].result().return_code, 0)
+        with self.assertRaises(tarantool.DatabaseError):
+            futures[102].result()
+        self.assertEqual(len(errors), 1)
+        buffer.close()
+
+    def test__field_types(self):
+        """
+        Test that requests are encoded by the field types of the space
+        """
+        codec = tarantool.Compressed(threshold=10)
+        text = b'compressed ' * 10
+        layout = tarantool.response.FixedLayout('L', 'Q')
+        for field_types, values, op_list in [
+                ((int, codec), (1, text), [(1, '=', text)]),
+                (layout, (1, 2), [(1, '+', 1)])]:
+            del self.server.requests[:]
+            buffer = self.conn.space(1, field_types).write_buffer(
+                flush_interval=60)
+            buffer.insert(values)
+            buffer.update(1, op_list)
+            buffer.close()
+            expected = [
+                tarantool.connection.insert_request(
+                    1, values, False, field_types),
+                tarantool.connection.update_request(
+                    1, 1, op_list, False, field_types)]
+            for request_id, request in enumerate(expected, 1):
+                request.request_id = request_id
+            self.assertEqual(self.server.requests,
+                             [bytes(request) for request in expected])
+        # The values are encoded
+        self.assertNotIn(text, expected[0]._bytes)
+
+    def test__size_trigger(self):
+        """
+        Test flush when the buffer is full and on close
+        """
+        buffer = self.conn.space(1).write_buffer(
+            max_size=10, flush_interval=60)
+        futures = [buffer.insert((i, )) for i in range(1, 11)]
+        futures[-1].result(5)
+        last = buffer.insert((20, ))
+        buffer.close()
+        self.assertTrue(last.done())
+        self.assertEqual(len(self.server.requests), 11)
+        with self.assertRaises(RuntimeError):
+            buffer.insert((21, ))